@@ -0,0 +1,310 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark runner.
+
+Times the main entry points of the library against the workloads defined in
+``benchmarks.schemas`` and reports the time and memory per record. Results can
+be stored as a JSON baseline and later runs compared against it::
+
+    python -m benchmarks.run                    # run and compare with baseline.json
+    python -m benchmarks.run --save             # run and store the results in the baseline
+    python -m benchmarks.run -w deep -o to_native --records 50
+
+Times are the best of ``--repeat`` runs. Memory is the peak traced allocation
+while running the operation once, divided by the number of records; it is only
+reported on interpreters that provide ``tracemalloc``. For operations that
+produce bytes, the mean size of the output is reported as well.
+"""
+from __future__ import print_function, division
+
+import argparse
+import collections
+import gc
+import io
+import json
+import os
+import pickle
+import platform
+import sys
+import timeit
+
+try:
+    import tracemalloc
+except ImportError: # PY2
+    tracemalloc = None
+
+from .schemas import WORKLOADS
+
+from schematics import transforms # must follow the models
+from schematics.stream import iter_models
+
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+
+# Operations
+#
+# Each operation takes the model class and the raw records and returns a
+# ``(setup, run)`` pair. ``setup()`` prepares the input and is not timed;
+# ``run(prepared)`` performs the operation on every record.
+
+def construct(model, records):
+    return (lambda: records,
+            lambda records: [model(raw) for raw in records])
+
+
+def validate(model, records):
+    return (lambda: [model(raw) for raw in records],
+            lambda instances: [instance.validate() for instance in instances])
+
+
+def to_primitive(model, records):
+    instances = [model(raw) for raw in records]
+    return (lambda: instances,
+            lambda instances: [instance.to_primitive() for instance in instances])
+
+
+def to_native(model, records):
+    instances = [model(raw) for raw in records]
+    return (lambda: instances,
+            lambda instances: [instance.to_native() for instance in instances])
+
+
+def flatten(model, records):
+    instances = [model(raw) for raw in records]
+    return (lambda: instances,
+            lambda instances: [instance.flatten() for instance in instances])
+
+
+def from_flat(model, records):
+    flat = [model(raw).flatten() for raw in records]
+    return (lambda: flat,
+            lambda flat: [model.from_flat(data) for data in flat])
+
+
+def flatten_to_dict(model, records):
+    primitive = [model(raw).to_primitive() for raw in records]
+    return (lambda: primitive,
+            lambda primitive: [transforms.flatten_to_dict(data) for data in primitive])
+
+
+def expand(model, records):
+    flat = [model(raw).flatten() for raw in records]
+    return (lambda: flat,
+            lambda flat: [transforms.expand(data) for data in flat])
+
+
+def to_bytes(model, records):
+    instances = [model(raw) for raw in records]
+    return (lambda: instances,
+            lambda instances: [instance.to_bytes() for instance in instances])
+
+
+def from_bytes(model, records):
+    encoded = [model(raw).to_bytes() for raw in records]
+    return (lambda: encoded,
+            lambda encoded: [model.from_bytes(data) for data in encoded])
+
+
+def to_json(model, records):
+    instances = [model(raw) for raw in records]
+    return (lambda: instances,
+            lambda instances: [instance.to_json() for instance in instances])
+
+
+def from_json(model, records):
+    encoded = [model(raw).to_json().encode('utf-8') for raw in records]
+    return (lambda: encoded,
+            lambda encoded: [model.from_json(data) for data in encoded])
+
+
+def from_json_stream(model, records):
+    # The models are dropped as they are produced, as a consumer of a large
+    # upload would, so the peak memory reflects a single record.
+    encoded = json.dumps([model(raw).to_primitive() for raw in records]).encode('utf-8')
+    return (lambda: io.BytesIO(encoded),
+            lambda fp: collections.deque(iter_models(model, fp), maxlen=0))
+
+
+def pickle_dumps(model, records):
+    instances = [model(raw) for raw in records]
+    return (lambda: instances,
+            lambda instances: [pickle.dumps(instance, pickle.HIGHEST_PROTOCOL)
+                               for instance in instances])
+
+
+def pickle_loads(model, records):
+    pickled = [pickle.dumps(model(raw), pickle.HIGHEST_PROTOCOL) for raw in records]
+    return (lambda: pickled,
+            lambda pickled: [pickle.loads(data) for data in pickled])
+
+
+OPERATIONS = [construct, validate, to_primitive, to_native, flatten, from_flat,
+              flatten_to_dict, expand, to_bytes, from_bytes, to_json, from_json,
+              from_json_stream, pickle_dumps, pickle_loads]
+
+
+# Measurement
+
+def measure_time(setup, run, repeat):
+    run(setup()) # warm up caches before timing
+    best = None
+    for _ in range(repeat):
+        prepared = setup()
+        gc.collect()
+        start = timeit.default_timer()
+        run(prepared)
+        elapsed = timeit.default_timer() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def measure_memory(setup, run):
+    if tracemalloc is None:
+        return None
+    prepared = setup()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = run(prepared)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    del result
+    return peak
+
+
+def measure_size(setup, run):
+    """
+    Return the mean size of the results of an operation that produces bytes,
+    or ``None``.
+    """
+    results = run(setup())
+    if results and all(isinstance(result, bytes) for result in results):
+        return sum(len(result) for result in results) // len(results)
+    return None
+
+
+def run_benchmarks(workloads, operations, records, repeat, out=sys.stdout):
+    results = {}
+    for workload in workloads:
+        raw = [workload.make_record(i) for i in range(records)]
+        results[workload.name] = {}
+        for operation in operations:
+            setup, run = operation(workload.model, raw)
+            elapsed = measure_time(setup, run, repeat)
+            peak = measure_memory(setup, run)
+            size = measure_size(setup, run)
+            result = {'time_us': round(elapsed / records * 1e6, 2)}
+            if peak is not None:
+                result['memory_bytes'] = int(peak / records)
+            if size is not None:
+                result['size_bytes'] = size
+            results[workload.name][operation.__name__] = result
+            print('.', end='', file=out)
+            out.flush()
+    print(file=out)
+    return results
+
+
+# Reporting
+
+def compare(results, baseline, tolerance):
+    """
+    Return a list of report rows ``(workload, operation, metric, current, base, ratio)``
+    and a list of the rows that exceed the baseline by more than ``tolerance``.
+    """
+    rows = []
+    regressions = []
+    for workload, operations in sorted(results.items()):
+        for operation, metrics in sorted(operations.items()):
+            for metric, value in sorted(metrics.items()):
+                base = baseline.get(workload, {}).get(operation, {}).get(metric)
+                ratio = value / base if base else None
+                row = (workload, operation, metric, value, base, ratio)
+                rows.append(row)
+                if ratio is not None and ratio > 1 + tolerance:
+                    regressions.append(row)
+    return rows, regressions
+
+
+def print_report(rows, out=sys.stdout):
+    header = ('workload', 'operation', 'metric', 'current', 'baseline', 'ratio')
+    print('{0:<16}{1:<17}{2:<14}{3:>12}{4:>12}{5:>8}'.format(*header), file=out)
+    for workload, operation, metric, value, base, ratio in rows:
+        print('{0:<16}{1:<17}{2:<14}{3:>12}{4:>12}{5:>8}'.format(
+            workload, operation, metric, value,
+            '-' if base is None else base,
+            '-' if ratio is None else '%.2f' % ratio), file=out)
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)['results']
+
+
+def save_baseline(path, results, records, repeat):
+    baseline = load_baseline(path)
+    for workload, operations in results.items():
+        baseline.setdefault(workload, {}).update(operations)
+    data = {
+        'environment': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'machine': platform.machine(),
+            'records': records,
+            'repeat': repeat,
+        },
+        'results': baseline,
+    }
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('-w', '--workload', action='append',
+                        choices=[w.name for w in WORKLOADS],
+                        help='workload to run (repeatable; default: all)')
+    parser.add_argument('-o', '--operation', action='append',
+                        choices=[op.__name__ for op in OPERATIONS],
+                        help='operation to run (repeatable; default: all)')
+    parser.add_argument('--records', type=int, default=100,
+                        help='records per workload (default: %(default)s)')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='timing runs per operation (default: %(default)s)')
+    parser.add_argument('--baseline', default=BASELINE,
+                        help='baseline file (default: %(default)s)')
+    parser.add_argument('--save', action='store_true',
+                        help='store the results in the baseline, replacing earlier values')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed slowdown relative to the baseline (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    workloads = [w for w in WORKLOADS if not args.workload or w.name in args.workload]
+    operations = [op for op in OPERATIONS if not args.operation or op.__name__ in args.operation]
+
+    results = run_benchmarks(workloads, operations, args.records, args.repeat)
+
+    if args.save:
+        save_baseline(args.baseline, results, args.records, args.repeat)
+        rows, regressions = compare(results, {}, args.tolerance)
+    else:
+        rows, regressions = compare(results, load_baseline(args.baseline), args.tolerance)
+    print_report(rows)
+
+    if regressions:
+        print('\n%d measurement(s) exceed the baseline by more than %d%%:'
+              % (len(regressions), args.tolerance * 100))
+        for workload, operation, metric, value, base, ratio in regressions:
+            print('  %s.%s %s: %s -> %s (x%.2f)' % (workload, operation, metric, base, value, ratio))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""
+Models and record generators used by the benchmark suite.
+
+Every workload is described by a ``Workload`` giving the model class and a
+function that produces the ``i``-th raw (primitive) record. Records are
+deterministic so that runs are comparable with the stored baseline.
+"""
+from __future__ import unicode_literals
+
+import datetime
+import uuid
+from collections import namedtuple
+
+from schematics.models import Model
+from schematics.types import (
+    StringType, IntType, FloatType, BooleanType, DecimalType, UUIDType,
+    EmailType, DateType, DateTimeType, UTCDateTimeType, TimestampType)
+from schematics.types.compound import ModelType, ListType, DictType, PolyModelType
+
+
+Workload = namedtuple('Workload', ['name', 'model', 'make_record'])
+
+
+# Flat
+
+class Flat(Model):
+    id = IntType(required=True)
+    name = StringType(max_length=100)
+    email = EmailType()
+    score = FloatType()
+    active = BooleanType(default=True)
+    balance = DecimalType()
+    ref = UUIDType()
+
+
+def make_flat(i):
+    return {
+        'id': i,
+        'name': 'user %d' % i,
+        'email': 'user%d@example.com' % i,
+        'score': i * 0.5,
+        'active': i % 2 == 0,
+        'balance': '%d.25' % i,
+        'ref': str(uuid.UUID(int=i)),
+    }
+
+
+# Wide
+
+WIDE_FIELDS = 200
+
+Wide = type(str('Wide'), (Model,), dict(
+    [('__module__', __name__)] +
+    [('f%03d' % n, (IntType, StringType, FloatType, BooleanType)[n % 4]())
+     for n in range(WIDE_FIELDS)]))
+
+
+def make_wide(i):
+    values = (lambda n: i + n, lambda n: 's%d' % n, lambda n: n / 4.0, lambda n: bool(n & 1))
+    return dict(('f%03d' % n, values[n % 4](n)) for n in range(WIDE_FIELDS))
+
+
+# Deep recursive
+
+DEEP_LEVELS = 50
+
+
+class Node(Model):
+    name = StringType()
+    weight = IntType()
+    child = ModelType('Node')
+
+
+def make_deep(i):
+    record = None
+    for level in range(DEEP_LEVELS, 0, -1):
+        record = {'name': 'n%d.%d' % (i, level), 'weight': level, 'child': record}
+    return record
+
+
+# List-heavy
+
+class Item(Model):
+    sku = StringType()
+    quantity = IntType()
+    price = FloatType()
+
+
+class Order(Model):
+    id = IntType()
+    tags = ListType(StringType())
+    numbers = ListType(IntType())
+    items = ListType(ModelType(Item))
+    attributes = DictType(StringType())
+
+
+def make_list_heavy(i):
+    return {
+        'id': i,
+        'tags': ['tag%d' % n for n in range(20)],
+        'numbers': list(range(i, i + 50)),
+        'items': [{'sku': 'sku-%d' % n, 'quantity': n, 'price': n * 1.5} for n in range(20)],
+        'attributes': dict(('key%d' % n, 'value%d' % n) for n in range(10)),
+    }
+
+
+# Polymorphic
+
+class Shape(Model):
+    name = StringType()
+
+
+class Circle(Shape):
+    radius = FloatType()
+
+    @classmethod
+    def _claim_polymorphic(cls, data):
+        return 'radius' in data
+
+
+class Rectangle(Shape):
+    width = FloatType()
+    height = FloatType()
+
+    @classmethod
+    def _claim_polymorphic(cls, data):
+        return 'width' in data
+
+
+class Triangle(Shape):
+    a = FloatType()
+    b = FloatType()
+    c = FloatType()
+
+    @classmethod
+    def _claim_polymorphic(cls, data):
+        return 'a' in data
+
+
+class Drawing(Model):
+    title = StringType()
+    main = PolyModelType([Circle, Rectangle, Triangle])
+    shapes = ListType(PolyModelType([Circle, Rectangle, Triangle]))
+
+
+def _shape(n):
+    kind = n % 3
+    if kind == 0:
+        return {'name': 'circle %d' % n, 'radius': n + 0.5}
+    elif kind == 1:
+        return {'name': 'rect %d' % n, 'width': n + 1.0, 'height': n + 2.0}
+    else:
+        return {'name': 'tri %d' % n, 'a': 3.0, 'b': 4.0, 'c': 5.0}
+
+
+def make_polymorphic(i):
+    return {
+        'title': 'drawing %d' % i,
+        'main': _shape(i),
+        'shapes': [_shape(n) for n in range(i, i + 15)],
+    }
+
+
+# Datetime-heavy
+
+class Event(Model):
+    day = DateType()
+    created = DateTimeType()
+    updated = DateTimeType()
+    starts = UTCDateTimeType()
+    ends = UTCDateTimeType()
+    stamp = TimestampType()
+    history = ListType(DateTimeType())
+
+
+def make_datetime_heavy(i):
+    base = datetime.datetime(2016, 1, 1, 12, 30) + datetime.timedelta(minutes=i)
+    fmt = '%Y-%m-%dT%H:%M:%S.%f'
+    return {
+        'day': base.date().isoformat(),
+        'created': base.strftime(fmt),
+        'updated': (base + datetime.timedelta(seconds=1)).strftime(fmt) + '+02:00',
+        'starts': base.strftime(fmt) + 'Z',
+        'ends': (base + datetime.timedelta(hours=1)).strftime(fmt) + 'Z',
+        'stamp': base.strftime(fmt) + '+00:00',
+        'history': [(base - datetime.timedelta(days=n)).strftime(fmt) for n in range(10)],
+    }
+
+
+WORKLOADS = [
+    Workload('flat', Flat, make_flat),
+    Workload('wide', Wide, make_wide),
+    Workload('deep', Node, make_deep),
+    Workload('list_heavy', Order, make_list_heavy),
+    Workload('polymorphic', Drawing, make_polymorphic),
+    Workload('datetime_heavy', Event, make_datetime_heavy),
+]
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""Bulk serialization of querysets for list endpoints.
+
+Rows are fetched with ``values()`` instead of as model objects, and the
+many-to-many relations of each chunk of rows are fetched with one query on
+the through table. The rows are exported as dicts with ``export_many``, which
+shares one export context for the whole response, and written out in chunks.
+"""
+
+import itertools
+
+from schematics import jsonio
+from schematics.transforms import export_many
+
+
+def iter_rows(queryset, fields, related=None, chunk_size=500):
+    """Generate one dict per row of ``queryset`` with ``fields`` and, for
+    each name in ``related``, a list of dicts of the related objects.
+
+    ``related`` maps a many-to-many field name to the fields to fetch from
+    the related model. Each chunk of rows costs one query per relation on
+    top of the query for the rows themselves.
+    """
+    fields = list(fields)
+    pk = queryset.model._meta.pk.attname
+    if pk not in fields:
+        fields.append(pk)
+    rows = queryset.values(*fields).iterator()
+    while True:
+        chunk = list(itertools.islice(rows, chunk_size))
+        if not chunk:
+            return
+        pks = [row[pk] for row in chunk]
+        for name, related_fields in (related or {}).items():
+            grouped = _fetch_related(queryset.model, name, related_fields, pks)
+            for row in chunk:
+                row[name] = grouped.get(row[pk], [])
+        for row in chunk:
+            yield row
+
+
+def _fetch_related(model, name, related_fields, pks):
+    """Return ``{pk: [related dict, ...]}`` for the rows in ``pks``."""
+    field = model._meta.get_field(name)
+    # ``rel`` was renamed to ``remote_field`` in Django 1.9 and removed in 2.0
+    remote_field = getattr(field, 'remote_field', None) or field.rel
+    through = remote_field.through
+    source = field.m2m_field_name()
+    target = field.m2m_reverse_field_name()
+    lookups = ['%s__%s' % (target, related_field)
+               for related_field in related_fields]
+    grouped = {}
+    values = (through.objects.filter(**{'%s__in' % source: pks})
+              .values_list(source, *lookups))
+    for row in values:
+        grouped.setdefault(row[0], []).append(
+            dict(zip(related_fields, row[1:])))
+    return grouped
+
+
+def stream_json(serializer, rows, chunk_size=100):
+    """Generate the JSON of ``{"items": [...], "total": n}`` in chunks of
+    ``chunk_size`` items, exporting ``rows`` with ``serializer``."""
+    items = export_many(serializer, rows)
+    total = 0
+    yield '{"items": ['
+    while True:
+        chunk = list(itertools.islice(items, chunk_size))
+        if not chunk:
+            break
+        text = ', '.join(jsonio.dumps(item) for item in chunk)
+        yield text if not total else ', ' + text
+        total += len(chunk)
+    yield '], "total": %d}' % total
@@ -6,20 +6,12 @@ from django.db import models
 class Tag(models.Model):
     title = models.CharField(max_length=50)
 
-    def to_dict(self):
-        return {'id': self.id, 'title': self.title}
-
 
 class Link(models.Model):
     title = models.CharField(max_length=255)
     url = models.URLField()
     tags = models.ManyToManyField(Tag)
 
-    def to_dict(self):
-        return {'id': self.id, 'title': self.title,
-                'url': self.url, 'tags': [tag.to_dict()
-                                          for tag in self.tags.all()]}
-
     def attach_tags(self, tags):
         for tag in tags:
             self.tags.add(tag)
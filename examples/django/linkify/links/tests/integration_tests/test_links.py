@@ -1,8 +1,12 @@
 # -*- coding: utf-8 -*-
 
 import json
+import time
+
 from django.test import TestCase, Client
 
+from links.models import Link, Tag
+
 
 class TestCreateLink(TestCase):
     def setUp(self):
@@ -82,7 +86,7 @@ class TestListLink(TestCase):
 
     def test_list(self):
         resp = self.client.get('/links/')
-        obj = json.loads(resp.content.decode())
+        obj = json.loads(b''.join(resp.streaming_content).decode())
 
         assert resp.status_code == 200
         assert int(obj['total']) == 1
@@ -96,6 +100,40 @@ class TestListLink(TestCase):
                 assert tag['title']
 
 
+class TestBulkListLink(TestCase):
+    count = 200
+
+    def setUp(self):
+        super().setUp()
+        self.client = Client()
+
+        tags = [Tag.objects.create(title='tag %d' % i) for i in range(5)]
+        for i in range(self.count):
+            link = Link.objects.create(title='Link %d' % i,
+                                       url='https://example.com/%d' % i)
+            link.attach_tags(tags[:i % 4])
+
+    def test_list_query_count(self):
+        start = time.time()
+        # One query for the links and one for the tags of all of them
+        with self.assertNumQueries(2):
+            resp = self.client.get('/links/')
+            content = b''.join(resp.streaming_content)
+        elapsed = time.time() - start
+        print('\n%d links: %.1f us per row'
+              % (self.count, elapsed / self.count * 1e6))
+
+        obj = json.loads(content.decode())
+        assert obj['total'] == self.count
+        assert [item['title'] for item in obj['items']] == \
+            ['Link %d' % i for i in range(self.count)]
+        for i, item in enumerate(obj['items']):
+            assert len(item['tags']) == i % 4
+            for tag in item['tags']:
+                assert tag['id']
+                assert tag['title'].startswith('tag ')
+
+
 class TestReadLink(TestCase):
     def setUp(self):
         super().setUp()
@@ -1,8 +1,6 @@
 # -*- coding: utf-8 -*-
 
-import json
-
-from django.http import JsonResponse, Http404
+from django.http import JsonResponse, Http404, StreamingHttpResponse
 from django.views.generic import View
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
@@ -11,6 +9,7 @@ from schematics.exceptions import ModelValidationError, ModelConversionError
 
 from .serializers import (LinkCreateSerializer, LinkReadSerializer,
                           LinkUpdateSerializer)
+from .bulk import iter_rows, stream_json
 from .models import Link, Tag
 
 
@@ -24,9 +23,8 @@ class LinkListView(CSRFExemptMixin):
     http_method_names = ['post', 'get']
 
     def post(self, request):
-        data = json.loads(request.body.decode())
         try:
-            link = LinkCreateSerializer(raw_data=data)
+            link = LinkCreateSerializer.from_json(request.body)
             link.validate()
             kwargs = link.to_native()
             # Pop tags since objects will be created separately
@@ -39,19 +37,17 @@ class LinkListView(CSRFExemptMixin):
             link_obj.attach_tags(tag_collection)
 
             # Prepare for response
-            return_data = LinkReadSerializer(link_obj.to_dict()).to_native()
+            return_data = LinkReadSerializer.from_object(link_obj).to_native()
             return JsonResponse(data=return_data, status=201)
         except (ModelValidationError, ModelConversionError) as e:
             return JsonResponse(e.messages, status=400)
 
     def get(self, request):
         # TODO: Add pagination
-        links = Link.objects.all()
-        items = [LinkReadSerializer(link.to_dict()).to_native()
-                 for link in links]
-        data = {'items': items, 'total': len(links)}
-
-        return JsonResponse(data=data)
+        rows = iter_rows(Link.objects.order_by('pk'), ['title', 'url'],
+                         related={'tags': ['id', 'title']})
+        return StreamingHttpResponse(stream_json(LinkReadSerializer, rows),
+                                     content_type='application/json')
 
 
 class LinkDetailView(CSRFExemptMixin):
@@ -65,7 +61,7 @@ class LinkDetailView(CSRFExemptMixin):
 
     def get(self, request, pk):
         link = self.get_or_404(pk=pk)
-        return_data = LinkReadSerializer(link.to_dict()).to_native()
+        return_data = LinkReadSerializer.from_object(link).to_native()
         return JsonResponse(return_data)
 
     def delete(self, request, pk):
@@ -74,15 +70,14 @@ class LinkDetailView(CSRFExemptMixin):
         return JsonResponse(data={}, status=204)
 
     def patch(self, request, pk):
-        data = json.loads(request.body.decode())
         try:
-            link = LinkUpdateSerializer(raw_data=data)
+            link = LinkUpdateSerializer.from_json(request.body)
             kwargs = link.to_native()
             # We need to make two db calls any way to return Response
             link_obj = self.get_or_404(pk=pk)
             link_obj.update(**kwargs)
             # Prepare response
-            data = LinkReadSerializer(link_obj.to_dict()).to_native()
+            data = LinkReadSerializer.from_object(link_obj).to_native()
             return JsonResponse(data=data, status=202)
         except ModelConversionError as e:
             # this is raised when fields are missing
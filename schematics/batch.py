@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+"""
+Validation of large batches of records in a pool of worker processes.
+
+::
+
+    with validate_batch(Person, records, processes=4) as results:
+        for instance, error in results.items():
+            ...
+
+The records are sent to the workers in chunks. Each worker converts and
+validates its chunk and writes the outcome to a block of shared memory: the
+instances in the encoding of ``schematics.binary``, or the error messages of
+the records that failed. Only the name of the block goes back through the
+pool's pipe, and the parent decodes a record only when it is accessed.
+
+Shared memory requires ``multiprocessing.shared_memory`` (Python 3.8 and
+later). On other interpreters the encoded chunks are returned through the pipe
+instead, which still avoids pickling the instances and error objects.
+"""
+import itertools
+import json
+import multiprocessing
+import struct
+from bisect import bisect_right
+
+from six import iteritems
+from six import string_types as basestring
+
+try:
+    from multiprocessing import shared_memory, resource_tracker
+except ImportError: # before Python 3.8
+    shared_memory = None
+
+from .binary import _model_codec, _encode_string, _decode_string
+from .exceptions import (
+    DataError, ErrorMessage, FieldError, ConversionError, ValidationError, TRUNCATED,
+)
+
+
+_VALID = 0
+_INVALID = 1
+
+_offset = struct.Struct('<Q')
+
+_ERROR_TYPES = {
+    'ConversionError': ConversionError,
+    'ValidationError': ValidationError,
+}
+
+
+def validate_batch(cls, records, processes=None, chunk_size=500, pool=None, **options):
+    """
+    Converts and validates each of ``records`` as an instance of ``cls`` in
+    worker processes and returns a ``BatchResult``.
+
+    :param records:
+        An iterable of raw records. It is consumed in chunks.
+    :param processes:
+        The number of worker processes. Defaults to the number of CPUs.
+    :param chunk_size:
+        The number of records sent to a worker at a time.
+    :param pool:
+        An existing ``multiprocessing.Pool`` to use instead of a new one.
+    :param options:
+        Passed to ``Model.validate``.
+    """
+    if shared_memory is not None:
+        # Workers must share the parent's resource tracker; otherwise a
+        # worker's own tracker would remove its blocks when the worker exits.
+        resource_tracker.ensure_running()
+    records = iter(records)
+    chunks = iter(lambda: list(itertools.islice(records, chunk_size)), [])
+    tasks = ((cls, chunk, options) for chunk in chunks)
+
+    own_pool = pool is None
+    if own_pool:
+        pool = multiprocessing.Pool(processes)
+    result = BatchResult(cls)
+    try:
+        for output in pool.imap(_validate_chunk, tasks):
+            result._add(*output)
+    except BaseException:
+        result.close()
+        raise
+    finally:
+        if own_pool:
+            pool.close()
+            pool.join()
+    return result
+
+
+def _validate_chunk(task):
+    cls, records, options = task
+    encode = _model_codec(cls)[0]
+    out = bytearray()
+    index = bytearray()
+    for raw in records:
+        index += _offset.pack(len(out))
+        try:
+            instance = cls(raw)
+            instance.validate(**options)
+        except DataError as exc:
+            out.append(_INVALID)
+            _encode_string(json.dumps(_error_tree(exc.messages)), out)
+        except FieldError as exc:
+            # Raised for the record as a whole, e.g. when it is not a dict.
+            out.append(_INVALID)
+            _encode_string(json.dumps(_error_tree(exc)), out)
+        except Exception as exc:
+            # Any other error, such as a TypeError from a custom validator,
+            # only fails its own record.
+            out.append(_INVALID)
+            message = u'%s: %s' % (type(exc).__name__, exc)
+            _encode_string(json.dumps(['e', 'ValidationError', [message]]), out)
+        else:
+            out.append(_VALID)
+            encode(instance, out)
+    index_offset = len(out)
+    out += index
+    if shared_memory is None:
+        return bytes(out), index_offset, len(records)
+    block = shared_memory.SharedMemory(create=True, size=max(len(out), 1))
+    block.buf[:len(out)] = out
+    name = block.name
+    block.close()
+    return name, index_offset, len(records)
+
+
+def _error_tree(messages):
+    """
+    Returns the error messages of a ``DataError`` as JSON data. Dicts are
+    stored as lists of pairs to keep integer keys, and the ``TRUNCATED`` key
+    is stored as ``{}`` so that it is not read back as a ``'__truncated__'``
+    key of the data.
+    """
+    if isinstance(messages, dict):
+        return ['d', [[{} if key is TRUNCATED else key, _error_tree(value)]
+                      for key, value in iteritems(messages)]]
+    if isinstance(messages, FieldError):
+        error_type = messages.type or type(messages)
+    else:
+        # Plain lists of messages from model-level validators, or strings such
+        # as 'Rogue field'.
+        if isinstance(messages, (basestring, ErrorMessage)):
+            messages = [messages]
+        messages = [message if isinstance(message, ErrorMessage) else ErrorMessage(message)
+                    for message in messages]
+        error_type = next((message.type for message in messages if message.type),
+                          ValidationError)
+    return ['e', error_type.__name__, [message.summary for message in messages]]
+
+
+def _error_messages(tree):
+    if tree[0] == 'd':
+        return dict((TRUNCATED if key == {} else key, _error_messages(value))
+                    for key, value in tree[1])
+    return _ERROR_TYPES.get(tree[1], ValidationError)(tree[2])
+
+
+class BatchResult(object):
+    """
+    The outcome of ``validate_batch``, in the order of the input records.
+
+    ``result[i]`` returns the instance of record ``i`` or raises its
+    ``DataError``. The ``info`` and ``partial_data`` of errors are not kept.
+    A record that fails as a whole, such as one that is not a dict, raises a
+    ``ConversionError`` instead, and a record whose validation raised some
+    other exception raises a ``ValidationError`` with the type and text of
+    that exception.
+    Call ``close()``, or use the result as a context manager, to release the
+    shared memory.
+    """
+
+    def __init__(self, cls):
+        self.model_class = cls
+        self._chunks = []
+        self._starts = []
+        self._count = 0
+
+    def _add(self, source, index_offset, count):
+        if isinstance(source, bytes):
+            block, buf = None, source
+        else:
+            block = shared_memory.SharedMemory(source)
+            # The mapping stays valid until it is closed; removing the name
+            # now guarantees that the block is freed even if close() is never
+            # called.
+            block.unlink()
+            buf = block.buf
+        self._chunks.append((block, buf, index_offset))
+        self._starts.append(self._count)
+        self._count += count
+
+    def __len__(self):
+        return self._count
+
+    def _locate(self, index):
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError('result index out of range')
+        chunk = bisect_right(self._starts, index) - 1
+        block, buf, index_offset = self._chunks[chunk]
+        position = index_offset + (index - self._starts[chunk]) * _offset.size
+        offset = _offset.unpack_from(buf, position)[0]
+        return buf, offset
+
+    def is_valid(self, index):
+        buf, offset = self._locate(index)
+        return struct.unpack_from('<B', buf, offset)[0] == _VALID
+
+    def error(self, index):
+        """
+        Returns the error of record ``index``, usually a ``DataError``, or
+        ``None`` if it is valid.
+        """
+        buf, offset = self._locate(index)
+        if struct.unpack_from('<B', buf, offset)[0] == _VALID:
+            return None
+        messages = _error_messages(json.loads(_decode_string(buf, offset + 1)[0]))
+        if isinstance(messages, dict):
+            return DataError(messages)
+        return messages
+
+    def __getitem__(self, index):
+        buf, offset = self._locate(index)
+        if struct.unpack_from('<B', buf, offset)[0] != _VALID:
+            raise self.error(index)
+        return _model_codec(self.model_class)[1](buf, offset + 1)[0]
+
+    def items(self):
+        """
+        Generates an ``(instance, error)`` pair for each record, where one of
+        the two is ``None``.
+        """
+        for index in range(self._count):
+            error = self.error(index)
+            if error is None:
+                yield self[index], None
+            else:
+                yield None, error
+
+    def close(self):
+        for block, buf, index_offset in self._chunks:
+            if block is not None:
+                block.close()
+        self._chunks = []
+        self._starts = []
+        self._count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,393 @@
+# -*- coding: utf-8 -*-
+"""
+A compact binary encoding of models.
+
+Fields are encoded by position in the order of ``Model._fields`` rather than
+by name, so the writer and the reader must use the same model definition.
+A model is written as a bitmap with two bits per field, telling whether the
+field is undefined, ``None`` or set, followed by the values of the fields that
+are set:
+
+=========================== ===============================================
+``IntType``, ``LongType``   signed 64-bit integer
+``FloatType``               64-bit float
+``BooleanType``             one byte
+``DateTimeType``            microseconds since the epoch as a signed 64-bit
+                            integer and the UTC offset in seconds as a signed
+                            32-bit integer (``-2**31`` for naive values)
+``DateType``                the proleptic Gregorian ordinal as a 32-bit int
+``UUIDType``                16 bytes
+``StringType``              a 32-bit length followed by UTF-8
+``DecimalType``             its string form, as above
+``ModelType``               the model, recursively
+``PolyModelType``           a 16-bit index into ``model_classes`` and the
+                            model
+``ListType``, ``DictType``  a 32-bit count, a bitmap of the items that are not
+                            ``None``, and the items; dict keys are strings
+other types                 the JSON representation of the primitive value
+=========================== ===============================================
+
+All numbers are little-endian. Serializables are not encoded. Decoding takes
+the native values over as they are, like ``Model.to_native``, so instances are
+not converted or validated again.
+"""
+from __future__ import division
+
+import datetime
+import decimal
+import json
+import struct
+import uuid
+
+from six import iteritems
+
+from .models import Model
+from .types import (BooleanType, IntType, LongType, FloatType, DecimalType,
+                    DateTimeType, DateType, UUIDType, StringType)
+from .types.compound import ModelType, PolyModelType, ListType, DictType
+from .undefined import Undefined
+
+
+_int = struct.Struct('<q')
+_float = struct.Struct('<d')
+_bool = struct.Struct('<?')
+_size = struct.Struct('<I')
+_index = struct.Struct('<H')
+_date = struct.Struct('<i')
+_datetime = struct.Struct('<qi')
+
+_NAIVE = -2 ** 31
+_EPOCH = datetime.datetime(1970, 1, 1)
+
+
+def to_bytes(cls, instance_or_dict):
+    """
+    Encodes a model instance, or a dict of native values keyed by field name,
+    as bytes.
+    """
+    out = bytearray()
+    try:
+        _model_codec(cls)[0](instance_or_dict, out)
+    except struct.error as exc:
+        raise ValueError('Could not encode %s: %s' % (cls.__name__, exc))
+    return bytes(out)
+
+
+def from_bytes(cls, data):
+    """
+    Decodes an instance of ``cls`` from the output of ``to_bytes``.
+    """
+    instance, offset = decode(cls, data)
+    if offset != len(data):
+        raise ValueError('Unexpected data after the %s payload' % cls.__name__)
+    return instance
+
+
+def decode(cls, data, offset=0):
+    """
+    Decodes an instance of ``cls`` starting at ``offset`` of the bytes-like
+    object ``data``, such as bytes, a memoryview or an mmap, and returns it
+    with the offset of the following byte. Truncated or corrupt data raises a
+    ``ValueError``.
+    """
+    try:
+        return _model_codec(cls)[1](data, offset)
+    except (struct.error, ValueError, IndexError, OverflowError,
+            decimal.InvalidOperation) as exc:
+        raise ValueError('Invalid %s payload: %s' % (cls.__name__, exc))
+
+
+_model_codecs = {}
+
+
+def _model_codec(cls):
+    """
+    Returns the ``(encode, decode, fields)`` of ``cls``, compiling them on
+    first use. ``encode(value, out)`` appends to the bytearray ``out``;
+    ``decode(data, offset)`` returns the value and the offset after it.
+    ``fields`` lists ``(field_name, key, encode, decode)`` for each field, where
+    ``key`` is the name used by ``Model._from_native``.
+    """
+    try:
+        return _model_codecs[cls]
+    except KeyError:
+        pass
+
+    fields = []
+    for field_name, field in iteritems(cls._fields):
+        encode_field, decode_field = _field_codec(field)
+        fields.append((field_name, field.serialized_name or field_name,
+                       encode_field, decode_field))
+    bitmap_size = (len(fields) + 3) // 4
+
+    def encode(instance_or_dict, out):
+        data = instance_or_dict._data if isinstance(instance_or_dict, Model) else instance_or_dict
+        start = len(out)
+        out += bytearray(bitmap_size)
+        for position, (field_name, key, encode_field, decode_field) in enumerate(fields):
+            value = data.get(field_name, Undefined)
+            if value is None:
+                out[start + (position >> 2)] |= 1 << ((position & 3) << 1)
+            elif value is not Undefined:
+                out[start + (position >> 2)] |= 2 << ((position & 3) << 1)
+                encode_field(value, out)
+
+    def decode(data, offset):
+        bitmap, offset = _read_bitmap(data, offset, bitmap_size)
+        values = {}
+        for position, (field_name, key, encode_field, decode_field) in enumerate(fields):
+            state = bitmap[position >> 2] >> ((position & 3) << 1) & 3
+            if state == 1:
+                values[key] = None
+            elif state:
+                values[key], offset = decode_field(data, offset)
+        return cls._from_native(values), offset
+
+    codec = _model_codecs[cls] = encode, decode, fields
+    return codec
+
+
+def _field_codec(field):
+    if isinstance(field, ModelType):
+        return _model_field_codec(field)
+    elif isinstance(field, PolyModelType):
+        return _poly_model_codec(field)
+    elif isinstance(field, ListType):
+        return _list_codec(field)
+    elif isinstance(field, DictType):
+        return _dict_codec(field)
+    elif isinstance(field, BooleanType):
+        return _struct_codec(_bool)
+    elif isinstance(field, (IntType, LongType)):
+        return _struct_codec(_int)
+    elif isinstance(field, FloatType):
+        return _struct_codec(_float)
+    elif isinstance(field, DecimalType):
+        return _decimal_codec
+    elif isinstance(field, DateTimeType):
+        return _datetime_codec(field)
+    elif isinstance(field, DateType):
+        return _date_codec
+    elif isinstance(field, UUIDType):
+        return _uuid_codec
+    elif isinstance(field, StringType):
+        return _string_codec
+    elif field.is_compound:
+        raise TypeError('Cannot encode %s fields' % type(field).__name__)
+    else:
+        return _json_codec(field)
+
+
+def _struct_codec(packer):
+    pack, unpack_from, size = packer.pack, packer.unpack_from, packer.size
+
+    def encode(value, out):
+        out += pack(value)
+
+    def decode(data, offset):
+        return unpack_from(data, offset)[0], offset + size
+
+    return encode, decode
+
+
+def _encode_bytes(value, out):
+    out += _size.pack(len(value))
+    out += value
+
+
+def _decode_bytes(data, offset):
+    length = _size.unpack_from(data, offset)[0]
+    offset += _size.size
+    end = offset + length
+    if end > len(data):
+        raise struct.error('string of %d bytes exceeds the buffer' % length)
+    return bytes(data[offset:end]), end
+
+
+def _encode_string(value, out):
+    _encode_bytes(value.encode('utf-8'), out)
+
+
+def _decode_string(data, offset):
+    value, offset = _decode_bytes(data, offset)
+    return value.decode('utf-8'), offset
+
+
+_string_codec = _encode_string, _decode_string
+
+
+def _encode_decimal(value, out):
+    _encode_string(str(value), out)
+
+
+def _decode_decimal(data, offset):
+    value, offset = _decode_string(data, offset)
+    return decimal.Decimal(value), offset
+
+
+_decimal_codec = _encode_decimal, _decode_decimal
+
+
+def _encode_uuid(value, out):
+    out += value.bytes
+
+
+def _decode_uuid(data, offset):
+    end = offset + 16
+    if end > len(data):
+        raise struct.error('UUID exceeds the buffer')
+    return uuid.UUID(bytes=bytes(data[offset:end])), end
+
+
+_uuid_codec = _encode_uuid, _decode_uuid
+
+
+def _encode_date(value, out):
+    out += _date.pack(value.toordinal())
+
+
+def _decode_date(data, offset):
+    return datetime.date.fromordinal(_date.unpack_from(data, offset)[0]), offset + _date.size
+
+
+_date_codec = _encode_date, _decode_date
+
+
+def _datetime_codec(field):
+    utc = field.UTC
+    epoch = field.EPOCH
+    offset_timezone = field.offset_timezone
+
+    def encode(value, out):
+        offset = value.utcoffset()
+        if offset is None:
+            delta = value - _EPOCH
+            seconds = _NAIVE
+        else:
+            delta = value - epoch
+            seconds = offset.days * 86400 + offset.seconds
+        micros = (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+        out += _datetime.pack(micros, seconds)
+
+    def decode(data, offset):
+        micros, seconds = _datetime.unpack_from(data, offset)
+        offset += _datetime.size
+        delta = datetime.timedelta(microseconds=micros)
+        if seconds == _NAIVE:
+            return _EPOCH + delta, offset
+        value = epoch + delta
+        if seconds:
+            value = value.astimezone(offset_timezone(minutes=seconds / 60))
+        return value, offset
+
+    return encode, decode
+
+
+def _json_codec(field):
+
+    def encode(value, out):
+        _encode_string(json.dumps(field.to_primitive(value)), out)
+
+    def decode(data, offset):
+        value, offset = _decode_string(data, offset)
+        return field.to_native(json.loads(value)), offset
+
+    return encode, decode
+
+
+def _model_field_codec(field):
+    # Looked up on use, since the model class may be the one being compiled.
+    def encode(value, out):
+        _model_codec(field.model_class)[0](value, out)
+
+    def decode(data, offset):
+        return _model_codec(field.model_class)[1](data, offset)
+
+    return encode, decode
+
+
+def _poly_model_codec(field):
+
+    def encode(value, out):
+        try:
+            index = field.model_classes.index(type(value))
+        except ValueError:
+            raise TypeError('Cannot encode %s instances in a PolyModelType for %s'
+                            % (type(value).__name__,
+                               ', '.join(m.__name__ for m in field.model_classes)))
+        out += _index.pack(index)
+        _model_codec(type(value))[0](value, out)
+
+    def decode(data, offset):
+        index = _index.unpack_from(data, offset)[0]
+        return _model_codec(field.model_classes[index])[1](data, offset + _index.size)
+
+    return encode, decode
+
+
+def _list_codec(field):
+    encode_item, decode_item = _field_codec(field.field)
+
+    def encode(value, out):
+        out += _size.pack(len(value))
+        start = len(out)
+        out += bytearray((len(value) + 7) // 8)
+        for index, item in enumerate(value):
+            if item is not None:
+                out[start + (index >> 3)] |= 1 << (index & 7)
+                encode_item(item, out)
+
+    def decode(data, offset):
+        count = _size.unpack_from(data, offset)[0]
+        bitmap, offset = _read_bitmap(data, offset + _size.size, (count + 7) // 8)
+        items = []
+        for index in range(count):
+            if bitmap[index >> 3] >> (index & 7) & 1:
+                item, offset = decode_item(data, offset)
+                items.append(item)
+            else:
+                items.append(None)
+        return items, offset
+
+    return encode, decode
+
+
+def _dict_codec(field):
+    encode_item, decode_item = _field_codec(field.field)
+    coerce_key = field.coerce_key
+
+    def encode(value, out):
+        out += _size.pack(len(value))
+        start = len(out)
+        out += bytearray((len(value) + 7) // 8)
+        for index, (key, item) in enumerate(iteritems(value)):
+            _encode_string(key if isinstance(key, type(u'')) else u'%s' % key, out)
+            if item is not None:
+                out[start + (index >> 3)] |= 1 << (index & 7)
+                encode_item(item, out)
+
+    def decode(data, offset):
+        count = _size.unpack_from(data, offset)[0]
+        bitmap, offset = _read_bitmap(data, offset + _size.size, (count + 7) // 8)
+        items = {}
+        for index in range(count):
+            key, offset = _decode_string(data, offset)
+            if bitmap[index >> 3] >> (index & 7) & 1:
+                items[coerce_key(key)], offset = decode_item(data, offset)
+            else:
+                items[coerce_key(key)] = None
+        return items, offset
+
+    return encode, decode
+
+
+def _read_bitmap(data, offset, size):
+    """
+    Returns the ``size`` bytes of the bitmap at ``offset`` as a ``bytearray``,
+    where bit ``i`` is bit ``i % 8`` of byte ``i // 8``, and the offset after
+    it.
+    """
+    end = offset + size
+    if end > len(data):
+        raise struct.error('bitmap exceeds the buffer')
+    return bytearray(data[offset:end]), end
@@ -1,11 +1,42 @@
 """This module contains fields that depend on importing `bson`. `bson` is
 a part of the pymongo distribution.
+
+It also converts between models and BSON documents. ``from_bson`` and
+``decode_many`` create instances from documents as returned by a driver,
+from ``RawBSONDocument`` objects or from raw BSON bytes, such as the batches
+of ``find_raw_batches``::
+
+    for batch in collection.find_raw_batches():
+        for person in decode_many(Person, batch):
+            ...
+
+``encode_many`` does the opposite for bulk inserts::
+
+    collection.insert_many(encode_many(Person, people))
+
+Values that BSON can hold as they are, such as ``ObjectId``, ``datetime``
+and ``Decimal128``, are passed through without being converted to strings
+and parsed again.
 """
+import datetime
+import uuid
 
-from schematics.types import BaseType
-from schematics.exceptions import ConversionError, ValidationError
+from six import iteritems
+
+from schematics.common import PRIMITIVE
+from schematics.models import Model # must precede the compound types and transforms
+from schematics.types import BaseType, DateTimeType, DecimalType, UUIDType
+from schematics.types.compound import ModelType, ListType, DictType
+from schematics.exceptions import BaseError, ConversionError, ValidationError
+from schematics.transforms import (ExportConverter, export_loop, get_import_context,
+                                   _export_context, _inherits)
+from schematics.undefined import Undefined
+from schematics.util import listify
 
 import bson
+from bson.binary import Binary
+from bson.decimal128 import Decimal128
+from bson.raw_bson import RawBSONDocument
 
 try:
     unicode #PY2
@@ -13,6 +44,16 @@ except:
     import codecs
     unicode = str #PY3
 
+try:
+    _decode, _decode_iter, _encode = bson.decode, bson.decode_iter, bson.encode
+except AttributeError: # pymongo < 3.9
+    _decode = lambda data, codec_options: bson.BSON(data).decode(codec_options)
+    _decode_iter = bson.decode_iter
+    _encode = bson.BSON.encode
+
+_UUID_SUBTYPE = 4
+
+
 class ObjectIdType(BaseType):
 
     """An field wrapper around MongoDB ObjectIds.  It is correct to say they're
@@ -32,6 +73,8 @@ class ObjectIdType(BaseType):
 
     def to_native(self, value, context=None):
         if not isinstance(value, bson.objectid.ObjectId):
+            if isinstance(value, bytes) and len(value) == 12:
+                return bson.objectid.ObjectId(value)
             try:
                 value = bson.objectid.ObjectId(unicode(value))
             except bson.objectid.InvalidId:
@@ -41,3 +84,255 @@ class ObjectIdType(BaseType):
     def to_primitive(self, value, context=None):
         return str(value)
 
+
+def from_bson(cls, document, codec_options=bson.DEFAULT_CODEC_OPTIONS):
+    """
+    Creates an instance of ``cls`` from a BSON document, given as a mapping,
+    a ``RawBSONDocument`` or bytes.
+
+    The result is the same as ``cls(document, strict=False)``. Keys that do
+    not belong to a field, such as an ``_id`` that is not mapped, are ignored.
+
+    :param codec_options:
+        The ``CodecOptions`` used to decode raw documents, for instance to
+        get time zone aware datetimes.
+    """
+    if isinstance(document, RawBSONDocument):
+        document = document.raw
+    if isinstance(document, bytes):
+        document = _decode(document, codec_options)
+    try:
+        return _model_decoder(cls)(document)
+    except (BaseError, TypeError, ValueError):
+        # Let the import loop report the errors in the usual form.
+        return cls(document, strict=False)
+
+
+def decode_many(cls, documents, codec_options=bson.DEFAULT_CODEC_OPTIONS):
+    """
+    Generates an instance of ``cls`` for each document of ``documents``,
+    either an iterable of documents or bytes holding a sequence of BSON
+    documents, such as a batch of ``find_raw_batches``.
+    """
+    if isinstance(documents, bytes):
+        documents = _decode_iter(documents, codec_options)
+    for document in documents:
+        yield from_bson(cls, document, codec_options)
+
+
+def to_bson(cls, instance_or_dict, role=None, app_data=None):
+    """
+    Encodes a model instance, or a dict of native values, as BSON bytes.
+    """
+    return next(_encode_many(cls, [instance_or_dict], role, app_data))
+
+
+def encode_many(cls, instances_or_dicts, role=None, app_data=None):
+    """
+    Generates a ``RawBSONDocument`` for each item of ``instances_or_dicts``.
+    The documents can be passed to ``insert_many`` without being encoded
+    again.
+    """
+    for data in _encode_many(cls, instances_or_dicts, role, app_data):
+        yield RawBSONDocument(data)
+
+
+class BSONExportConverter(ExportConverter):
+
+    """Exports the primitive form of every field, except for values that BSON
+    holds natively: ObjectIds and datetimes are kept, decimals become
+    ``Decimal128`` and UUIDs binary values of the standard UUID subtype. The
+    same applies to the items of lists and dicts.
+    """
+
+    def __init__(self):
+        super(BSONExportConverter, self).__init__(PRIMITIVE, [ObjectIdType, DateTimeType])
+
+    def __call__(self, field, value, context):
+        if isinstance(field, DecimalType):
+            return Decimal128(value)
+        if isinstance(field, UUIDType):
+            return Binary(value.bytes, _UUID_SUBTYPE)
+        if isinstance(field, (ListType, DictType)):
+            return self._export_items(field, value, context)
+        return super(BSONExportConverter, self).__call__(field, value, context)
+
+    def _export_items(self, field, value, context):
+        # The standard list and dict exports give their items the primitive
+        # form, bypassing the converter.
+        if value is None:
+            return None
+        item_field = field.field
+        if isinstance(field, ListType):
+            return [self._export_item(item_field, item, context) for item in value]
+        return dict((key, self._export_item(item_field, item, context))
+                    for key, item in iteritems(value))
+
+    def _export_item(self, field, value, context):
+        if value is None:
+            return None
+        if field.is_compound and not isinstance(field, (ListType, DictType)):
+            # Models are exported with this converter by their own export loop.
+            return field.export(value, PRIMITIVE, context)
+        return self(field, value, context)
+
+
+bson_export_converter = BSONExportConverter()
+
+
+def _encode_many(cls, instances_or_dicts, role, app_data):
+    context = _export_context(None, bson_export_converter, role, True, None, None, app_data)
+    for instance_or_dict in instances_or_dicts:
+        yield _encode(export_loop(cls, instance_or_dict, context=context))
+
+
+_model_decoders = {}
+
+
+def _model_decoder(cls):
+    """
+    Returns a function that converts a decoded document into an instance of
+    ``cls`` and raises a conversion error on invalid values, compiling it on
+    first use.
+    """
+    try:
+        return _model_decoders[cls]
+    except KeyError:
+        pass
+
+    if not _inherits(cls, Model, '__new__', '__init__', 'convert'):
+        decode = _model_decoders[cls] = lambda document: cls(document, strict=False)
+        return decode
+
+    fields = []
+    for field_name, field in iteritems(cls._fields):
+        keys = listify(field.deserialize_from)
+        if field.serialized_name:
+            keys.append(field.serialized_name)
+        keys.append(field_name)
+        fields.append((field_name, field, keys, _field_decoder(field)))
+
+    def decode(document):
+        data = {}
+        for field_name, field, keys, decode_field in fields:
+            value = Undefined
+            for key in keys:
+                if key in document:
+                    value = document[key]
+            if value is Undefined:
+                value = field.default
+                if value is Undefined:
+                    value = None
+            if value is not None:
+                value = decode_field(value)
+            data[field_name] = value
+        instance = cls.__new__(cls)
+        instance._initial = document
+        instance._data = data
+        return instance
+
+    _model_decoders[cls] = decode
+    return decode
+
+
+def _field_decoder(field):
+    if isinstance(field, ObjectIdType):
+        return _object_id_decoder(field)
+    elif isinstance(field, DateTimeType):
+        return _datetime_decoder(field)
+    elif isinstance(field, DecimalType):
+        return _decimal_decoder(field)
+    elif isinstance(field, UUIDType):
+        return _uuid_decoder(field)
+    elif isinstance(field, ModelType):
+        return _model_field_decoder(field)
+    elif isinstance(field, ListType):
+        return _list_decoder(field)
+    elif isinstance(field, DictType):
+        return _dict_decoder(field)
+    elif field.is_compound:
+        context = get_import_context(new=True, partial=True, init_values=True,
+                                     apply_defaults=True)
+        return lambda value: field.convert(value, context)
+    else:
+        return lambda value: field.convert(value, None)
+
+
+def _object_id_decoder(field):
+    to_native = field.to_native
+
+    def decode(value):
+        if value.__class__ is bson.objectid.ObjectId:
+            return value
+        return to_native(value)
+
+    return decode
+
+
+def _datetime_decoder(field):
+    to_native = field.to_native
+    if field.tzd != 'allow' or field.convert_tz or field.drop_tzinfo:
+        return to_native
+
+    def decode(value):
+        if value.__class__ is datetime.datetime:
+            return value
+        return to_native(value)
+
+    return decode
+
+
+def _decimal_decoder(field):
+    to_native = field.to_native
+
+    def decode(value):
+        if value.__class__ is Decimal128:
+            return value.to_decimal()
+        return to_native(value)
+
+    return decode
+
+
+def _uuid_decoder(field):
+    to_native = field.to_native
+
+    def decode(value):
+        if isinstance(value, Binary) and value.subtype == _UUID_SUBTYPE:
+            return uuid.UUID(bytes=bytes(value))
+        return to_native(value)
+
+    return decode
+
+
+def _model_field_decoder(field):
+    # Looked up on use, since the model class may be the one being compiled.
+    def decode(value):
+        if not isinstance(value, dict):
+            raise ConversionError(u'Please use a mapping for this field.')
+        return _model_decoder(field.model_class)(value)
+
+    return decode
+
+
+def _list_decoder(field):
+    decode_item = _field_decoder(field.field)
+
+    def decode(value):
+        if not isinstance(value, list):
+            raise ConversionError(u'Could not interpret the value as a list')
+        return [None if item is None else decode_item(item) for item in value]
+
+    return decode
+
+
+def _dict_decoder(field):
+    decode_item = _field_decoder(field.field)
+    coerce_key = field.coerce_key
+
+    def decode(value):
+        if not isinstance(value, dict):
+            raise ConversionError(u'Only dictionaries may be used in a DictType')
+        return dict((coerce_key(key), None if item is None else decode_item(item))
+                    for key, item in iteritems(value))
+
+    return decode
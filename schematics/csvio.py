@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+"""
+Reading and writing models as CSV.
+
+Each row holds one model instance. The columns are the keys produced by
+``flatten``: nested models are spread over one column per field
+(``author.name``) and lists over one column per item, up to a fixed number of
+items (``tags.0``, ``tags.1``). Values that have no fixed shape, such as the
+contents of a ``DictType``, a ``PolyModelType`` or a field that refers back
+to an enclosing model, are kept in a single column as a JSON object of their
+flattened keys.
+
+Both functions process one row at a time, so files of any size can be
+converted in constant memory::
+
+    with open('people.csv', 'w') as f:
+        write_csv(Person, people, f, list_width=3)
+
+    with open('people.csv') as f:
+        for person in read_csv(Person, f):
+            ...
+
+Empty cells are read as missing values, so an empty string is read back as
+``None``, and empty lists or models are not written at all.
+"""
+import csv
+import json
+
+import six
+from six import iteritems
+
+from .models import Model # must precede the transforms
+from .transforms import iter_flatten_model, _inherits, EMPTY_LIST, EMPTY_DICT, expand
+from .types.compound import ModelType, ListType, DictType
+
+
+def csv_header(cls, list_width=1):
+    """
+    Returns the column names of ``cls`` with lists expanded to
+    ``list_width`` items.
+    """
+    return [name for name, opaque, imported in _columns(cls, list_width)]
+
+
+def write_csv(cls, instances, fp, list_width=1, role=None, app_data=None, dialect='excel'):
+    """
+    Writes a header row followed by one row per instance to the file ``fp``.
+    Returns the number of instances written.
+
+    :param cls:
+        The model definition.
+    :param instances:
+        An iterable of model instances or dicts. It is consumed lazily.
+    :param list_width:
+        The number of columns for each list. A list with more items raises
+        a ``ValueError``.
+    :param role:
+        The role used to filter the exported fields.
+    :param dialect:
+        The ``csv`` dialect of the file.
+    """
+    columns = _columns(cls, list_width)
+    positions = {}
+    owners = {}
+    for position, (name, opaque, imported) in enumerate(columns):
+        (owners if opaque else positions)[name] = position
+
+    writer = csv.writer(fp, dialect=dialect)
+    writer.writerow([_encode(name) for name, opaque, imported in columns])
+
+    count = 0
+    for instance in instances:
+        row = [''] * len(columns)
+        groups = {}
+        for key, value in iter_flatten_model(cls, instance, role=role, app_data=app_data):
+            position = positions.get(key)
+            if position is not None:
+                row[position] = _encode(value)
+                continue
+            owner, subkey = _owner(key, owners)
+            if owner is not None:
+                groups.setdefault(owner, {})[subkey] = value
+            elif value not in (EMPTY_LIST, EMPTY_DICT):
+                raise ValueError('No column for %r in %s rows with list_width=%d'
+                                 % (key, cls.__name__, list_width))
+        for owner, group in iteritems(groups):
+            row[owners[owner]] = _encode(json.dumps(group, sort_keys=True))
+        writer.writerow(row)
+        count += 1
+    return count
+
+
+def read_csv(cls, fp, dialect='excel', **kwargs):
+    """
+    Generates a model instance for each row of the file ``fp``. The file
+    must start with a header row as written by ``write_csv``; its columns may
+    be in any order or a subset of the model's columns.
+
+    Cells are passed to the model as strings and converted by the field types.
+    Additional keyword arguments are passed to the model constructor.
+    """
+    reader = csv.reader(fp, dialect=dialect)
+    try:
+        header = [_decode(name) for name in next(reader)]
+    except StopIteration:
+        return
+
+    width = 1
+    for name in header:
+        for part in name.split('.'):
+            if part.isdigit():
+                width = max(width, int(part) + 1)
+    known = dict((name, (opaque, imported))
+                 for name, opaque, imported in _columns(cls, width))
+    layout = []
+    for position, name in enumerate(header):
+        if name not in known:
+            raise ValueError('Unknown column %r for %s' % (name, cls.__name__))
+        opaque, imported = known[name]
+        if imported:
+            layout.append((position, name, opaque))
+
+    for row in reader:
+        flat = []
+        for position, name, opaque in layout:
+            cell = _decode(row[position]) if position < len(row) else ''
+            if cell == '':
+                continue
+            if opaque:
+                group = json.loads(cell)
+                if not isinstance(group, dict):
+                    raise ValueError('Column %r must hold a JSON object' % name)
+                for subkey, value in iteritems(group):
+                    flat.append((u'%s.%s' % (name, subkey) if subkey else name, value))
+            else:
+                flat.append((name, cell))
+        yield cls(_model_lists(cls, expand(flat)), **kwargs)
+
+
+def _columns(cls, list_width):
+    """
+    Returns a list of ``(name, opaque, imported)`` for the columns of ``cls``.
+    ``opaque`` columns hold JSON objects; serializables are not ``imported``.
+    """
+    columns = []
+    _model_columns(cls, None, list_width, (), True, columns)
+    return columns
+
+
+def _model_columns(cls, prefix, list_width, seen, imported, columns):
+    seen += (cls,)
+    for name, field in iteritems(cls._fields):
+        _field_columns(field, _join(prefix, field.serialized_name or name),
+                       list_width, seen, imported, columns)
+    for name, serializable in iteritems(cls._serializables):
+        _field_columns(serializable.type, _join(prefix, serializable.serialized_name or name),
+                       list_width, seen, False, columns)
+
+
+def _field_columns(field, name, list_width, seen, imported, columns):
+    if isinstance(field, ModelType) and _inherits(field, ModelType, 'export') \
+            and field.model_class not in seen:
+        _model_columns(field.model_class, name, list_width, seen, imported, columns)
+    elif isinstance(field, ListType) and _inherits(field, ListType, 'export'):
+        for index in range(list_width):
+            _field_columns(field.field, _join(name, index), list_width, seen, imported, columns)
+    else:
+        columns.append((name, field.is_compound, imported))
+
+
+def _model_lists(cls, data):
+    """
+    Replaces the dicts that ``expand`` builds for list columns in ``data``
+    with lists ordered by their integer index.
+    """
+    for name, field in iteritems(cls._fields):
+        key = field.serialized_name or name
+        if key in data:
+            data[key] = _field_lists(field, data[key])
+    return data
+
+
+def _field_lists(field, value):
+    if isinstance(field, ModelType):
+        if isinstance(value, dict):
+            _model_lists(field.model_class, value)
+    elif isinstance(field, ListType):
+        if isinstance(value, dict) and all(key.isdigit() for key in value):
+            value = [value[key] for key in sorted(value, key=int)]
+        if isinstance(value, list):
+            value = [_field_lists(field.field, item) for item in value]
+    elif isinstance(field, DictType):
+        if isinstance(value, dict):
+            for key, item in iteritems(value):
+                value[key] = _field_lists(field.field, item)
+    return value
+
+
+def _join(prefix, name):
+    return u'%s.%s' % (prefix, name) if prefix is not None else name
+
+
+def _owner(key, owners):
+    """
+    Finds the opaque column that ``key`` belongs to and returns it with the
+    rest of the key, or ``(None, None)``.
+    """
+    head = key
+    while True:
+        if head in owners:
+            return head, key[len(head) + 1:]
+        dot = head.rfind('.')
+        if dot < 0:
+            return None, None
+        head = head[:dot]
+
+
+if six.PY2:
+    def _encode(value):
+        if isinstance(value, unicode):
+            return value.encode('utf-8')
+        return value
+
+    def _decode(cell):
+        return cell.decode('utf-8')
+else:
+    def _encode(value):
+        return value
+
+    def _decode(cell):
+        return cell
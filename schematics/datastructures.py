@@ -1,19 +1,30 @@
+import itertools
 from collections import namedtuple
 from copy import deepcopy
+from operator import itemgetter
 from six.moves import zip
 from six import iteritems
 from six import PY3
 
-_missing = object()
+try:
+    from collections import OrderedDict as _OrderedDict
+except ImportError: #PY26
+    from ordereddict import OrderedDict as _OrderedDict
 
+try:
+    from functools import cmp_to_key
+except ImportError: #PY26
+    cmp_to_key = None
 
-class OrderedDict(dict):
 
-    """Simple ordered dict implementation.
+class OrderedDict(_OrderedDict):
 
-    It's a dict subclass and provides some list functions.  The implementation
-    of this class is inspired by the implementation of Babel but incorporates
-    some ideas from the `ordereddict`_ and Django's ordered dict.
+    """Ordered dict implementation based on ``collections.OrderedDict``.
+
+    Insertion, lookup and deletion are O(1). In addition to the standard
+    interface, the class offers the Python 2 style methods ``iterkeys``,
+    ``itervalues`` and ``iteritems`` on all Python versions, and it can be
+    sorted like a list.
 
     The constructor and `update()` both accept iterables of tuples as well as
     mappings:
@@ -45,7 +56,9 @@ class OrderedDict(dict):
     OrderedDict([('a', 'b'), ('c', 'd'), ('foo', 'bar'), ('spam', ['eggs'])])
 
     All iteration methods as well as `keys`, `values` and `items` return
-    the values ordered by the the time the key-value pair is inserted:
+    the values ordered by the the time the key-value pair is inserted.
+    `keys`, `values` and `items` return lists; the ``iter*`` methods return
+    lazy iterators and should be preferred in loops:
 
     >>> d.keys()
     ['a', 'c', 'foo', 'spam']
@@ -60,6 +73,8 @@ class OrderedDict(dict):
     >>> list(d.iteritems())
     [('a', 'b'), ('c', 'd'), ('foo', 'bar'), ('spam', [])]
 
+    `popitem` removes the first item rather than the last one.
+
     You can sort the OrderedDict like a list:
 
     >>> d.sort(key=lambda x: x[0].lower())
@@ -68,115 +83,68 @@ class OrderedDict(dict):
 
     For performance reasons the ordering is not taken into account when
     comparing two ordered dicts.
-
-    .. _ordereddict: http://www.xs4all.nl/~anthon/Python/ordereddict/
     """
 
-    def __init__(self, *args, **kwargs):
-        super(OrderedDict, self).__init__()
-        self._keys = []
-        self.update(*args, **kwargs)
-
-    def __delitem__(self, key):
-        super(OrderedDict, self).__delitem__(key)
-        self._keys.remove(key)
-
-    def __setitem__(self, key, item):
-        if key not in self:
-            if hasattr(self, '_keys'):
-                self._keys.append(key)
-            else:
-                self._keys = [key]
-        super(OrderedDict, self).__setitem__(key, item)
-
     def __deepcopy__(self, memo):
         memo[id(self)] = new_od = self.__class__()
-        new_od.__init__(deepcopy(self.items(), memo))
+        new_od.update(deepcopy(self.items(), memo))
         return new_od
 
-    def __reversed__(self):
-        return reversed(self._keys)
+    def __eq__(self, other):
+        return dict.__eq__(self, other)
 
-    @classmethod
-    def fromkeys(cls, iterable, default=None):
-        return cls((key, default) for key in iterable)
+    def __ne__(self, other):
+        return dict.__ne__(self, other)
 
-    def clear(self):
-        del self._keys[:]
-        super(OrderedDict, self).clear()
+    __hash__ = None
 
-    def copy(self):
-        return self.__class__(self)
+    if PY3:
+        def iterkeys(self):
+            return iter(self)
 
-    def items(self):
-        return list(zip(self._keys, self.values()))
+        def itervalues(self):
+            return iter(_OrderedDict.values(self))
 
-    def iteritems(self):
-        return list(zip(self._keys, self.itervalues()))
+        def iteritems(self):
+            return iter(_OrderedDict.items(self))
+    else:
+        iterkeys = _OrderedDict.iterkeys
+        itervalues = _OrderedDict.itervalues
+        iteritems = _OrderedDict.iteritems
 
     def keys(self):
-        return self._keys[:]
+        return list(self.iterkeys())
 
-    def iterkeys(self):
-        return iter(self._keys)
+    def values(self):
+        return list(self.itervalues())
 
-    def pop(self, key, default=_missing):
-        if key not in self:
-            if default is _missing:
-                raise KeyError(key)
-            return default
-        self._keys.remove(key)
-        return super(OrderedDict, self).pop(key, default)
+    def items(self):
+        return list(self.iteritems())
 
     def popitem(self):
-        if not self._keys:
+        if not self:
             raise KeyError('popitem(): dictionary is empty')
-        return self._keys[0], self.pop(self._keys[0])
-
-    def setdefault(self, key, default=None):
-        if key not in self:
-            self._keys.append(key)
-        return super(OrderedDict, self).setdefault(key, default)
-
-    def update(self, *args, **kwargs):
-        sources = []
-        if len(args) == 1:
-            if isinstance(args[0], dict):
-                sources.append(iteritems(args[0]))
-            # if hasattr(args[0], 'iteritems'):
-            #     sources.append(args[0].iteritems())
-            else:
-                sources.append(iter(args[0]))
-        elif args:
-            raise TypeError('expected at most one positional argument')
-        if kwargs:
-            sources.append(iteritems(kwargs))
-        for iterable in sources:
-            for key, val in iterable:
-                self[key] = val
-
-    def values(self):
-        return [self.get(key) for key in self._keys]
-
-    def itervalues(self):
-        return (self.get(key) for key in self._keys)
+        return _OrderedDict.popitem(self, last=False)
 
     def sort(self, cmp=None, key=None, reverse=False):
+        items = self.items()
         if key is not None:
-            self._keys.sort(key=lambda k: key((k, self[k])))
+            items.sort(key=key)
         elif cmp is not None:
-            self._keys.sort(lambda a, b: cmp((a, self[a]), (b, self[b])))
+            if cmp_to_key is None:
+                items.sort(cmp=cmp)
+            else:
+                items.sort(key=cmp_to_key(cmp))
         else:
-            self._keys.sort()
+            items.sort(key=itemgetter(0))
         if reverse:
-            self._keys.reverse()
+            items.reverse()
+        _OrderedDict.clear(self)
+        _OrderedDict.update(self, items)
 
     def __repr__(self):
         return '%s(%r)' % (type(self).__name__, self.items())
 
-    __copy__ = copy
-    __iter__ = iterkeys
-
 
 class DataObject(object):
     """
@@ -314,3 +282,241 @@ class Context(DataObject):
 
     __nonzero__ = __bool__
 
+
+class ConversionContext(Context):
+    """
+    A ``Context`` for the conversion loops that keeps the standard options in
+    slots, so reading an option is a plain attribute access.
+
+    ``_branch`` does not copy anything: it creates a child context that stores
+    only the overridden options and refers to its parent for the rest. Values
+    read through the parent are cached in the child's slots on first access.
+
+    Names other than the standard options are stored in the instance dict, and
+    the full ``Context`` interface is available. ``_setdefaults`` fills in
+    missing options in place. A context without a parent keeps the names of
+    the options it has set in ``_names``, so that it can tell them apart
+    without looking up the slots that are empty.
+    """
+
+    OPTIONS = (
+        'initialized', 'field_converter', 'mapping', 'partial', 'strict',
+        'init_values', 'apply_defaults', 'convert', 'validate', 'new',
+        'max_errors', 'app_data', 'role', 'raise_error_on_role', 'export_level',
+        'tracer', 'trace_path', 'source', 'fields', 'exclude', 'slices',
+        'totals', 'slice_path', 'memo', 'max_depth', 'depth', 'stub',
+    )
+
+    __slots__ = ('_parent', '_names') + OPTIONS
+
+    def __init__(self, *args, **kwargs):
+        object.__setattr__(self, '_parent', None)
+        object.__setattr__(self, '_names', set())
+        source = args[0] if args else {}
+        self._update(source, **kwargs)
+
+    @classmethod
+    def _make(cls, obj):
+        if obj is None:
+            return cls()
+        elif isinstance(obj, cls):
+            return obj
+        else:
+            return cls(obj)
+
+    def __getattr__(self, name):
+        # Only reached when the attribute has not been found on this instance.
+        try:
+            parent = object.__getattribute__(self, '_parent')
+        except AttributeError:
+            parent = None
+        if parent is None or name.startswith('__'):
+            raise AttributeError(name)
+        try:
+            value = parent._lookup(name)
+        except KeyError:
+            raise AttributeError(name)
+        if name in self._option_set:
+            object.__setattr__(self, name, value)
+        return value
+
+    def _lookup(self, name):
+        context = self
+        is_option = name in self._option_set
+        while context is not None:
+            try:
+                if is_option:
+                    return object.__getattribute__(context, name)
+                else:
+                    return context.__dict__[name]
+            except (AttributeError, KeyError):
+                context = object.__getattribute__(context, '_parent')
+        raise KeyError(name)
+
+    def _own_items(self):
+        for name in self.OPTIONS:
+            try:
+                yield name, object.__getattribute__(self, name)
+            except AttributeError:
+                pass
+        for item in self.__dict__.items():
+            yield item
+
+    def _to_flat_dict(self):
+        parent = self._parent
+        d = parent._to_flat_dict() if parent is not None else {}
+        d.update(self._own_items())
+        return d
+
+    def __setattr__(self, name, value):
+        if name in self:
+            raise TypeError("Field '{0}' already set".format(name))
+        self._set(name, value)
+
+    def _set(self, name, value):
+        object.__setattr__(self, name, value)
+        if self._parent is None and name in self._option_set:
+            self._names.add(name)
+
+    def _update(self, source=None, **kwargs):
+        if isinstance(source, ConversionContext):
+            source = source._to_flat_dict()
+        elif isinstance(source, DataObject):
+            source = source.__dict__
+        if isinstance(source, dict):
+            source = source.items()
+        for name, value in itertools.chain(source or (), kwargs.items()):
+            self._set(name, value)
+
+    def _setdefaults(self, source):
+        if isinstance(source, ConversionContext):
+            source = source._to_flat_dict()
+        elif not isinstance(source, dict):
+            source = source.__dict__
+        if self._parent is not None:
+            for name, value in source.items():
+                if name not in self:
+                    object.__setattr__(self, name, value)
+            return self
+        names = self._names
+        options = self._option_set.intersection(source)
+        for name in options.difference(names):
+            object.__setattr__(self, name, source[name])
+        names.update(options)
+        if len(options) < len(source):
+            own = self.__dict__
+            for name, value in source.items():
+                if name not in options and name not in own:
+                    own[name] = value
+        return self
+
+    def _branch(self, **kwargs):
+        child = None
+        for name, value in kwargs.items():
+            if value is None or value == getattr(self, name, None):
+                continue
+            if child is None:
+                child = object.__new__(self.__class__)
+                object.__setattr__(child, '_parent', self)
+            object.__setattr__(child, name, value)
+        return self if child is None else child
+
+    def __repr__(self):
+        return self.__class__.__name__ + '(%s)' % repr(self._to_flat_dict())
+
+    def _copy(self):
+        return self.__class__(self._to_flat_dict())
+
+    __copy__ = _copy
+
+    def __reduce__(self):
+        return (self.__class__, (self._to_flat_dict(),))
+
+    def __eq__(self, other):
+        if isinstance(other, ConversionContext):
+            other = other._to_flat_dict()
+        elif isinstance(other, DataObject):
+            other = other.__dict__
+        else:
+            return False
+        return self._to_flat_dict() == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __iter__(self):
+        return iter(self._to_flat_dict().items())
+
+    def _to_dict(self):
+        d = self._to_flat_dict()
+        for k, v in d.items():
+            if isinstance(v, DataObject):
+                d[k] = v._to_dict()
+        return d
+
+    def __getitem__(self, key):
+        return self._lookup(key)
+
+    def __setitem__(self, key, value):
+        self._set(key, value)
+
+    def __delitem__(self, key):
+        try:
+            if key in self._option_set:
+                object.__delattr__(self, key)
+                if self._parent is None:
+                    self._names.discard(key)
+            else:
+                del self.__dict__[key]
+        except AttributeError:
+            raise KeyError(key)
+
+    def __len__(self):
+        return len(self._to_flat_dict())
+
+    def __contains__(self, key):
+        try:
+            self._lookup(key)
+        except KeyError:
+            return False
+        return True
+
+    def _clear(self):
+        for name, _ in list(self._own_items()):
+            del self[name]
+
+    def _get(self, key, default=None):
+        try:
+            return self._lookup(key)
+        except KeyError:
+            return default
+
+    def _items(self):
+        return self._to_flat_dict().items()
+
+    def _keys(self):
+        return self._to_flat_dict().keys()
+
+    def _pop(self, key, *args):
+        try:
+            value = self._lookup(key)
+        except KeyError:
+            if args:
+                return args[0]
+            raise
+        try:
+            del self[key]
+        except KeyError:
+            pass
+        return value
+
+    def _setdefault(self, key, default=None):
+        try:
+            return self._lookup(key)
+        except KeyError:
+            self[key] = default
+            return default
+
+ConversionContext._option_set = frozenset(ConversionContext.OPTIONS)
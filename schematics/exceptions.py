@@ -1,4 +1,5 @@
 from collections import Iterable
+import copy
 
 from six import iteritems
 
@@ -45,6 +46,46 @@ class ErrorMessage(object):
             return False
 
 
+_message_cache = {}
+_MESSAGE_CACHE_SIZE = 1024
+
+
+def _shared_message(error_type, summary):
+    """
+    Returns a shared ``ErrorMessage`` for the ``(error_type, summary)`` pair so that
+    repeated errors (e.g. the same failure on every item of a large list) don't
+    allocate a new message each time. The cache is bounded; it is cleared when
+    it is full. Shared messages must not be modified.
+    """
+    key = (error_type, summary)
+    message = _message_cache.get(key)
+    if message is None:
+        message = ErrorMessage(summary)
+        message.type = error_type
+        if len(_message_cache) >= _MESSAGE_CACHE_SIZE:
+            _message_cache.clear()
+        _message_cache[key] = message
+    return message
+
+
+def _typed_message(error_type, *args, **kwargs):
+    message = ErrorMessage(*args, **kwargs)
+    message.type = error_type
+    return message
+
+
+def _retyped_message(error_type, message):
+    """
+    Returns ``message`` with the type ``error_type``. Messages of another type
+    are copied rather than changed, since they may be shared or belong to
+    another error.
+    """
+    if message.type is not error_type:
+        message = copy.copy(message)
+        message.type = error_type
+    return message
+
+
 class BaseError(Exception):
     pass
 
@@ -59,8 +100,9 @@ class FieldError(BaseError):
             raise NotImplementedError("Please raise either ConversionError or ValidationError.")
         if len(args) == 0:
             raise TypeError("Please provide at least one error or error message.")
+        error_type = self.type or type(self)
         if kwargs:
-            items = [ErrorMessage(*args, **kwargs)]
+            items = [_typed_message(error_type, *args, **kwargs)]
         elif len(args) == 1:
             items = listify(args[0])
         else:
@@ -68,18 +110,17 @@ class FieldError(BaseError):
         self.messages = []
         for item in items:
             if isinstance(item, basestring):
-                self.messages.append(ErrorMessage(item))
+                self.messages.append(_shared_message(error_type, item))
             elif isinstance(item, tuple):
-                self.messages.append(ErrorMessage(*item))
+                self.messages.append(_typed_message(error_type, *item))
             elif isinstance(item, ErrorMessage):
-                self.messages.append(item)
+                self.messages.append(_retyped_message(error_type, item))
             elif isinstance(item, self.__class__):
-                self.messages.extend(item.messages)
+                self.messages.extend(_retyped_message(error_type, message)
+                                     for message in item.messages)
             else:
                 raise TypeError("'{0}()' object is neither a {1} nor an error message."\
                                 .format(type(item).__name__, type(self).__name__))
-        for message in self.messages:
-            message.type = self.type or type(self)
 
         Exception.__init__(self, self.messages)
 
@@ -149,6 +190,45 @@ class CompoundError(BaseError):
         Exception.__init__(self, self.messages)
 
 
+class _Truncated(str):
+    """
+    The type of ``TRUNCATED``, a string key that cannot collide with the keys
+    of the data: it is only equal to itself, although it is serialized, e.g.
+    by ``json.dumps``, as ``'__truncated__'``.
+    """
+
+    __slots__ = ()
+
+    def __new__(cls):
+        return str.__new__(cls, '__truncated__')
+
+    def __eq__(self, other):
+        return other is self
+
+    def __ne__(self, other):
+        return other is not self
+
+    __hash__ = object.__hash__
+
+    def __repr__(self):
+        return 'TRUNCATED'
+
+    def __reduce__(self):
+        return 'TRUNCATED'
+
+
+TRUNCATED = _Truncated()
+
+
+def truncation_error(max_errors):
+    """
+    Returns the marker stored under the ``TRUNCATED`` key of an error dictionary
+    once ``max_errors`` entries have been collected.
+    """
+    return ConversionError(u'Too many errors; stopped after {0}.'.format(max_errors),
+                           info=max_errors)
+
+
 class DataError(CompoundError):
 
     def __init__(self, messages, partial_data=None):
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+The JSON library behind ``Model.from_json`` and ``Model.to_json``.
+
+Libraries are registered under a name. By default the fastest one that is
+installed is used, in the order of ``PREFERENCE``, with the standard library
+``json`` module as the fallback. Another library can be selected with
+``use()`` or added with ``register()``::
+
+    jsonio.register('mine', mine.loads, mine.dumps, accepts_bytes=True)
+    jsonio.use('mine')
+
+Documents can be parsed from bytes or text. Bytes are handed to the parser
+as they are when it accepts them, and decoded as UTF-8 otherwise.
+"""
+import json
+import sys
+
+import six
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import rapidjson
+except ImportError:
+    rapidjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+try:
+    import simplejson
+except ImportError:
+    simplejson = None
+
+
+PREFERENCE = ['orjson', 'rapidjson', 'ujson', 'simplejson', 'json']
+
+
+class JSONLibrary(object):
+    """
+    A registered JSON library. ``loads`` parses text, or bytes if
+    ``accepts_bytes`` is set. ``dumps`` returns the document as text or as
+    UTF-8 bytes.
+    """
+
+    def __init__(self, name, loads, dumps, accepts_bytes=False):
+        self.name = name
+        self._loads = loads
+        self._dumps = dumps
+        self.accepts_bytes = accepts_bytes
+
+    def loads(self, data):
+        if isinstance(data, (bytes, bytearray, memoryview)) and not self.accepts_bytes:
+            data = bytes(data).decode('utf-8')
+        return self._loads(data)
+
+    def dumps(self, obj):
+        data = self._dumps(obj)
+        if isinstance(data, bytes) and not six.PY2:
+            data = data.decode('utf-8')
+        return data
+
+    def __repr__(self):
+        return '<JSONLibrary %s>' % self.name
+
+
+_libraries = {}
+_current = None
+
+
+def register(name, loads, dumps, accepts_bytes=False):
+    """
+    Registers a JSON library under ``name``, replacing any library of that
+    name. It becomes the one in use if it is the current one's name.
+    """
+    global _current
+    library = _libraries[name] = JSONLibrary(name, loads, dumps, accepts_bytes)
+    if _current is not None and _current.name == name:
+        _current = library
+    return library
+
+
+def use(name=None):
+    """
+    Selects the registered library ``name``, or the preferred installed one if
+    ``name`` is ``None``, and returns it.
+    """
+    global _current
+    if name is None:
+        name = next(name for name in PREFERENCE if name in _libraries)
+    try:
+        _current = _libraries[name]
+    except KeyError:
+        raise ValueError('No JSON library registered as %r' % name)
+    return _current
+
+
+def current():
+    """
+    Returns the ``JSONLibrary`` in use.
+    """
+    return _current
+
+
+def loads(data):
+    return _current.loads(data)
+
+
+def dumps(obj):
+    return _current.dumps(obj)
+
+
+def _compact_dumps(module):
+    def dumps(obj):
+        return module.dumps(obj, separators=(',', ':'))
+    return dumps
+
+
+# The standard library parses bytes since Python 3.6, detecting the encoding.
+register('json', json.loads, _compact_dumps(json),
+         accepts_bytes=six.PY2 or sys.version_info >= (3, 6))
+
+if simplejson is not None:
+    register('simplejson', simplejson.loads, _compact_dumps(simplejson),
+             accepts_bytes=True)
+
+if ujson is not None:
+    register('ujson', ujson.loads, ujson.dumps, accepts_bytes=True)
+
+if rapidjson is not None:
+    register('rapidjson', rapidjson.loads, rapidjson.dumps)
+
+if orjson is not None:
+    # Dict fields may have keys other than strings.
+    register('orjson', orjson.loads,
+             lambda obj: orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS),
+             accepts_bytes=True)
+
+use()
@@ -2,6 +2,7 @@
 
 from copy import deepcopy
 import inspect
+import operator
 import sys
 
 from six import iteritems
@@ -10,6 +11,7 @@ from six import add_metaclass
 
 from .common import *
 from .datastructures import OrderedDict as OrderedDictWithSort
+from . import jsonio
 from .exceptions import (
     BaseError, DataError, MockCreationError,
     MissingValueError, UnknownFieldError
@@ -58,12 +60,14 @@ class FieldDescriptor(object):
         field = instance._fields[self.name]
         value = field.pre_setattr(value)
         instance._data[self.name] = value
+        instance._validated = None
 
     def __delete__(self, instance):
         """
         Deletes the field's value.
         """
         instance._data[self.name] = Undefined
+        instance._validated = None
 
 
 class ModelOptions(object):
@@ -157,6 +161,8 @@ class ModelMeta(type):
         attrs['_serializables'] = serializables
         attrs['_validator_functions'] = validator_functions
         attrs['_options'] = options
+        # Field masks of the stubs of the model, see transforms._stub_context
+        attrs['_stub_masks'] = {}
 
         klass = type.__new__(mcs, name, bases, attrs)
 
@@ -234,13 +240,23 @@ class Model(object):
         settings from field definitions. Default: True
     :param bool strict:
         Complain about unrecognized keys. Default: True
+    :param fields:
+        Only convert these fields and leave the others ``Undefined``. Nested
+        fields are given as dotted paths, such as ``'author.name'`` or
+        ``'tags.*.title'``. Default: None
+    :param exclude:
+        Leave these fields, given in the same form, ``Undefined``. Default: None
     """
 
     __optionsclass__ = ModelOptions
 
+    # Options of the last successful validation, as returned by
+    # ``transforms.validation_key``. Reset whenever a field is assigned.
+    _validated = None
+
     def __init__(self, raw_data=None, trusted_data=None, deserialize_mapping=None,
                  init=True, partial=True, strict=True, validate=False, app_data=None,
-                 **kwargs):
+                 fields=None, exclude=None, **kwargs):
 
         self._initial = raw_data or {}
 
@@ -250,7 +266,7 @@ class Model(object):
         self._data = self.convert(raw_data,
                                   trusted_data=trusted_data, mapping=deserialize_mapping,
                                   partial=partial, strict=strict, validate=validate, new=True,
-                                  app_data=app_data, **kwargs)
+                                  fields=fields, exclude=exclude, app_data=app_data, **kwargs)
 
     def validate(self, partial=False, convert=True, app_data=None, **kwargs):
         """
@@ -265,12 +281,21 @@ class Model(object):
             Can be turned off to skip an unnecessary conversion step if all values
             are known to have the right datatypes (e.g., when validating immediately
             after the initial import). Default: True
+
+        Nested model instances that have already passed validation with the same
+        options, and haven't been assigned to since, don't have their immutable
+        field values converted and validated again.
         """
-        data = validate(self.__class__, self._data, partial=partial, convert=convert,
-                        app_data=app_data, **kwargs)
+        context = kwargs.pop('context', None) or get_validation_context(
+            partial=partial, strict=kwargs.pop('strict', False), convert=convert,
+            max_errors=kwargs.pop('max_errors', None), tracer=kwargs.pop('tracer', None))
+
+        data = validate(self.__class__, self._data, app_data=app_data, context=context,
+                        **kwargs)
 
         if convert:
-            self._data.update(**data)
+            self._data.update(_converted_data(data, context))
+        self._validated = validation_key(context)
 
     def import_data(self, raw_data, **kw):
         """
@@ -285,6 +310,7 @@ class Model(object):
             del data[k]
 
         self._data.update(data)
+        self._validated = None
         return self
 
     def convert(self, raw_data, **kw):
@@ -308,20 +334,39 @@ class Model(object):
         else:
             data = obj.convert(obj._data, context=context)
             if context.convert:
-                obj._data.update(data)
+                obj._data.update(_converted_data(data, context))
+            obj._validated = validation_key(context)
             return obj
 
+    @classmethod
+    def _from_native(cls, data):
+        """
+        Creates an instance from the output of a native export. The values are
+        already native, so they are taken over as they are instead of being
+        passed through the import loop a second time.
+
+        Falls back to regular construction if the class customizes it.
+        """
+        if not _inherits(cls, Model, '__new__', '__init__', 'convert'):
+            return cls(data, init=False)
+        instance = cls.__new__(cls)
+        instance._initial = data or {}
+        instance._data = dict(
+            (field_name, data.get(field.serialized_name or field_name, Undefined))
+            for field_name, field in cls._fields.iteritems())
+        return instance
+
     def export(self, format, field_converter=None, role=None, app_data=None, **kwargs):
         data = export_loop(self.__class__, self, field_converter=field_converter,
                            role=role, app_data=app_data, **kwargs)
         if format == NATIVE:
-            return self.__class__(data, init=False)
+            return self._from_native(data)
         else:
             return data
 
     def to_native(self, role=None, app_data=None, **kwargs):
         data = to_native(self.__class__, self, role=role, app_data=app_data, **kwargs)
-        return self.__class__(data, init=False)
+        return self._from_native(data)
 
     def to_dict(self, role=None, app_data=None, **kwargs):
         return to_dict(self.__class__, self, role=role, app_data=app_data, **kwargs)
@@ -349,6 +394,46 @@ class Model(object):
     def from_flat(cls, data):
         return cls(expand(data))
 
+    @classmethod
+    def from_object(cls, obj, **kwargs):
+        """
+        Creates an instance from the attributes of an arbitrary object, such as
+        an ORM row, without building an intermediate dict. Attribute names are
+        looked up like the keys of a mapping, including ``serialized_name`` and
+        ``deserialize_from``. See the ``source`` option of
+        ``transforms.import_loop``.
+        """
+        return cls(obj, source='attrs', **kwargs)
+
+    def to_bytes(self):
+        """
+        Return the values of the fields in the compact binary encoding of
+        ``schematics.binary``.
+        """
+        from .binary import to_bytes
+        return to_bytes(self.__class__, self)
+
+    @classmethod
+    def from_bytes(cls, data):
+        from .binary import from_bytes
+        return from_bytes(cls, data)
+
+    @classmethod
+    def from_json(cls, data, **kwargs):
+        """
+        Creates an instance from a JSON document given as bytes or text, such
+        as a request body. The document is parsed with the library selected in
+        ``schematics.jsonio``; additional keyword arguments are passed to the
+        constructor.
+        """
+        return cls(jsonio.loads(data), **kwargs)
+
+    def to_json(self, role=None, app_data=None, **kwargs):
+        """
+        Returns the primitive form of the instance as JSON text.
+        """
+        return jsonio.dumps(self.to_primitive(role=role, app_data=app_data, **kwargs))
+
     def atoms(self):
         """
         Iterator for the atomic components of a model definition and relevant
@@ -429,6 +514,24 @@ class Model(object):
     def __ne__(self, other):
         return not self == other
 
+    def __reduce__(self):
+        """
+        Pickles the instance as its class and the native field values in the
+        order of ``_fields``. Unpickling takes the values over without
+        conversion, like ``_from_native``.
+        """
+        cls = self.__class__
+        try:
+            values = _field_getters[cls](self._data)
+        except KeyError:
+            values = _field_getter(cls)(self._data)
+        if len(self.__dict__) > 2:
+            state = dict((name, value) for name, value in iteritems(self.__dict__)
+                         if name not in ('_initial', '_data', '_validated'))
+            if state:
+                return _restore_model, (cls, values), state
+        return _restore_model, (cls, values)
+
     def __repr__(self):
         try:
             obj = unicode(self)
@@ -448,6 +551,37 @@ class Model(object):
     def __unicode__(self):
         return '%s object' % self.__class__.__name__
 
+_field_getters = {}
+
+
+def _field_getter(cls):
+    """
+    Returns a function that returns the values of a model's ``_data`` as a
+    tuple in the order of ``_fields``.
+    """
+    getter = _field_getters.get(cls)
+    if getter is None:
+        names = tuple(cls._fields)
+
+        def getter(data):
+            try:
+                values = select(data)
+            except KeyError:
+                return tuple(data.get(name, Undefined) for name in names)
+            return values if len(names) != 1 else (values,)
+
+        select = operator.itemgetter(*names) if names else (lambda data: ())
+        _field_getters[cls] = getter
+    return getter
+
+
+def _restore_model(cls, values):
+    instance = cls.__new__(cls)
+    instance._initial = {}
+    instance._data = dict(zip(cls._fields, values))
+    return instance
+
+
 @add_metaclass(NonDictModelMeta)
 class NonDictModel(Model):
 
@@ -477,8 +611,8 @@ class NonDictModel(Model):
         return res.values()[0]
 
 from .transforms import (
-    atoms, export_loop,
+    atoms, export_loop, validation_key, _converted_data, _inherits,
     convert, to_native, to_dict, to_primitive,
     flatten, expand,
 )
-from .validate import validate, prepare_validator
+from .validate import validate, prepare_validator, get_validation_context
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+Read-only files of model instances with random access.
+
+A record file holds a sequence of instances of one model in the encoding of
+``schematics.binary``, followed by an index of the record offsets::
+
+    with open('countries.rec', 'wb') as f:
+        write_records(Country, countries, f)
+
+    with RecordReader(Country, 'countries.rec') as reader:
+        reader[42]              # a Country instance
+        reader.view(42)['code'] # a single field
+
+The reader maps the file into memory, so processes that open the same file
+share its pages, and opening a file takes the same time regardless of its size.
+A record is decoded only when it is accessed. ``view()`` goes further and
+decodes the fields of a record one at a time, up to the field that is
+requested.
+
+Layout: an 8-byte magic, the records, the index of record offsets as unsigned
+64-bit integers, and a trailer with the offset of the index, the number of
+records and the magic again. All numbers are little-endian.
+"""
+import mmap
+import struct
+
+from .binary import to_bytes, decode, _model_codec, _read_bitmap
+from .undefined import Undefined
+
+
+MAGIC = b'SCHREC01'
+
+_offset = struct.Struct('<Q')
+_trailer = struct.Struct('<QQ8s')
+
+
+def write_records(cls, instances, fp):
+    """
+    Writes the iterable ``instances`` to the binary file ``fp`` and returns the
+    number of records. The file does not need to be seekable.
+    """
+    index = bytearray()
+    count = 0
+    position = len(MAGIC)
+    fp.write(MAGIC)
+    for instance in instances:
+        data = to_bytes(cls, instance)
+        fp.write(data)
+        index += _offset.pack(position)
+        position += len(data)
+        count += 1
+    fp.write(bytes(index))
+    fp.write(_trailer.pack(position, count, MAGIC))
+    return count
+
+
+class RecordReader(object):
+    """
+    Random access to the records of a file written by ``write_records``.
+
+    ``reader[i]`` returns the instance at index ``i``; slices return lists.
+    """
+
+    def __init__(self, cls, path):
+        self.model_class = cls
+        with open(path, 'rb') as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        size = len(self._data)
+        if size < len(MAGIC) + _trailer.size or self._data[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError('%s is not a record file' % path)
+        self._index, self._count, magic = _trailer.unpack_from(self._data, size - _trailer.size)
+        if magic != MAGIC or self._index + self._count * _offset.size != size - _trailer.size:
+            self.close()
+            raise ValueError('%s is truncated or corrupt' % path)
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        start, end = self._bounds(index)
+        instance, offset = decode(self.model_class, self._data, start)
+        if offset != end:
+            raise ValueError('Record %d does not match its index entry' % index)
+        return instance
+
+    def __iter__(self):
+        for index in range(self._count):
+            yield self[index]
+
+    def view(self, index):
+        """
+        Returns a ``RecordView`` of the record at ``index``.
+        """
+        return RecordView(self.model_class, self._data, self._bounds(index)[0])
+
+    def _bounds(self, index):
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError('record index out of range')
+        start = _offset.unpack_from(self._data, self._index + index * _offset.size)[0]
+        if index + 1 < self._count:
+            end = _offset.unpack_from(self._data, self._index + (index + 1) * _offset.size)[0]
+        else:
+            end = self._index
+        return start, end
+
+    def close(self):
+        self._data.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class RecordView(object):
+    """
+    Read-only access to the fields of a single record by name, either as
+    items or as attributes. Fields are decoded in order, up to the requested
+    one, and cached. Undefined fields read as ``None``.
+    """
+
+    def __init__(self, cls, data, offset):
+        encode, decode, fields = _model_codec(cls)
+        self._cls = cls
+        self._data = data
+        self._fields = fields
+        self._positions = dict((field[0], i) for i, field in enumerate(fields))
+        self._bitmap, self._offset = _read_bitmap(data, offset, (len(fields) + 3) // 4)
+        self._values = []
+
+    def __getitem__(self, name):
+        position = self._positions[name]
+        self._decode_until(position)
+        value = self._values[position]
+        return None if value is Undefined else value
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __contains__(self, name):
+        return name in self._positions
+
+    def keys(self):
+        return [field[0] for field in self._fields]
+
+    def to_model(self):
+        """
+        Decodes the whole record into an instance of the model.
+        """
+        self._decode_until(len(self._fields) - 1)
+        return self._cls._from_native(dict(
+            (field[1], value) for field, value in zip(self._fields, self._values)
+            if value is not Undefined))
+
+    def _decode_until(self, position):
+        values = self._values
+        while len(values) <= position:
+            index = len(values)
+            state = self._bitmap[index >> 2] >> ((index & 3) << 1) & 3
+            if state == 2:
+                value, self._offset = self._fields[index][3](self._data, self._offset)
+            else:
+                value = None if state == 1 else Undefined
+            values.append(value)
+
+    def __repr__(self):
+        return '<%s view>' % self._cls.__name__
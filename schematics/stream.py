@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+Incremental reading of documents that are one large JSON array.
+
+The array is read from a binary file in chunks and its elements are produced
+one at a time, so memory use is bounded by the chunk size and the largest
+element rather than by the size of the document::
+
+    with open('people.json', 'rb') as f:
+        for person in iter_models(Person, f):
+            ...
+
+``iter_elements`` only finds the boundaries of the elements: it tracks
+strings, escapes and the nesting of brackets, and leaves the parsing of each
+element to the library selected in ``schematics.jsonio``. Malformed input
+raises a ``ValueError`` with the byte offset of the problem.
+"""
+import re
+
+from . import jsonio
+
+
+CHUNK_SIZE = 64 * 1024
+
+_SPACE = re.compile(br'[ \t\r\n]*')
+_STRING = re.compile(br'["\\]')
+
+# Skip to the next token that matters between the elements of the array or
+# inside them, passing over complete strings. A bare quote is returned for a
+# string that continues in the next chunk.
+_COMPLETE_STRING = br'"[^"\\]*(?:\\.[^"\\]*)*"'
+_TOP = re.compile(br'[^][{},"]*(?:' + _COMPLETE_STRING + br'[^][{},"]*)*([][{},"])')
+_NESTED = re.compile(br'[^][{}"]*(?:' + _COMPLETE_STRING + br'[^][{}"]*)*([][{}"])')
+
+def iter_models(cls, fp, chunk_size=CHUNK_SIZE, **kwargs):
+    """
+    Generates an instance of ``cls`` for each element of the top-level JSON
+    array in the binary file ``fp``. Additional keyword arguments are passed
+    to the constructor.
+    """
+    for record in iter_records(fp, chunk_size):
+        yield cls(record, **kwargs)
+
+
+def iter_records(fp, chunk_size=CHUNK_SIZE):
+    """
+    Generates the parsed elements of the top-level JSON array in the binary
+    file ``fp``.
+    """
+    loads = jsonio.loads
+    for element in iter_elements(fp, chunk_size):
+        yield loads(element)
+
+
+def iter_elements(fp, chunk_size=CHUNK_SIZE):
+    """
+    Generates the JSON text of each element of the top-level JSON array in the
+    binary file ``fp``, as bytes.
+    """
+    buf = _Buffer(fp, chunk_size)
+
+    pos = buf.skip_space(0)
+    if buf.data[pos:pos + 1] != b'[':
+        buf.fail(pos, 'Expected a JSON array')
+    pos = buf.skip_space(pos + 1)
+    if buf.data[pos:pos + 1] == b']':
+        buf.finish(pos + 1)
+        return
+
+    buf.start = pos
+    depth = 0
+    top, nested = _TOP.match, _NESTED.match
+    while True:
+        match = (nested if depth else top)(buf.data, pos)
+        if match is None:
+            shift = buf.fill()
+            if shift is None:
+                buf.fail(len(buf.data), 'Unexpected end of the array')
+            pos -= shift
+            continue
+        pos = match.end()
+        token = match.group(1)
+        if token == b'"':
+            pos = buf.skip_string(pos)
+        elif token in b'[{':
+            depth += 1
+        elif depth:
+            depth -= 1
+        elif token == b'}':
+            buf.fail(pos - 1, 'Unbalanced brace')
+        else:
+            yield buf.take(pos - 1)
+            if token == b']':
+                buf.finish(pos)
+                return
+            buf.start = pos
+            pos = buf.start = buf.skip_space(pos)
+            if buf.data[pos:pos + 1] == b']':
+                buf.fail(pos, 'Trailing comma')
+
+
+class _Buffer(object):
+    """
+    The part of the file that has been read. ``data`` holds the bytes from
+    ``discarded`` on, and the bytes before ``start`` are dropped when the next
+    chunk is read. Methods that read more data keep their positions up to
+    date; other callers adjust theirs by the shift returned by ``fill()``.
+    """
+
+    def __init__(self, fp, chunk_size):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.data = b''
+        self.start = 0
+        self.discarded = 0
+        self.eof = False
+
+    def fill(self):
+        """
+        Appends a chunk to ``data`` after dropping the bytes before ``start``.
+        Returns the number of bytes dropped, or ``None`` at the end of the
+        file.
+        """
+        if self.eof:
+            return None
+        chunk = self.fp.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return None
+        shift = self.start
+        self.data = self.data[shift:] + chunk
+        self.discarded += shift
+        self.start = 0
+        return shift
+
+    def take(self, end):
+        """
+        Returns the element from ``start`` to ``end``.
+        """
+        element = self.data[self.start:end].rstrip()
+        if not element:
+            self.fail(end, 'Missing array element')
+        return element
+
+    def skip_space(self, pos):
+        while True:
+            pos = _SPACE.match(self.data, pos).end()
+            if pos < len(self.data):
+                return pos
+            shift = self.fill()
+            if shift is None:
+                return pos
+            pos -= shift
+
+    def skip_string(self, pos):
+        """
+        Returns the position after the closing quote of the string that
+        starts before ``pos``.
+        """
+        while True:
+            match = _STRING.search(self.data, pos)
+            if match is None or match.group() == b'\\' and match.end() == len(self.data):
+                if match is not None:
+                    pos = match.start()
+                shift = self.fill()
+                if shift is None:
+                    self.fail(len(self.data), 'Unterminated string')
+                pos -= shift
+            elif match.group() == b'"':
+                return match.end()
+            else:
+                pos = match.end() + 1
+
+    def finish(self, pos):
+        self.start = pos
+        pos = self.skip_space(pos)
+        if pos < len(self.data):
+            self.fail(pos, 'Unexpected data after the array')
+
+    def fail(self, pos, message):
+        raise ValueError('%s at byte %d' % (message, self.discarded + pos))
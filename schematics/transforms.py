@@ -1,17 +1,24 @@
 # -*- coding: utf-8 -*-
 
 import collections
+import datetime
 import itertools
+import numbers
 import operator
+import uuid
 
 from six import iteritems
 
 from .common import *
-from .datastructures import OrderedDict, Context
+from .datastructures import OrderedDict, ConversionContext
 from .exceptions import *
-from .types.compound import ModelType
-from .undefined import Undefined
-from .util import listify
+from .models import Model
+from .tracing import start_trace, traced
+from .types import BaseType
+from .types.compound import ModelType, ListType, DictType, PolyModelType, _has_attributes
+from .undefined import Undefined, UndefinedType
+from .util import listify, resolve
+from .validate import _finish_validation
 
 try:
     basestring #PY2
@@ -34,6 +41,7 @@ except:
 def import_loop(cls, instance_or_dict, field_converter=None, trusted_data=None,
                 mapping=None, partial=False, strict=False, init_values=False,
                 apply_defaults=False, convert=True, validate=False, new=False,
+                max_errors=None, tracer=None, source=None, fields=None, exclude=None,
                 app_data=None, context=None):
     """
     The import loop is designed to take untrusted data and convert it into the
@@ -58,6 +66,28 @@ def import_loop(cls, instance_or_dict, field_converter=None, trusted_data=None,
         Complain about unrecognized keys. Default: False
     :param apply_defaults:
         Whether to set fields to their default values when not present in input data.
+    :param max_errors:
+        Stop collecting errors once this many have been found in a single model,
+        list or dict. The remaining entries are skipped and a marker is stored
+        under the ``TRUNCATED`` key. Default: None (no limit)
+    :param tracer:
+        A ``tracing.Tracer`` to be notified of every field conversion.
+    :param source:
+        Set to ``'attrs'`` to read the values from the attributes of an
+        arbitrary object, such as an ORM row, instead of the keys of a mapping.
+        Nested models are read from the related objects in the same way, and
+        related managers with an ``all()`` method are accepted for lists.
+        Dicts are still read by key. Strings, numbers and other values without
+        attributes are rejected. Rogue fields are not checked. Default: None
+    :param fields:
+        A list of field names to convert. The other fields are left
+        ``Undefined`` and their raw values are not looked at. Dotted paths
+        select fields of nested models, with ``*`` standing for the items of a
+        list or dict: ``'author.name'``, ``'tags.*.title'``. The ``*`` may be
+        left out, and the paths may be given as one comma-separated string.
+        Default: None
+    :param exclude:
+        A list of field names, in the same form, not to convert. Default: None
     :param app_data:
         An arbitrary container for application-specific data that needs to
         be available during the conversion.
@@ -66,18 +96,8 @@ def import_loop(cls, instance_or_dict, field_converter=None, trusted_data=None,
         The context object is created upon the initial invocation of ``import_loop``
         and is then propagated through the entire process.
     """
-    if instance_or_dict is None:
-        got_data = False
-    else:
-        got_data = True
-
-    if got_data and not isinstance(instance_or_dict, (cls, dict)):
-        raise ConversionError('Model conversion requires a model or dict')
-
-    context = Context._make(context)
-    try:
-        context.initialized
-    except:
+    context = ConversionContext._make(context)
+    if not getattr(context, 'initialized', False):
         context._setdefaults({
             'initialized': True,
             'field_converter': field_converter,
@@ -89,16 +109,50 @@ def import_loop(cls, instance_or_dict, field_converter=None, trusted_data=None,
             'convert': convert,
             'validate': validate,
             'new': new,
+            'max_errors': max_errors,
+            'tracer': tracer,
+            'trace_path': (),
+            'source': source,
+            'fields': _projection(cls, fields),
+            'exclude': _projection(cls, exclude),
             'app_data': app_data if app_data is not None else {}
         })
 
+    data = dict(trusted_data) if trusted_data else {}
+    run(_import_steps(cls, instance_or_dict, context, data),
+        instance_or_dict._data if isinstance(instance_or_dict, Model) else instance_or_dict)
+    return data
+
+
+def _import_steps(cls, instance_or_dict, context, data, clean=False):
+    """
+    Step generator holding the body of ``import_loop``. Converted values are
+    stored in ``data``. Fields with compound types are not converted in place but
+    yielded as ``(field, value, context)`` requests; the caller sends back the
+    result or throws back the exception raised by the conversion.
+
+    If ``clean`` is set, ``instance_or_dict`` is the data of a model instance
+    that has already been validated with the same options, so immutable values
+    of non-compound fields are taken over as they are.
+    """
+    if instance_or_dict is None:
+        got_data = False
+    else:
+        got_data = True
+
+    from_attrs = getattr(context, 'source', None) == 'attrs' \
+        and not isinstance(instance_or_dict, dict)
+
+    if got_data and not isinstance(instance_or_dict, (cls, dict)) \
+            and not (from_attrs and _has_attributes(instance_or_dict)):
+        raise ConversionError('Model conversion requires a model or dict')
+
     _model_mapping = context.mapping.get('model_mapping')
 
-    data = dict(trusted_data) if trusted_data else {}
     errors = {}
     # Determine all acceptable field input names
     all_fields = set(cls._fields) ^ set(cls._serializables)
-    for field_name, field, in iteritems(cls._fields):
+    for field_name, field in cls._fields.iteritems():
         if field.serialized_name:
             all_fields.add(field.serialized_name)
         if field.deserialize_from:
@@ -106,14 +160,29 @@ def import_loop(cls, instance_or_dict, field_converter=None, trusted_data=None,
         if field_name in context.mapping:
             all_fields.update(set(listify(context.mapping[field_name])))
 
-    if got_data and context.strict:
+    if got_data and context.strict and not from_attrs:
         # Check for rogues if strict is set
         rogue_fields = set(instance_or_dict) - all_fields
         if len(rogue_fields) > 0:
             for field in rogue_fields:
                 errors[field] = 'Rogue field'
 
-    for field_name, field in iteritems(cls._fields):
+    tracer = context.tracer
+    trace_path = context.trace_path
+
+    fields = getattr(context, 'fields', None)
+    exclude = getattr(context, 'exclude', None)
+    projected = isinstance(fields, dict) or isinstance(exclude, dict)
+
+    for field_name, field in cls._fields.iteritems():
+
+        if projected:
+            sub_fields = fields.get(field_name) if isinstance(fields, dict) else True
+            sub_exclude = exclude.get(field_name) if isinstance(exclude, dict) else None
+            if sub_fields is None or sub_exclude is True:
+                if field_name not in data:
+                    data[field_name] = Undefined
+                continue
 
         value = Undefined
         serialized_field_name = field_name
@@ -125,9 +194,12 @@ def import_loop(cls, instance_or_dict, field_converter=None, trusted_data=None,
                 serialized_field_name = field.serialized_name
                 trial_keys.append(field.serialized_name)
             trial_keys.append(field_name)
-            for key in trial_keys:
-                if key and key in instance_or_dict:
-                    value = instance_or_dict[key]
+            if from_attrs:
+                value = _attribute_value(instance_or_dict, trial_keys, field)
+            else:
+                for key in trial_keys:
+                    if key and key in instance_or_dict:
+                        value = instance_or_dict[key]
 
         if value is Undefined:
             if field_name in data:
@@ -137,8 +209,12 @@ def import_loop(cls, instance_or_dict, field_converter=None, trusted_data=None,
         if value is Undefined and context.init_values:
             value = None
 
+        if clean and not field.is_compound and isinstance(value, _immutable_types):
+            data[field_name] = value
+            continue
+
         if got_data:
-            if field.is_compound:
+            if field.is_compound and context.mapping:
                 if _model_mapping:
                     submap = _model_mapping.get(field_name)
                 else:
@@ -146,12 +222,25 @@ def import_loop(cls, instance_or_dict, field_converter=None, trusted_data=None,
                 field_context = context._branch(mapping=submap)
             else:
                 field_context = context
+            if projected and field.is_compound:
+                field_context = field_context._branch(
+                    fields=sub_fields if isinstance(sub_fields, dict) else False,
+                    exclude=sub_exclude if isinstance(sub_exclude, dict) else False)
+            if tracer is not None:
+                field_context = field_context._branch(trace_path=trace_path + (field_name,))
             try:
-                value = context.field_converter(field, value, field_context)
+                # PolyModelType values are not expanded on import; convert them directly.
+                if field.is_compound and not isinstance(field, PolyModelType):
+                    value = yield field, value, field_context
+                else:
+                    value = context.field_converter(field, value, field_context)
             except (FieldError, CompoundError) as exc:
                 errors[serialized_field_name] = exc
                 if isinstance(exc, DataError):
                     data[field_name] = exc.partial_data
+                if context.max_errors and len(errors) >= context.max_errors:
+                    errors[TRUNCATED] = truncation_error(context.max_errors)
+                    break
                 continue
 
         data[field_name] = value
@@ -160,11 +249,187 @@ def import_loop(cls, instance_or_dict, field_converter=None, trusted_data=None,
         partial_data = dict(((key, value) for key, value in data.items() if value is not Undefined))
         raise DataError(errors, partial_data)
 
-    return data
+
+_projections = {}
+_PROJECTION_CACHE_SIZE = 1024
+
+
+def _projection(cls, paths):
+    """
+    Compiles the dotted ``paths`` of the ``fields`` or ``exclude`` option into
+    a tree of dicts keyed by field name, or ``*`` for the items of a list or
+    dict, where ``True`` marks the end of a path. Returns ``False`` if there
+    are no paths. Fields may be named by their attribute or serialized names.
+
+    ``paths`` may also be given as one comma-separated string, such as the
+    value of a ``?fields=`` query parameter. Compiled trees are cached by
+    class and paths and must not be modified.
+
+    Raises a ``ValueError`` for names that do not exist in ``cls``.
+    """
+    if paths is None or paths is False:
+        return False
+    if isinstance(paths, basestring):
+        key = paths
+    else:
+        key = paths = tuple(paths)
+    try:
+        return _projections[cls, key]
+    except KeyError:
+        pass
+    except TypeError: # unhashable paths
+        return _compile_projection(cls, paths)
+    tree = _compile_projection(cls, paths)
+    if len(_projections) >= _PROJECTION_CACHE_SIZE:
+        _projections.clear()
+    _projections[cls, key] = tree
+    return tree
+
+
+def _compile_projection(cls, paths):
+    if isinstance(paths, basestring):
+        paths = [path.strip() for path in paths.split(',')]
+    tree = {}
+    for path in paths:
+        if not path:
+            continue
+        node = tree
+        target = cls
+        parts = path.split('.')
+        for position, part in enumerate(parts):
+            if isinstance(target, (ListType, DictType)) and part != '*':
+                # `comments.text` stands for `comments.*.text`.
+                target = target.field
+                node = node.setdefault('*', {})
+                if node is True:
+                    break
+            part, target = _projection_target(target, part, path)
+            if position == len(parts) - 1:
+                node[part] = True
+            elif node.get(part) is True:
+                break
+            else:
+                node = node.setdefault(part, {})
+    return _intern_tree(tree, {})
+
+
+def _intern_tree(tree, trees):
+    """
+    Replaces equal subtrees of a projection tree with a single object, so
+    that exports can tell subtrees apart by identity.
+    """
+    for key, subtree in iteritems(tree):
+        if isinstance(subtree, dict):
+            tree[key] = _intern_tree(subtree, trees)
+    frozen = frozenset((key, id(subtree) if isinstance(subtree, dict) else subtree)
+                       for key, subtree in iteritems(tree))
+    return trees.setdefault(frozen, tree)
+
+
+def _projection_target(target, part, path):
+    """
+    Returns the name of what ``part`` of a projection path refers to within
+    ``target`` and the thing itself: a field or serializable, named by its
+    attribute name even if ``part`` is its serialized name, or the item field
+    for ``*``. ``None`` stands for anything that cannot be checked, such as
+    the fields of a ``PolyModelType``.
+    """
+    if target is None:
+        return part, None
+    if isinstance(target, ModelType):
+        target = target.model_class
+    if isinstance(target, type) and issubclass(target, Model):
+        if part in target._fields:
+            return part, target._fields[part]
+        if part in target._serializables:
+            return part, target._serializables[part].type
+        for name, field in iteritems(target._fields):
+            if field.serialized_name == part:
+                return name, field
+        for name, serializable in iteritems(target._serializables):
+            if serializable.serialized_name == part:
+                return name, serializable.type
+        raise ValueError('Unknown field %r in %r' % (part, path))
+    if isinstance(target, (ListType, DictType)):
+        return part, target.field
+    if target.is_compound:
+        return part, None
+    raise ValueError('%r in %r has no fields' % (target.name, path))
+
+
+def _slice_tree(cls, slices):
+    """
+    Compiles the ``slices`` option of ``export_loop`` into a tree of dicts
+    keyed by field name. A list or dict field is represented by a tuple
+    ``(start, stop, items)``, where ``start`` is ``None`` if the field itself
+    is not sliced and ``items`` is the tree for its items or ``False``.
+    Returns ``False`` if there are no slices.
+
+    Raises a ``ValueError`` for paths that do not lead to a list or dict.
+    """
+    if not slices:
+        return False
+    entries = [(path.split('.'), _slice_bounds(path, bounds), path)
+               for path, bounds in iteritems(slices)]
+    return _compile_slices(cls, entries)
+
+
+def _compile_slices(target, entries):
+    if isinstance(target, (ListType, DictType)):
+        bounds = (None, None)
+        rest = []
+        for parts, path_bounds, path in entries:
+            if not parts:
+                bounds = path_bounds
+            else:
+                # `comments.replies` stands for `comments.*.replies`.
+                rest.append((parts[1:] if parts[0] == '*' else parts, path_bounds, path))
+        return bounds + (_compile_slices(target.field, rest) if rest else False,)
+    if isinstance(target, ModelType):
+        target = target.model_class
+    groups = OrderedDict()
+    for parts, bounds, path in entries:
+        if not parts or not (isinstance(target, type) and issubclass(target, Model)):
+            raise ValueError('%r does not lead to a list or dict' % path)
+        groups.setdefault(parts[0], []).append((parts[1:], bounds, path))
+    tree = {}
+    for part, group in iteritems(groups):
+        name, field = _projection_target(target, part, group[0][2])
+        tree[name] = _compile_slices(field, group)
+    return tree
+
+
+def _slice_bounds(path, bounds):
+    try:
+        start, stop = bounds
+    except (TypeError, ValueError):
+        raise ValueError('The slice of %r must be given as (start, stop)' % path)
+    start = start or 0
+    if start < 0 or stop is not None and stop < 0:
+        raise ValueError('The slice of %r has negative bounds' % path)
+    return start, stop
+
+
+def _attribute_value(obj, keys, field):
+    """
+    Looks up ``keys`` as attributes of ``obj`` for ``import_loop`` with
+    ``source='attrs'``. As with mappings, the last key found wins.
+    """
+    value = Undefined
+    for key in keys:
+        if key:
+            found = getattr(obj, key, Undefined)
+            if found is not Undefined:
+                value = found
+    if isinstance(field, ListType) and not isinstance(value, collections.Iterable) \
+            and callable(getattr(value, 'all', None)):
+        value = value.all() # a related manager
+    return value
 
 
 def export_loop(cls, instance_or_dict, field_converter=None, role=None, raise_error_on_role=True,
-                export_level=None, app_data=None, context=None):
+                export_level=None, tracer=None, fields=None, exclude=None, slices=None,
+                totals=None, max_depth=None, stub=None, app_data=None, context=None):
     """
     The export_loop function is intended to be a general loop definition that
     can be used for any form of data shaping, such as application of roles or
@@ -184,6 +449,39 @@ def export_loop(cls, instance_or_dict, field_converter=None, role=None, raise_er
     :param raise_error_on_role:
         This parameter enforces strict behavior which requires substructures
         to have the same role definition as their parent structures.
+    :param tracer:
+        A ``tracing.Tracer`` to be notified of every field export.
+    :param fields:
+        A field mask: the paths of the fields to export, as a list or as one
+        comma-separated string such as ``'id,author.name,comments.text'``.
+        The paths have the same form as in ``import_loop``, and the items of
+        lists and dicts may be reached without ``*``. Nested models, lists
+        and dicts outside the mask are not traversed. Default: None
+    :param exclude:
+        A field mask of the fields not to export. Default: None
+    :param slices:
+        A dict of ``(start, stop)`` bounds keyed by the dotted path of a list
+        or dict field, such as ``{'comments': (0, 20)}``. Only the items in
+        the bounds, in iteration order, are exported; the others are not
+        looked at. ``stop`` may be ``None``. Default: None
+    :param totals:
+        A dict that receives the number of items of each list or dict sliced
+        through ``slices``, keyed by its path in the output, such as
+        ``'comments'`` or ``'posts.2.comments'``. List items are numbered by
+        their position in the exported list, not in the source list.
+        Default: None
+    :param max_depth:
+        The number of levels of nested models to export. Models nested more
+        deeply, in model fields or in lists and dicts, are replaced by a stub.
+        ``0`` stubs every nested model. This also holds for models exported
+        by a custom ``ModelType`` or ``export`` method, as long as it passes
+        its ``context`` on. Default: None (no limit)
+    :param stub:
+        The names of the fields that make up the stub of a model beyond
+        ``max_depth``, as a list or a comma-separated string such as
+        ``'id'``. Names that a model does not have are ignored, and nested
+        models in a stub are stubbed in turn. Without a stub, the models are
+        exported as ``None``. Default: None
     :param app_data:
         An arbitrary container for application-specific data that needs to
         be available during the conversion.
@@ -191,38 +489,155 @@ def export_loop(cls, instance_or_dict, field_converter=None, role=None, raise_er
         A ``Context`` object that encapsulates configuration options and ``app_data``.
         The context object is created upon the initial invocation of ``import_loop``
         and is then propagated through the entire process.
+
+    When any of ``fields``, ``exclude``, ``slices``, ``max_depth`` or ``stub``
+    is given, a model instance that is referenced from several places is
+    exported once and its export is reused, so the output may contain the same
+    dict more than once. Instances that refer back to themselves raise a
+    ``ValueError``.
     """
-    context = Context._make(context)
-    try:
-        context.initialized
-    except:
+    context = _export_context(context, field_converter, role, raise_error_on_role,
+                              export_level, tracer, app_data, cls, fields, exclude,
+                              slices, totals, max_depth, stub)
+    data = {}
+    run(_export_steps(cls, instance_or_dict, context, data), instance_or_dict)
+    return _order_fields(cls, data)
+
+
+def _export_context(context, field_converter, role, raise_error_on_role, export_level,
+                    tracer, app_data, cls=None, fields=None, exclude=None,
+                    slices=None, totals=None, max_depth=None, stub=None):
+    context = ConversionContext._make(context)
+    if not getattr(context, 'initialized', False):
+        shaped = fields is not None or exclude is not None or slices is not None \
+            or max_depth is not None or stub is not None
         context._setdefaults({
             'initialized': True,
             'field_converter': field_converter,
             'role': role,
             'raise_error_on_role': raise_error_on_role,
             'export_level': export_level,
+            'tracer': tracer,
+            'trace_path': (),
+            'fields': _projection(cls, fields) if fields is not None else False,
+            'exclude': _projection(cls, exclude) if exclude is not None else False,
+            'slices': _slice_tree(cls, slices) if slices is not None else False,
+            'totals': totals,
+            'slice_path': (),
+            'memo': _ExportMemo() if shaped else None,
+            'max_depth': max_depth,
+            'depth': 0,
+            'stub': _stub_names(stub) if stub is not None else None,
             'app_data': app_data if app_data is not None else {}
         })
+    return context
 
-    data = {}
 
-    # Translate `role` into `gottago` function
-    gottago = wholelist()
-    if hasattr(cls, '_options') and context.role in cls._options.roles:
-        gottago = cls._options.roles[context.role]
-    elif context.role and context.raise_error_on_role:
-        error_msg = u'%s Model has no role "%s"'
-        raise ValueError(error_msg % (cls.__name__, context.role))
-    else:
-        gottago = cls._options.roles.get("default", gottago)
+class _ExportMemo(object):
+    """
+    Keeps track of the model instances met during one export: the exports of
+    those that are done, keyed by ``id(instance)`` and the options that shape
+    them, and for ``iter_flatten_model`` the instances being flattened, to
+    detect cycles. The instances are kept alive so that their ids are not
+    reused.
+
+    An export only has a memo if it uses ``fields``, ``exclude``, ``slices``,
+    ``max_depth`` or ``stub``; cycles are detected by ``run`` in any case.
+    """
 
-    fields_order = (getattr(cls._options, 'fields_order', None)
-                    if hasattr(cls, '_options') else None)
+    __slots__ = ('active', 'results')
+
+    def __init__(self):
+        self.active = {}
+        self.results = {}
+
+    def enter(self, instance):
+        if id(instance) in self.active:
+            raise ValueError('Cannot export a %s instance that contains itself'
+                             % type(instance).__name__)
+        self.active[id(instance)] = instance
+
+    def leave(self, instance):
+        del self.active[id(instance)]
+
+
+def _stub_names(stub):
+    if stub is None:
+        return None
+    if isinstance(stub, basestring):
+        stub = stub.split(',')
+    return tuple(name.strip() for name in stub)
+
+
+def _stub_context(model_class, context):
+    """
+    Returns the context for exporting the stub of a ``model_class`` instance
+    beyond ``max_depth``, with a mask of the fields in ``context.stub``. The
+    masks are kept on the model class.
+    """
+    masks = model_class._stub_masks
+    try:
+        fields = masks[context.stub]
+    except KeyError:
+        if len(masks) >= _STUB_CACHE_SIZE:
+            masks.clear()
+        fields = masks[context.stub] = dict(
+            (name, True) for name in context.stub
+            if name in model_class._fields or name in model_class._serializables)
+    return context._branch(fields=fields, exclude=False, slices=False)
+
+_STUB_CACHE_SIZE = 64
+
+
+def _memo_key(instance, format, context):
+    """
+    Returns the key of the export of ``instance`` in ``context.memo``, or
+    ``None`` if it must not be reused because every export is traced.
+
+    The key holds the options that vary within an export and shape its
+    result: the subtrees of the ``fields``, ``exclude`` and ``slices`` trees,
+    which are compared by identity and kept alive with the context stored
+    next to the export, the depth if ``max_depth`` is set and the path under
+    which ``totals`` are recorded.
+    """
+    if context.tracer is not None:
+        return None
+    return (id(instance), format, id(context.fields), id(context.exclude),
+            id(context.slices), context.depth if context.max_depth is not None else None,
+            context.slice_path if context.totals is not None else None)
+
+
+def _export_steps(cls, instance_or_dict, context, data):
+    """
+    Step generator holding the body of ``export_loop``. Exported values are
+    stored in ``data``; compound values are yielded as requests in the same
+    way as in ``_import_steps``.
+    """
+    gottago = _role_filter(cls, context)
+
+    tracer = context.tracer
+    trace_path = context.trace_path
+
+    if getattr(context, 'memo', None) is None:
+        # Only exports shaped by the options below have a memo.
+        projected = sliced = limited = False
+    else:
+        fields = getattr(context, 'fields', None)
+        exclude = getattr(context, 'exclude', None)
+        projected = isinstance(fields, dict) or isinstance(exclude, dict)
+        slices = getattr(context, 'slices', None)
+        sliced = isinstance(slices, dict)
+        limited = getattr(context, 'max_depth', None) is not None
 
     for field_name, field, value in atoms(cls, instance_or_dict):
         serialized_name = field.serialized_name or field_name
 
+        if projected:
+            sub_fields = fields.get(field_name) if isinstance(fields, dict) else True
+            sub_exclude = exclude.get(field_name) if isinstance(exclude, dict) else None
+            if sub_fields is None or sub_exclude is True:
+                continue
+
         # Skipping this field was requested
         if gottago(field_name, value):
             continue
@@ -233,7 +648,26 @@ def export_loop(cls, instance_or_dict, field_converter=None, role=None, raise_er
             continue
 
         elif value not in (None, Undefined):
-            value = context.field_converter(field, value, context)
+            if tracer is None:
+                field_context = context
+            else:
+                field_context = context._branch(trace_path=trace_path + (field_name,))
+            if not field.is_compound:
+                value = context.field_converter(field, value, field_context)
+            else:
+                if projected:
+                    field_context = field_context._branch(
+                        fields=sub_fields if isinstance(sub_fields, dict) else False,
+                        exclude=sub_exclude if isinstance(sub_exclude, dict) else False)
+                if sliced:
+                    field_slices = slices.get(field_name, False)
+                    field_context = field_context._branch(slices=field_slices)
+                    if field_slices and context.totals is not None:
+                        field_context = field_context._branch(
+                            slice_path=context.slice_path + (serialized_name,))
+                if limited:
+                    field_context = field_context._branch(depth=context.depth + 1)
+                value = yield field, value, field_context
 
         if value is Undefined:
             if _export_level <= DEFAULT:
@@ -250,9 +684,25 @@ def export_loop(cls, instance_or_dict, field_converter=None, role=None, raise_er
 
         data[serialized_name] = value
 
+
+def _role_filter(cls, context):
+    # Translate `role` into `gottago` function
+    gottago = wholelist()
+    if hasattr(cls, '_options') and context.role in cls._options.roles:
+        gottago = cls._options.roles[context.role]
+    elif context.role and context.raise_error_on_role:
+        error_msg = u'%s Model has no role "%s"'
+        raise ValueError(error_msg % (cls.__name__, context.role))
+    else:
+        gottago = cls._options.roles.get("default", gottago)
+    return gottago
+
+
+def _order_fields(cls, data):
+    fields_order = (getattr(cls._options, 'fields_order', None)
+                    if hasattr(cls, '_options') else None)
     if fields_order:
         data = sort_dict(data, fields_order)
-
     return data
 
 
@@ -291,7 +741,7 @@ def atoms(cls, instance_or_dict):
         expectation for this structure is that it implements a ``Mapping``
         interface.
     """
-    all_fields = itertools.chain(iteritems(cls._fields),
+    all_fields = itertools.chain(cls._fields.iteritems(),
                                  iteritems(cls._serializables))
 
     return ((field_name, field, instance_or_dict.get(field_name, Undefined))
@@ -299,6 +749,363 @@ def atoms(cls, instance_or_dict):
 
 
 
+###
+# Iterative engine
+###
+
+
+def run(steps, root=None):
+    """
+    Runs a step generator (see ``_import_steps``) to completion using an
+    explicit stack.
+
+    Requests for ``ModelType``, ``ListType`` and ``DictType`` values, and for
+    ``PolyModelType`` values on export, that would be handled by the standard
+    converters and methods are expanded into child step generators on the
+    stack instead of going through the usual chain of ``convert()`` and
+    ``export()`` calls. Structures of any depth are thus processed with a
+    constant number of Python frames. All other requests are resolved normally.
+
+    The models being imported or exported, starting with ``root``, are
+    tracked so that data that contains itself raises a ``ValueError``.
+    """
+    stack = [(steps, None)]
+    active = set() if root is None else set([id(root)])
+    result = error = None
+    while True:
+        steps, finish = stack[-1]
+        try:
+            if error is None:
+                request = steps.send(result)
+            else:
+                request = steps.throw(error)
+        except StopIteration:
+            error = None
+        except Exception as exc:
+            if len(stack) == 1:
+                raise
+            error = exc
+        else:
+            try:
+                frame = _expand(active, *request)
+                if frame is None:
+                    result, error = resolve(*request), None
+                else:
+                    stack.append(frame)
+                    result = error = None
+            except Exception as exc:
+                result, error = None, exc
+            continue
+        stack.pop()
+        if not stack:
+            return
+        try:
+            result, error = finish(error), None
+        except Exception as exc:
+            result, error = None, exc
+
+
+def _expand(active, field, value, context, format=None):
+    """
+    Returns a ``(steps, finish)`` stack frame that carries out the request, or
+    ``None`` if the request must be resolved through the regular call chain.
+    ``finish`` receives the exception raised by ``steps``, if any, and
+    produces the value that the request resolves to. ``active`` holds the ids
+    of the models being processed by ``run``.
+    """
+    if format is None:
+        converter = context.field_converter
+        if type(converter) is ImportConverter:
+            if value is None or value is Undefined:
+                return None
+            phase = converter.action
+            frame = _expand_import(field, value, context, phase, active)
+        elif isinstance(converter, ExportConverter):
+            phase = 'export'
+            if getattr(context, 'max_depth', None) is not None:
+                frame = _expand_limited(field, value, context, format, active)
+            elif type(converter) is ExportConverter:
+                frame = _expand_export(field, value, context, converter.get_format(field),
+                                       active)
+            else:
+                return None
+        else:
+            return None
+    else:
+        phase = 'export'
+        if getattr(context, 'max_depth', None) is not None:
+            frame = _expand_limited(field, value, context, format, active)
+        else:
+            frame = _expand_export(field, value, context, format, active)
+    if frame is not None and getattr(context, 'tracer', None) is not None:
+        frame = _traced_frame(frame, phase, field, context)
+    return frame
+
+
+def _expand_import(field, value, context, action, active):
+
+    if action == 'validate':
+        if not _inherits(field, BaseType, 'validate'):
+            return None
+    elif action != 'convert':
+        return None
+
+    if isinstance(field, ModelType):
+        if not _inherits(field, ModelType, 'convert'):
+            return None
+        if isinstance(value, field.model_class):
+            model_class = type(value)
+        elif isinstance(value, dict):
+            model_class = field.model_class
+        else:
+            return None
+        if not _inherits(model_class, Model, '__new__', '__init__', 'convert', '_convert'):
+            return None
+        key = validation_key(context)
+        if context.new or not isinstance(value, Model):
+            target, source, clean = None, value, False
+        else:
+            target, source = value, value._data
+            clean = key is not None and value._validated == key
+        if id(source) in active:
+            raise ValueError('Cannot %s a %s instance that contains itself'
+                             % (action, model_class.__name__))
+        active.add(id(source))
+        data = {}
+        steps = _import_steps(model_class, source, context, data, clean)
+
+        def finish(error):
+            active.discard(id(source))
+            result = data
+            if context.validate:
+                errors = {}
+                if error is not None:
+                    if not isinstance(error, DataError):
+                        raise error
+                    errors, result = error.messages, error.partial_data
+                result = _finish_validation(model_class, result, errors, context)
+            elif error is not None:
+                raise error
+            if target is None:
+                instance = model_class.__new__(model_class)
+                instance._initial = value or {}
+                instance._data = result
+                instance._validated = key
+                return instance
+            if context.convert:
+                target._data.update(_converted_data(result, context))
+            target._validated = key
+            return target
+
+    elif isinstance(field, ListType):
+        if not _inherits(field, ListType, 'convert'):
+            return None
+        data = []
+        steps = field._convert_steps(field._coerce(value), context, data)
+        finish = _finish_collection(data)
+
+    elif isinstance(field, DictType):
+        if not _inherits(field, DictType, 'convert') or not isinstance(value, dict):
+            return None
+        data = {}
+        steps = field._convert_steps(value, context, data)
+        finish = _finish_collection(data)
+
+    else:
+        return None
+
+    if action == 'validate':
+        convert_finish = finish
+
+        def finish(error):
+            result = convert_finish(error)
+            return field._run_validators(result if context.convert else value, context)
+
+    return steps, finish
+
+
+def _expand_limited(field, value, context, format, active):
+    """
+    Expands an export request under ``max_depth``, after replacing a model
+    nested beyond it by its stub or by ``None``. The stub context also applies
+    to requests resolved through the regular call chain, such as those for a
+    custom ``ModelType`` or a model that overrides ``export``.
+    """
+    request_context = context
+    if context.depth > context.max_depth \
+            and isinstance(field, (ModelType, PolyModelType)) \
+            and (isinstance(value, Model)
+                 or isinstance(value, dict) and isinstance(field, ModelType)):
+        if context.stub is None:
+            return _no_steps(), lambda error: None
+        model_class = type(value) if isinstance(value, Model) else field.model_class
+        context = _stub_context(model_class, context)
+    if format is not None:
+        frame = _expand_export(field, value, context, format, active)
+    elif type(context.field_converter) is ExportConverter:
+        frame = _expand_export(field, value, context,
+                               context.field_converter.get_format(field), active)
+    else:
+        frame = None
+    if frame is None and context is not request_context:
+        return _no_steps(), lambda error: resolve(field, value, context, format)
+    return frame
+
+
+def _expand_export(field, value, context, format, active):
+
+    if isinstance(field, (ModelType, PolyModelType)):
+        if isinstance(field, ModelType):
+            if not _inherits(field, ModelType, 'export'):
+                return None
+        elif not _inherits(field, PolyModelType, 'export') \
+                or not isinstance(value, Model) or not field.is_allowed_model(value):
+            return None
+        memo = key = None
+        if isinstance(value, Model):
+            if not _inherits(value, Model, 'export'):
+                return None
+            model_class = type(value)
+            memo = getattr(context, 'memo', None)
+        elif isinstance(value, dict):
+            model_class = field.model_class
+        else:
+            return None
+        if memo is not None:
+            key = _memo_key(value, format, context)
+            if key in memo.results:
+                return _no_steps(), lambda error: memo.results[key][2]
+        if id(value) in active:
+            raise ValueError('Cannot export a %s instance that contains itself'
+                             % model_class.__name__)
+        active.add(id(value))
+        data = {}
+        steps = _export_steps(model_class, value, context, data)
+
+        def finish(error):
+            active.discard(id(value))
+            if error is not None:
+                raise error
+            result = _order_fields(model_class, data)
+            if format == NATIVE:
+                result = model_class._from_native(result)
+            if key is not None:
+                memo.results[key] = value, context, result
+            return result
+
+    elif isinstance(field, ListType):
+        if not _inherits(field, ListType, 'export'):
+            return None
+        data = []
+        steps = field._export_steps(value, format, context, data)
+        finish = _finish_collection(data)
+
+    elif isinstance(field, DictType):
+        if not _inherits(field, DictType, 'export'):
+            return None
+        data = {}
+        steps = field._export_steps(value, format, context, data)
+        finish = _finish_collection(data)
+
+    else:
+        return None
+
+    return steps, finish
+
+
+def _no_steps():
+    return
+    yield
+
+
+def _traced_frame(frame, phase, field, context):
+    """
+    Wraps the ``finish`` function of a stack frame so that processing the
+    request, from now until ``finish`` returns, is reported to ``context.tracer``.
+    """
+    steps, finish = frame
+    end = start_trace(phase, field, context)
+
+    def traced_finish(error):
+        try:
+            result = finish(error)
+        except Exception as exc:
+            end(exc)
+            raise
+        end(None)
+        return result
+
+    return steps, traced_finish
+
+
+def validation_key(context):
+    """
+    Describes the options of a validation run. A model instance that passed
+    validation under a given key is still valid under the same key as long as
+    none of its fields have been assigned to. Returns ``None`` if the context
+    is not a standard validation context, or if it selects fields with
+    ``fields`` or ``exclude`` so that the others go unchecked.
+    """
+    if context.field_converter is not validation_converter or context.mapping \
+            or _projected(context):
+        return None
+    return (context.partial, context.strict, context.convert, context.init_values,
+            context.apply_defaults, context.app_data)
+
+
+def _projected(context):
+    return isinstance(getattr(context, 'fields', None), dict) \
+        or isinstance(getattr(context, 'exclude', None), dict)
+
+
+def _converted_data(data, context):
+    """
+    Returns the part of the ``data`` converted from a model instance that is
+    to be stored back into it: without the fields that a ``fields`` or
+    ``exclude`` projection left undefined.
+    """
+    if not _projected(context):
+        return data
+    return dict((key, value) for key, value in iteritems(data) if value is not Undefined)
+
+
+_immutable_types = (
+    type(None), UndefinedType, numbers.Number, basestring, bytes,
+    datetime.date, datetime.time, datetime.timedelta, uuid.UUID)
+
+
+def _finish_collection(data):
+    def finish(error):
+        if error is not None:
+            raise error
+        return data
+    return finish
+
+
+def _inherits(obj, base, *names):
+    """
+    Tells whether ``obj`` (a class or an instance) uses the implementation
+    from ``base`` for all of the methods named in ``names``.
+    """
+    cls = obj if isinstance(obj, type) else type(obj)
+    key = (cls, base, names)
+    try:
+        return _inherits_cache[key]
+    except KeyError:
+        pass
+    result = all(_function(getattr(cls, name)) is _function(getattr(base, name))
+                 for name in names)
+    _inherits_cache[key] = result
+    return result
+
+_inherits_cache = {}
+
+
+def _function(method):
+    return getattr(method, '__func__', method)
+
+
+
 ###
 # Field filtering
 ###
@@ -465,11 +1272,16 @@ class ExportConverter(FieldConverter):
         self.exceptions = set(exceptions) if exceptions else None
 
     def __call__(self, field, value, context):
-        format = self.primary
+        format = self.get_format(field) if self.exceptions else self.primary
+        if getattr(context, 'tracer', None) is not None:
+            return traced('export', field, context, field.export, value, format, context)
+        return field.export(value, format, context)
+
+    def get_format(self, field):
         if self.exceptions:
             if any((issubclass(field.typeclass, cls) for cls in self.exceptions)):
-                format = self.secondary
-        return field.export(value, format, context)
+                return self.secondary
+        return self.primary
 
 
 _to_native_converter = ExportConverter(NATIVE)
@@ -492,6 +1304,14 @@ class ImportConverter(FieldConverter):
         self.method = operator.attrgetter(self.action)
 
     def __call__(self, field, value, context):
+        if getattr(context, 'tracer', None) is not None:
+            return traced(self.action, field, context, self._call, field, value, context)
+        field.check_required(value, context)
+        if value in (None, Undefined):
+            return value
+        return self.method(field)(value, context)
+
+    def _call(self, field, value, context):
         field.check_required(value, context)
         if value in (None, Undefined):
             return value
@@ -514,10 +1334,11 @@ def get_import_context(**options):
         'partial': False,
         'strict': False,
         'convert': True,
-        'validate': False
+        'validate': False,
+        'max_errors': None
     }
     import_options.update(options)
-    return Context(**import_options)
+    return ConversionContext(**import_options)
 
 
 
@@ -542,6 +1363,29 @@ def to_primitive(cls, instance_or_dict, **kwargs):
     return export_loop(cls, instance_or_dict, _to_primitive_converter, **kwargs)
 
 
+def export_many(cls, instances_or_dicts, format=PRIMITIVE, role=None,
+                raise_error_on_role=True, export_level=None, fields=None, exclude=None,
+                app_data=None):
+    """
+    Generates the export of each item of ``instances_or_dicts`` in ``format``,
+    which is ``PRIMITIVE`` or ``NATIVE``, like ``to_primitive`` and
+    ``to_native`` on plain dicts. All items share a single context, so the
+    options are set up once for the whole batch.
+
+    Nested models may be given as dicts as well, which makes it possible to
+    export rows fetched from a database without creating instances first.
+    """
+    converter = _to_native_converter if format == NATIVE else _to_primitive_converter
+    context = _export_context(None, converter, role, raise_error_on_role, export_level,
+                              None, app_data, cls, fields, exclude)
+    for instance_or_dict in instances_or_dicts:
+        if context.memo is not None:
+            yield export_loop(cls, instance_or_dict,
+                              context=context._branch(memo=_ExportMemo()))
+        else:
+            yield export_loop(cls, instance_or_dict, context=context)
+
+
 EMPTY_LIST = "[]"
 EMPTY_DICT = "{}"
 
@@ -552,34 +1396,72 @@ def expand(data, expanded_data=None):
     it is the counterpart to ``flatten_to_dict``.
 
     :param data:
-        The data to expand.
+        The data to expand: a mapping or an iterable of ``(key, value)`` pairs,
+        such as the output of ``iter_flatten``.
     :param expanded_data:
         Existing expanded data that this function use for output
     """
-    expanded_dict = {}
-    context = expanded_data or expanded_dict
+    expanded_dict = {} if expanded_data is None else expanded_data
+    if hasattr(data, 'items'):
+        data = iteritems(data)
+
+    for key, value in data:
+        node = expanded_dict
+        if '.' in key:
+            path = key.split('.')
+            key = path.pop()
+            for part in path:
+                child = node.setdefault(part, {})
+                if child.__class__ is list and not child:
+                    child = node[part] = {}
+                node = child
+        if value == EMPTY_DICT:
+            if key in node:
+                continue
+            value = {}
+        elif value == EMPTY_LIST:
+            if key in node:
+                continue
+            value = []
+        node[key] = value
 
-    for key, value in iteritems(data):
-        try:
-            key, remaining = key.split(".", 1)
-        except ValueError:
-            if value == EMPTY_DICT:
-                value = {}
-                if key in expanded_dict:
-                    continue
-            elif value == EMPTY_LIST:
-                value = []
-                if key in expanded_dict:
-                    continue
-            expanded_dict[key] = value
-        else:
-            current_context = context.setdefault(key, {})
-            if current_context == []:
-                current_context = context[key] = {}
-            current_context.update(expand({remaining: value}, current_context))
     return expanded_dict
 
 
+def iter_flatten(instance_or_dict, prefix=None, ignore_none=True):
+    """
+    Generates the ``(key, value)`` pairs of ``flatten_to_dict`` one by one,
+    in depth-first order. Takes the same arguments as ``flatten_to_dict``.
+    """
+    stack = [(_flatten_items(instance_or_dict), prefix)]
+    while stack:
+        items, prefix = stack[-1]
+        for key, value in items:
+            if prefix:
+                key = u'%s.%s' % (prefix, key)
+
+            if isinstance(value, (dict, list)):
+                if value:
+                    stack.append((_flatten_items(value), key))
+                    break
+                value = EMPTY_DICT if isinstance(value, dict) else EMPTY_LIST
+
+            if value is not None:
+                yield key, value
+            elif not ignore_none and len(stack) == 1:
+                # As before, ``ignore_none`` only applies to the top level.
+                yield key, None
+        else:
+            stack.pop()
+
+
+def _flatten_items(instance_or_dict):
+    if isinstance(instance_or_dict, dict):
+        return iteritems(instance_or_dict)
+    else:
+        return enumerate(instance_or_dict)
+
+
 def flatten_to_dict(instance_or_dict, prefix=None, ignore_none=True):
     """
     Flattens an iterable structure into a single layer dictionary.
@@ -612,29 +1494,7 @@ def flatten_to_dict(instance_or_dict, prefix=None, ignore_none=True):
         This puts a prefix in front of the field names during flattening.
         Default: None
     """
-    if isinstance(instance_or_dict, dict):
-        iterator = iteritems(instance_or_dict)
-    else:
-        iterator = enumerate(instance_or_dict)
-
-    flat_dict = {}
-    for key, value in iterator:
-        if prefix:
-            key = ".".join(map(unicode, (prefix, key)))
-
-        if value == []:
-            value = EMPTY_LIST
-        elif value == {}:
-            value = EMPTY_DICT
-
-        if isinstance(value, (dict, list)):
-            flat_dict.update(flatten_to_dict(value, prefix=key))
-        elif value is not None:
-            flat_dict[key] = value
-        elif not ignore_none:
-            flat_dict[key] = None
-
-    return flat_dict
+    return dict(iter_flatten(instance_or_dict, prefix, ignore_none))
 
 
 def flatten(cls, instance_or_dict, role=None, raise_error_on_role=True,
@@ -677,10 +1537,159 @@ def flatten(cls, instance_or_dict, role=None, raise_error_on_role=True,
         This puts a prefix in front of the field names during flattening.
         Default: None
     """
-    data = to_primitive(cls, instance_or_dict, role=role, raise_error_on_role=raise_error_on_role,
-                        export_level=DEFAULT, app_data=app_data, context=context)
+    return dict(iter_flatten_model(cls, instance_or_dict, role=role,
+                                   raise_error_on_role=raise_error_on_role,
+                                   ignore_none=ignore_none, prefix=prefix,
+                                   app_data=app_data, context=context))
+
+
+def iter_flatten_model(cls, instance_or_dict, role=None, raise_error_on_role=True,
+                       ignore_none=True, prefix=None, app_data=None, context=None):
+    """
+    Generates the ``(key, value)`` pairs of ``flatten`` one by one. Takes the
+    same arguments as ``flatten``.
+
+    The pairs are produced while walking the model, without building the
+    nested ``to_primitive`` representation first. Values of compound fields
+    that don't use the standard ``export`` methods are exported as usual and
+    then flattened.
+    """
+    context = _export_context(context, _to_primitive_converter, role, raise_error_on_role,
+                              DEFAULT, None, app_data)
+    converter = context.field_converter
+    if not (type(converter) is ExportConverter and converter.primary == PRIMITIVE
+            and not converter.exceptions and context.tracer is None):
+        data = export_loop(cls, instance_or_dict, context=context)
+        for item in iter_flatten(data, prefix, ignore_none):
+            yield item
+        return
+
+    # Frames are ``[entries, prefix, kind, count, instance]``, where ``kind`` is
+    # 'model', 'list' or 'dict', ``count`` is the number of values that the
+    # export would put into the container and ``instance`` is the model
+    # instance being walked, if any. With a plain converter, exporting a value
+    # comes down to ``field.export(value, PRIMITIVE, context)``.
+    memo = getattr(context, 'memo', None)
+    if memo is None:
+        memo = _ExportMemo()
+    instance = instance_or_dict if isinstance(instance_or_dict, Model) else None
+    stack = []
+    try:
+        if instance is not None:
+            memo.enter(instance)
+        stack.append([_flat_model_entries(cls, instance_or_dict, context), prefix, 'model', 0,
+                      instance])
+        for item in _walk_flat(stack, memo, context, ignore_none):
+            yield item
+    finally:
+        # The walk may have been abandoned halfway.
+        for frame in stack:
+            if frame[4] is not None:
+                memo.leave(frame[4])
+
+
+def _walk_flat(stack, memo, context, ignore_none):
+    while stack:
+        frame = stack[-1]
+        entries, prefix, kind = frame[0], frame[1], frame[2]
+        for name, field, value, level in entries:
+            if kind != 'model' or value not in (None, Undefined):
+                if field.is_compound and level > NONEMPTY:
+                    child = _flat_entries(field, value, context)
+                    if child is not None:
+                        if kind == 'list':
+                            name = frame[3]
+                        frame[3] += 1
+                        key = u'%s.%s' % (prefix, name) if prefix else name
+                        instance = value if child[1] == 'model' and isinstance(value, Model) \
+                            else None
+                        if instance is not None:
+                            memo.enter(instance)
+                        stack.append([child[0], key, child[1], 0, instance])
+                        break
+                value = field.export(value, PRIMITIVE, context)
+
+            if value is Undefined and kind == 'model':
+                if level <= DEFAULT:
+                    continue
+                value = None
+            if value is None:
+                if level <= NOT_NONE:
+                    continue
+            elif field.is_compound and len(value) == 0:
+                if level <= NONEMPTY:
+                    continue
+            if kind == 'list':
+                name = frame[3]
+            frame[3] += 1
+            key = u'%s.%s' % (prefix, name) if prefix else name
+
+            if isinstance(value, (dict, list)):
+                if value:
+                    for item in iter_flatten(value, key):
+                        yield item
+                else:
+                    yield key, EMPTY_DICT if isinstance(value, dict) else EMPTY_LIST
+            elif value is not None:
+                yield key, value
+            elif not ignore_none and len(stack) == 1:
+                yield key, None
+        else:
+            stack.pop()
+            if frame[4] is not None:
+                memo.leave(frame[4])
+            if stack and frame[3] == 0:
+                yield prefix, EMPTY_LIST if kind == 'list' else EMPTY_DICT
+
+
+def _flat_entries(field, value, context):
+    """
+    Returns ``(entries, kind)`` for walking a compound value in
+    ``iter_flatten_model``, or ``None`` if it must be exported as a whole.
+    """
+    if isinstance(field, ModelType):
+        stock = _inherits(field, ModelType, 'export')
+    elif isinstance(field, PolyModelType):
+        stock = _inherits(field, PolyModelType, 'export') and field.is_allowed_model(value)
+    elif isinstance(field, ListType):
+        if _inherits(field, ListType, 'export'):
+            return _flat_item_entries(field.field, enumerate(value), context), 'list'
+        return None
+    elif isinstance(field, DictType):
+        if _inherits(field, DictType, 'export'):
+            return _flat_item_entries(field.field, iteritems(value), context), 'dict'
+        return None
+    else:
+        return None
+    if stock and isinstance(value, Model) and _inherits(value, Model, 'export'):
+        return _flat_model_entries(type(value), value, context), 'model'
+    if stock and isinstance(value, dict) and isinstance(field, ModelType):
+        return _flat_model_entries(field.model_class, value, context), 'model'
+    return None
+
+
+def _flat_model_entries(cls, instance_or_dict, context):
+    gottago = _role_filter(cls, context)
+    entries = []
+    for field_name, field, value in atoms(cls, instance_or_dict):
+        if gottago(field_name, value):
+            continue
+        level = field.get_export_level(context)
+        if level == DROP:
+            continue
+        entries.append((field.serialized_name or field_name, field, value, level))
+    fields_order = (getattr(cls._options, 'fields_order', None)
+                    if hasattr(cls, '_options') else None)
+    if fields_order:
+        last = len(fields_order)
+        entries.sort(key=lambda e: fields_order.index(e[0]) if e[0] in fields_order else last)
+    return iter(entries)
 
-    flattened = flatten_to_dict(data, prefix=prefix, ignore_none=ignore_none)
 
-    return flattened
+def _flat_item_entries(field, items, context):
+    level = field.get_export_level(context)
+    if level == DROP:
+        return
+    for key, value in items:
+        yield key, field, value, level
 
@@ -18,6 +18,7 @@ from six import iteritems
 from ..common import *
 from ..datastructures import Context
 from ..exceptions import ConversionError, ValidationError, StopValidationError
+from ..tracing import traced
 from ..undefined import Undefined
 from ..validate import prepare_validator, get_validation_context
 
@@ -270,6 +271,16 @@ class BaseType(TypeMeta('BaseTypeBase', (object, ), {})):
         elif self.is_compound:
             self.convert(value, context)
 
+        if getattr(context, 'tracer', None) is not None:
+            return self._run_validators(value, context)
+        return self._call_validators(value, context)
+
+    def _run_validators(self, value, context):
+        if getattr(context, 'tracer', None) is not None:
+            return traced('validators', self, context, self._call_validators, value, context)
+        return self._call_validators(value, context)
+
+    def _call_validators(self, value, context):
         errors = []
         for validator in self.validators:
             try:
@@ -980,7 +991,7 @@ class TimestampType(DateTimeType):
         super(TimestampType, self).__init__(formats=formats, parser=parser, tzd='require', 
                                             convert_tz=True, drop_tzinfo=drop_tzinfo)
 
-    def to_primitive(self, value):
+    def to_primitive(self, value, context=None):
         if value.tzinfo is None:
             value = value.replace(tzinfo=self.UTC)
         else:
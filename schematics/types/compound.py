@@ -5,11 +5,14 @@ from __future__ import division
 from collections import Iterable, Sequence, Mapping
 import itertools
 import functools
+import numbers
 
 from ..common import *
 from ..exceptions import *
 from ..models import Model, ModelMeta
+from ..tracing import ITEM
 from ..undefined import Undefined
+from ..util import drive
 from .base import BaseType, get_value_in
 
 from six import iteritems
@@ -107,7 +110,8 @@ class ModelType(MultiType):
 
         if isinstance(value, self.model_class):
             model_class = type(value)
-        elif isinstance(value, dict):
+        elif isinstance(value, dict) or getattr(context, 'source', None) == 'attrs' \
+                and _has_attributes(value):
             model_class = self.model_class
         else:
             raise ConversionError(
@@ -120,6 +124,70 @@ class ModelType(MultiType):
         return model_instance.export(format=format, context=context)
 
 
+def _has_attributes(value):
+    """
+    Tells whether ``value`` can be imported with ``source='attrs'``: an object
+    with attributes, such as an ORM row or a named tuple, as opposed to a
+    string, a number or a plain container.
+    """
+    if isinstance(value, (basestring, bytes, numbers.Number)):
+        return False
+    return hasattr(value, '__dict__') or hasattr(type(value), '__slots__')
+
+
+def _slice_items(collection, items, context):
+    """
+    Applies the ``slices`` option of ``transforms.export_loop`` to ``items``,
+    the ``(key, value)`` pairs of the list or dict ``collection``. Returns
+    the pairs to export, the context for the items and whether the items
+    need their own ``slice_path``, which holds the key of the item in the
+    output: the position in the exported list, or the dict key.
+    """
+    slices = getattr(context, 'slices', None)
+    if not isinstance(slices, tuple):
+        return items, context, False
+    start, stop, item_slices = slices
+    totals = context.totals
+    if start is not None:
+        items = itertools.islice(items, start, stop)
+        if totals is not None:
+            totals[_slice_key(context.slice_path)] = len(collection)
+    return (items, context._branch(slices=item_slices),
+            bool(item_slices) and totals is not None)
+
+
+def _slice_key(slice_path):
+    return u'.'.join(unicode(part) for part in slice_path)
+
+
+def _discard_totals(context):
+    """
+    Removes the ``totals`` recorded below ``context.slice_path`` for an item
+    that was left out of the output.
+    """
+    prefix = _slice_key(context.slice_path) + u'.'
+    totals = context.totals
+    for key in [key for key in totals if key.startswith(prefix)]:
+        del totals[key]
+
+
+def _item_projection(context):
+    """
+    Returns the context for the items of a list or dict, whose ``fields`` and
+    ``exclude`` projections are those under ``*``. See ``transforms.import_loop``.
+    Paths that could not be checked, below a ``PolyModelType``, may leave out
+    the ``*``.
+    """
+    fields = getattr(context, 'fields', None)
+    exclude = getattr(context, 'exclude', None)
+    if not isinstance(fields, dict) and not isinstance(exclude, dict):
+        return context
+    fields = fields.get('*', fields) if isinstance(fields, dict) else None
+    exclude = exclude.get('*', exclude) if isinstance(exclude, dict) else None
+    return context._branch(fields=fields if isinstance(fields, dict) else False,
+                           exclude=exclude if isinstance(exclude, dict) else False)
+
+
 class ListType(MultiType):
     """A field for storing a list of items, all of which must conform to the type
     specified by the ``field`` parameter.
@@ -172,17 +240,34 @@ class ListType(MultiType):
         raise ConversionError('Could not interpret the value as a list')
 
     def convert(self, value, context):
-        value = self._coerce(value)
         data = []
+        drive(self._convert_steps(self._coerce(value), context, data))
+        return data
+
+    def _convert_steps(self, value, context, data):
+        """Step generator behind `convert`. Compound items are yielded as
+        conversion requests; see `transforms.import_loop`.
+        """
+        field = self.field
+        if getattr(context, 'tracer', None) is not None:
+            context = context._branch(trace_path=getattr(context, 'trace_path', ()) + (ITEM,))
+        context = _item_projection(context)
+        # PolyModelType values are not expanded on import; convert them directly.
+        expand = field.is_compound and not isinstance(field, PolyModelType)
         errors = {}
         for index, item in enumerate(value):
             try:
-                data.append(context.field_converter(self.field, item, context))
+                if expand:
+                    data.append((yield field, item, context))
+                else:
+                    data.append(context.field_converter(field, item, context))
             except BaseError as exc:
                 errors[index] = exc
+                if context.max_errors and len(errors) >= context.max_errors:
+                    errors[TRUNCATED] = truncation_error(context.max_errors)
+                    break
         if errors:
             raise CompoundError(errors)
-        return data
 
     def check_length(self, value, context):
         list_length = len(value) if value else 0
@@ -207,19 +292,41 @@ class ListType(MultiType):
         as `transforms.export_loop`.
         """
         data = []
-        _export_level = self.field.get_export_level(context)
+        drive(self._export_steps(list_instance, format, context, data))
+        return data
+
+    def _export_steps(self, list_instance, format, context, data):
+        """Step generator behind `export`. Compound items are yielded as
+        export requests; see `transforms.export_loop`.
+        """
+        field = self.field
+        if getattr(context, 'tracer', None) is not None:
+            context = context._branch(trace_path=getattr(context, 'trace_path', ()) + (ITEM,))
+        context = _item_projection(context)
+        _export_level = field.get_export_level(context)
         if _export_level == DROP:
-            return data
-        for value in list_instance:
-            shaped = self.field.export(value, format, context)
+            return
+        items, context, item_paths = _slice_items(
+            list_instance, enumerate(list_instance), context)
+        item_context = context
+        for index, value in items:
+            if item_paths:
+                item_context = context._branch(slice_path=context.slice_path + (len(data),))
+            if field.is_compound:
+                shaped = yield field, value, item_context, format
+            else:
+                shaped = field.export(value, format, context)
             if shaped is None:
                 if _export_level <= NOT_NONE:
+                    if item_paths:
+                        _discard_totals(item_context)
                     continue
-            elif self.field.is_compound and len(shaped) == 0:
+            elif field.is_compound and len(shaped) == 0:
                 if _export_level <= NONEMPTY:
+                    if item_paths:
+                        _discard_totals(item_context)
                     continue
             data.append(shaped)
-        return data
 
 
 class DictType(MultiType):
@@ -246,15 +353,33 @@ class DictType(MultiType):
             raise ConversionError(u'Only dictionaries may be used in a DictType')
 
         data = {}
+        drive(self._convert_steps(value, context, data))
+        return data
+
+    def _convert_steps(self, value, context, data):
+        """Step generator behind `convert`. Compound values are yielded as
+        conversion requests; see `transforms.import_loop`.
+        """
+        field = self.field
+        if getattr(context, 'tracer', None) is not None:
+            context = context._branch(trace_path=getattr(context, 'trace_path', ()) + (ITEM,))
+        context = _item_projection(context)
+        # PolyModelType values are not expanded on import; convert them directly.
+        expand = field.is_compound and not isinstance(field, PolyModelType)
         errors = {}
         for k, v in iteritems(value):
             try:
-                data[self.coerce_key(k)] = context.field_converter(self.field, v, context)
+                if expand:
+                    data[self.coerce_key(k)] = yield field, v, context
+                else:
+                    data[self.coerce_key(k)] = context.field_converter(field, v, context)
             except BaseError as exc:
                 errors[k] = exc
+                if context.max_errors and len(errors) >= context.max_errors:
+                    errors[TRUNCATED] = truncation_error(context.max_errors)
+                    break
         if errors:
             raise CompoundError(errors)
-        return data
 
     def export(self, dict_instance, format, context):
         """Loops over each item in the model and applies either the field
@@ -262,19 +387,41 @@ class DictType(MultiType):
         as `transforms.export_loop`.
         """
         data = {}
-        _export_level = self.field.get_export_level(context)
+        drive(self._export_steps(dict_instance, format, context, data))
+        return data
+
+    def _export_steps(self, dict_instance, format, context, data):
+        """Step generator behind `export`. Compound values are yielded as
+        export requests; see `transforms.export_loop`.
+        """
+        field = self.field
+        if getattr(context, 'tracer', None) is not None:
+            context = context._branch(trace_path=getattr(context, 'trace_path', ()) + (ITEM,))
+        context = _item_projection(context)
+        _export_level = field.get_export_level(context)
         if _export_level == DROP:
-            return data
-        for key, value in iteritems(dict_instance):
-            shaped = self.field.export(value, format, context)
+            return
+        items, context, item_paths = _slice_items(
+            dict_instance, iteritems(dict_instance), context)
+        item_context = context
+        for key, value in items:
+            if item_paths:
+                item_context = context._branch(slice_path=context.slice_path + (key,))
+            if field.is_compound:
+                shaped = yield field, value, item_context, format
+            else:
+                shaped = field.export(value, format, context)
             if shaped is None:
                 if _export_level <= NOT_NONE:
+                    if item_paths:
+                        _discard_totals(item_context)
                     continue
-            elif self.field.is_compound and len(shaped) == 0:
+            elif field.is_compound and len(shaped) == 0:
                 if _export_level <= NONEMPTY:
+                    if item_paths:
+                        _discard_totals(item_context)
                     continue
             data[key] = shaped
-        return data
 
 
 class PolyModelType(MultiType):
@@ -48,6 +48,9 @@ class UndefinedType(object):
     def __setattr__(self, name, value):
         raise TypeError("'UndefinedType' object does not support attribute assignment")
 
+    def __reduce__(self):
+        return 'Undefined'
+
 
 Undefined = UndefinedType()
 
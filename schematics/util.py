@@ -51,3 +51,38 @@ def listify(value):
     else:
         return [value]
 
+
+
+def resolve(field, value, context, format=None):
+    """
+    Resolves a single conversion request yielded by a step generator.
+
+    Requests of the form ``(field, value, context)`` go through
+    ``context.field_converter``; requests that also carry an export ``format``
+    are passed straight to ``field.export``.
+    """
+    if format is None:
+        return context.field_converter(field, value, context)
+    else:
+        return field.export(value, format, context)
+
+
+def drive(steps):
+    """
+    Runs a step generator to completion by resolving each of its requests
+    recursively. The result of a request is sent back into the generator;
+    an exception is thrown back into it at the same point.
+    """
+    result = error = None
+    while True:
+        try:
+            if error is None:
+                request = steps.send(result)
+            else:
+                request = steps.throw(error)
+        except StopIteration:
+            return
+        try:
+            result, error = resolve(*request), None
+        except Exception as exc:
+            result, error = None, exc
@@ -1,13 +1,13 @@
 import functools
 import inspect
 
-from .datastructures import Context
+from .datastructures import ConversionContext
 from .exceptions import FieldError, DataError
 from .undefined import Undefined
 
 
 def validate(cls, instance_or_dict, trusted_data=None, partial=False, strict=False,
-             convert=True, context=None, **kwargs):
+             convert=True, max_errors=None, context=None, **kwargs):
     """
     Validate some untrusted data using a model. Trusted data can be passed in
     the `trusted_data` parameter.
@@ -30,6 +30,9 @@ def validate(cls, instance_or_dict, trusted_data=None, partial=False, strict=Fal
         Can be turned off to skip an unnecessary conversion step if all values
         are known to have the right datatypes (e.g., when validating immediately
         after the initial import). Default: True
+    :param max_errors:
+        Stop collecting errors once this many have been found in a single model,
+        list or dict. Default: None (no limit)
 
     :returns: data
         ``dict`` containing the valid raw_data plus ``trusted_data``.
@@ -38,7 +41,8 @@ def validate(cls, instance_or_dict, trusted_data=None, partial=False, strict=Fal
     """
     from .transforms import import_loop
 
-    context = context or get_validation_context(partial=partial, strict=strict, convert=convert)
+    context = context or get_validation_context(partial=partial, strict=strict, convert=convert,
+                                                max_errors=max_errors)
 
     errors = {}
     try:
@@ -48,6 +52,14 @@ def validate(cls, instance_or_dict, trusted_data=None, partial=False, strict=Fal
         errors = exc.messages
         data = exc.partial_data
 
+    return _finish_validation(cls, data, errors, context)
+
+
+def _finish_validation(cls, data, errors, context):
+    """
+    Runs the model level validators on the result of the import loop and raises
+    a ``DataError`` if either step produced errors.
+    """
     partial_data = dict(((key, value) for key, value in data.items() if value is not Undefined))
 
     errors.update(_validate_model(cls, data, partial_data, context))
@@ -98,10 +110,11 @@ def get_validation_context(**options):
         'partial': False,
         'strict': False,
         'convert': True,
-        'validate': True
+        'validate': True,
+        'max_errors': None
     }
     validation_options.update(options)
-    return Context(**validation_options)
+    return ConversionContext(**validation_options)
 
 
 def prepare_validator(func, argcount):
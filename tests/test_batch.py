@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+import multiprocessing
+
+import pytest
+
+from schematics.models import Model
+from schematics.batch import validate_batch
+from schematics.exceptions import DataError, ConversionError, ValidationError, TRUNCATED
+from schematics.types import StringType, IntType
+from schematics.types.compound import ModelType, ListType
+
+
+class Tag(Model):
+    name = StringType(required=True)
+
+
+class Person(Model):
+    name = StringType(required=True)
+    age = IntType(min_value=0)
+    tags = ListType(ModelType(Tag))
+
+
+class Checked(Model):
+    name = StringType()
+
+    def validate_name(self, data, value):
+        if value == 'bad':
+            raise ValidationError('Bad name')
+        if value == 'boom':
+            raise TypeError('Cannot check boom')
+
+
+def make_record(i):
+    if i % 10 == 3:
+        return {'age': -1, 'tags': [{'name': 'a'}, {}]}
+    if i % 10 == 7:
+        return {'name': 'P%d' % i, 'age': 'old'}
+    return {'name': 'P%d' % i, 'age': i, 'tags': [{'name': 't%d' % i}]}
+
+
+def expected_error(i):
+    with pytest.raises(DataError) as excinfo:
+        Person(make_record(i)).validate()
+    return excinfo.value
+
+
+def test_validate_batch():
+    with validate_batch(Person, (make_record(i) for i in range(95)),
+                        processes=2, chunk_size=10) as results:
+        assert len(results) == 95
+        assert results[0] == Person(make_record(0))
+        assert results[-1] == Person(make_record(94))
+        assert results.is_valid(5)
+        assert not results.is_valid(13)
+        assert results.error(5) is None
+
+        with pytest.raises(DataError) as excinfo:
+            results[13]
+        assert excinfo.value.messages == expected_error(13).messages
+        assert set(excinfo.value.messages) == set(['name', 'age', 'tags'])
+        assert list(excinfo.value.messages['tags']) == [1]
+
+        assert results.error(17).messages == expected_error(17).messages
+        assert type(results.error(17).messages['age']) is ConversionError
+
+        pairs = list(results.items())
+        assert len(pairs) == 95
+        assert [i for i, (instance, error) in enumerate(pairs) if error is not None] \
+            == [i for i in range(95) if i % 10 in (3, 7)]
+        assert pairs[8] == (Person(make_record(8)), None)
+
+    assert len(results) == 0
+
+
+def test_validate_batch_with_pool():
+    pool = multiprocessing.Pool(1)
+    try:
+        with validate_batch(Person, [make_record(0)], pool=pool, partial=True) as results:
+            assert results[0].name == 'P0'
+        with validate_batch(Person, [], pool=pool) as results:
+            assert len(results) == 0
+    finally:
+        pool.close()
+        pool.join()
+
+
+def test_validate_batch_plain_errors():
+    records = [{'name': 'bad'}, {'name': 'ok', 'rogue': 1}, {'name': 'ok'}]
+    with validate_batch(Checked, records, processes=1) as results:
+        assert results.error(0).messages == {'name': ['Bad name']}
+        assert type(results.error(0).messages['name']) is ValidationError
+        assert results.error(1).messages == {'rogue': ['Rogue field']}
+        assert results[2] == Checked({'name': 'ok'})
+
+
+def test_validate_batch_truncated_errors():
+    records = [{'name': 'n', 'tags': [{}] * 5}]
+    with validate_batch(Person, records, processes=1, max_errors=2) as results:
+        errors = results.error(0).messages['tags']
+        assert sorted(key for key in errors if key is not TRUNCATED) == [0, 1]
+        assert errors[TRUNCATED] == [u'Too many errors; stopped after 2.']
+
+
+def test_validate_batch_unexpected_errors():
+    records = [{'name': 'boom'}, 'nope', {'name': 'ok'}]
+    with validate_batch(Checked, records, processes=1) as results:
+        error = results.error(0)
+        assert type(error) is ValidationError
+        assert error.messages == [u'TypeError: Cannot check boom']
+        with pytest.raises(ConversionError) as excinfo:
+            results[1]
+        assert excinfo.value.messages == [u'Model conversion requires a model or dict']
+        assert results[2] == Checked({'name': 'ok'})
+        assert [error is None for instance, error in results.items()] == [False, False, True]
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+import datetime
+import decimal
+import uuid
+
+import pytest
+
+from schematics.models import Model
+from schematics.binary import to_bytes, from_bytes, decode
+from schematics.types import (
+    BaseType, StringType, IntType, LongType, FloatType, BooleanType, DecimalType, DateType,
+    DateTimeType, UTCDateTimeType, TimestampType, UUIDType, GeoPointType)
+from schematics.types.compound import ModelType, PolyModelType, ListType, DictType
+
+
+class Author(Model):
+    name = StringType()
+    email = StringType(serialized_name='mail')
+
+
+class Post(Model):
+    id = LongType()
+    title = StringType()
+    score = FloatType()
+    published = BooleanType()
+    price = DecimalType()
+    day = DateType()
+    created = DateTimeType()
+    updated = UTCDateTimeType()
+    stamp = TimestampType()
+    uid = UUIDType()
+    location = GeoPointType()
+    author = ModelType(Author)
+    tags = ListType(StringType())
+    ratings = DictType(ListType(IntType()))
+
+
+class Node(Model):
+    name = StringType()
+    children = ListType(ModelType('Node'))
+
+
+class Circle(Model):
+    radius = FloatType()
+
+
+class Square(Model):
+    side = FloatType()
+
+
+class Canvas(Model):
+    shapes = ListType(PolyModelType([Circle, Square]))
+
+
+def test_round_trip():
+    post = Post({
+        'id': 2 ** 40,
+        'title': u'Pöst',
+        'score': 1.25,
+        'published': False,
+        'price': '10.50',
+        'day': '2015-11-08',
+        'created': '2015-11-08T12:30:00.123456+05:30',
+        'updated': '2015-11-08T12:30:00Z',
+        'stamp': 1446991200.5,
+        'uid': uuid.uuid4(),
+        'location': [1.5, 2.0],
+        'author': {'name': 'Jane', 'mail': 'jane@example.com'},
+        'tags': ['a', None, 'c'],
+        'ratings': {'x': [1, 2], 'y': []},
+    })
+    result = Post.from_bytes(post.to_bytes())
+    assert result == post
+    assert result.to_primitive() == post.to_primitive()
+    assert result.created.utcoffset() == datetime.timedelta(hours=5, minutes=30)
+    assert result.updated.tzinfo is None
+    assert isinstance(result.price, decimal.Decimal)
+
+
+def test_undefined_and_none():
+    post = Post({'title': None, 'tags': []})
+    result = Post.from_bytes(post.to_bytes())
+    assert result._data == post._data
+    assert len(post.to_bytes()) == 4 + 4
+
+
+def test_encodes_dict_of_native_values():
+    assert to_bytes(Author, {'name': u'Jane', 'email': None}) == Author({'name': 'Jane'}).to_bytes()
+    assert from_bytes(Author, to_bytes(Author, {'name': u'Jane'})).name == u'Jane'
+
+
+def test_recursive_and_polymorphic():
+    node = Node({'name': 'a', 'children': [{'name': 'b', 'children': [{'name': 'c'}]}]})
+    assert Node.from_bytes(node.to_bytes()) == node
+
+    canvas = Canvas({'shapes': [Circle({'radius': 1.0}), Square({'side': 2.0})]})
+    result = Canvas.from_bytes(canvas.to_bytes())
+    assert [type(shape) for shape in result.shapes] == [Circle, Square]
+    assert result == canvas
+
+
+def test_unsupported_polymorphic_class():
+
+    class Oval(Circle):
+        pass
+
+    class Frame(Model):
+        shape = PolyModelType(Circle)
+
+    assert Frame.from_bytes(Frame({'shape': Circle({'radius': 1.0})}).to_bytes()).shape.radius == 1.0
+    with pytest.raises(TypeError):
+        Frame({'shape': Oval({'radius': 1.0})}).to_bytes()
+
+
+def test_decode_at_offset():
+    first = Author({'name': 'Jane'}).to_bytes()
+    second = Author({'name': 'Joe'}).to_bytes()
+    data = first + second
+    author, offset = decode(Author, data)
+    assert author.name == 'Jane'
+    author, offset = decode(Author, data, offset)
+    assert author.name == 'Joe'
+    assert offset == len(data)
+
+
+def test_invalid_payload():
+    data = Author({'name': 'Jane'}).to_bytes()
+    with pytest.raises(ValueError):
+        Author.from_bytes(data[:-1])
+    with pytest.raises(ValueError):
+        Author.from_bytes(data + b'\0')
+    with pytest.raises(ValueError):
+        Post({'id': 2 ** 70}).to_bytes()
+
+
+def test_corrupt_payload():
+    post = Post({
+        'id': 1,
+        'title': u'Pöst',
+        'price': '10.50',
+        'day': '2015-11-08',
+        'created': '2015-11-08T12:30:00+05:30',
+        'uid': uuid.uuid4(),
+        'author': {'name': 'Jane'},
+        'tags': ['a', None],
+        'ratings': {'x': [1, 2]},
+    })
+    canvas = Canvas({'shapes': [{'radius': 1.0}, Square({'side': 2.0})]})
+    for cls, data in [(Post, post.to_bytes()), (Canvas, canvas.to_bytes())]:
+        for size in range(len(data)):
+            with pytest.raises(ValueError):
+                cls.from_bytes(data[:size])
+        for position in range(len(data)):
+            for byte in (0x00, 0x7f, 0xff):
+                corrupt = bytearray(data)
+                corrupt[position] = byte
+                try:
+                    cls.from_bytes(bytes(corrupt))
+                except ValueError:
+                    pass
+
+
+def test_invalid_values_in_payload():
+
+    def post_with(field_name, payload):
+        position = list(Post._fields).index(field_name)
+        data = bytearray(Post().to_bytes())
+        data[position >> 2] = 2 << ((position & 3) << 1)
+        return bytes(data + payload)
+
+    with pytest.raises(ValueError):
+        Post.from_bytes(post_with('price', b'\x03\0\0\0abc'))
+    with pytest.raises(ValueError):
+        Post.from_bytes(post_with('day', b'\0\0\0\0'))
+    with pytest.raises(ValueError):
+        Post.from_bytes(post_with('created', b'\xff\xff\xff\xff\xff\xff\xff\x7f\0\0\0\0'))
+
+    circle = Canvas({'shapes': [{'radius': 1.0}]}).to_bytes()
+    square = Canvas({'shapes': [Square({'side': 1.0})]}).to_bytes()
+    position = [a == b for a, b in zip(bytearray(circle), bytearray(square))].index(False)
+    data = bytearray(circle)
+    data[position] = 0xff
+    with pytest.raises(ValueError):
+        Canvas.from_bytes(bytes(data))
+
+
+class Version(object):
+
+    def __init__(self, text):
+        self.parts = tuple(int(part) for part in text.split('.'))
+
+    def __eq__(self, other):
+        return isinstance(other, Version) and self.parts == other.parts
+
+
+class VersionType(BaseType):
+
+    def to_native(self, value, context=None):
+        return value if isinstance(value, Version) else Version(value)
+
+    def to_primitive(self, value, context=None):
+        return '.'.join(str(part) for part in value.parts)
+
+
+class Release(Model):
+    version = VersionType()
+    history = ListType(VersionType())
+    numbers = ListType(IntType())
+    labels = DictType(IntType())
+
+
+def test_values_encoded_as_json_use_the_primitive_form():
+    release = Release({'version': '1.2.3', 'history': ['1.0', '1.1']})
+    assert Release.from_bytes(release.to_bytes()) == release
+
+
+def test_long_collections():
+    numbers = [None if i % 3 else i for i in range(1000)]
+    labels = dict(('k%d' % i, None if i % 5 else i) for i in range(300))
+    release = Release({'numbers': numbers, 'labels': labels})
+    result = Release.from_bytes(release.to_bytes())
+    assert result.numbers == numbers
+    assert result.labels == labels
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+import datetime
+import decimal
+
+import pytest
+from six import StringIO
+
+from schematics.models import Model
+from schematics.csvio import csv_header, write_csv, read_csv
+from schematics.types import StringType, IntType, BooleanType, DateTimeType, DecimalType
+from schematics.types.compound import ModelType, ListType, DictType
+from schematics.types.serializable import serializable
+
+
+class Author(Model):
+    name = StringType()
+    email = StringType(serialized_name='mail')
+
+
+class Comment(Model):
+    author = ModelType(Author)
+    text = StringType()
+
+
+class Post(Model):
+    id = IntType()
+    title = StringType()
+    published = BooleanType()
+    created = DateTimeType()
+    price = DecimalType()
+    author = ModelType(Author)
+    tags = ListType(StringType())
+    comments = ListType(ModelType(Comment))
+    counts = DictType(IntType())
+
+    @serializable
+    def tag_count(self):
+        return len(self.tags or ())
+
+
+class Node(Model):
+    name = StringType()
+    child = ModelType('Node')
+
+
+def make_post(i):
+    return Post({
+        'id': i,
+        'title': u'Pöst %d' % i,
+        'published': i % 2 == 0,
+        'created': datetime.datetime(2015, 11, 8, 12, i),
+        'price': decimal.Decimal('%d.50' % i),
+        'author': {'name': 'Jane', 'mail': 'jane@example.com'},
+        'tags': ['a', 'b'][:i % 3],
+        'comments': [{'author': {'name': 'Joe'}, 'text': 'Nice'}],
+        'counts': {'views': i, 'likes': 2},
+    })
+
+
+def test_header():
+    assert csv_header(Post, list_width=2) == [
+        'id', 'title', 'published', 'created', 'price', 'author.name', 'author.mail',
+        'tags.0', 'tags.1',
+        'comments.0.author.name', 'comments.0.author.mail', 'comments.0.text',
+        'comments.1.author.name', 'comments.1.author.mail', 'comments.1.text',
+        'counts', 'tag_count']
+
+
+def test_round_trip():
+    posts = [make_post(i) for i in range(5)]
+    f = StringIO()
+    assert write_csv(Post, iter(posts), f, list_width=2) == 5
+
+    f.seek(0)
+    result = list(read_csv(Post, f))
+    for post in posts:
+        post.tags = post.tags or None
+    assert result == posts
+
+
+def test_opaque_columns():
+    f = StringIO()
+    write_csv(Post, [make_post(1)], f)
+    f.seek(0)
+    header, row = f.read().splitlines()
+    assert row.endswith(',"{""likes"": 2, ""views"": 1}",1')
+
+    f = StringIO()
+    node = Node({'name': 'a', 'child': {'name': 'b', 'child': {'name': 'c'}}})
+    write_csv(Node, [node], f)
+    f.seek(0)
+    assert f.read().splitlines() == [
+        'name,child',
+        'a,"{""child.name"": ""c"", ""name"": ""b""}"']
+    f.seek(0)
+    assert list(read_csv(Node, f)) == [node]
+
+
+def test_list_width_exceeded():
+    post = Post({'tags': ['a', 'b', 'c']})
+    with pytest.raises(ValueError):
+        write_csv(Post, [post], StringIO(), list_width=2)
+
+
+def test_read_subset_of_columns():
+    f = StringIO('title,id,tags.2\nfoo,1,x\n,2,\n')
+    first, second = read_csv(Post, f)
+    assert first == Post({'id': 1, 'title': 'foo', 'tags': ['x']})
+    assert second == Post({'id': 2})
+
+
+def test_long_lists():
+    tags = ['t%d' % i for i in range(12)]
+    comments = [{'text': 'c%d' % i} for i in range(12)]
+    post = Post({'id': 1, 'tags': tags, 'comments': comments})
+    f = StringIO()
+    write_csv(Post, [post], f, list_width=12)
+    f.seek(0)
+    assert list(read_csv(Post, f)) == [post]
+
+    f = StringIO('tags.10,tags.2,tags.1,tags.11,id\nk,c,b,l,1\n')
+    assert list(read_csv(Post, f)) == [Post({'id': 1, 'tags': ['b', 'c', 'k', 'l']})]
+
+
+def test_read_unknown_column():
+    with pytest.raises(ValueError):
+        list(read_csv(Post, StringIO('id,body\n1,foo\n')))
+
+
+def test_read_is_lazy():
+    lines = ('%d,t%d\n' % (i, i) for i in range(10 ** 6))
+    reader = read_csv(Post, _Lines(['id,title\n'], lines))
+    assert next(reader) == Post({'id': 0, 'title': 't0'})
+    assert next(reader) == Post({'id': 1, 'title': 't1'})
+
+
+class _Lines(object):
+
+    def __init__(self, head, tail):
+        self.head = iter(head)
+        self.tail = tail
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        for line in self.head:
+            return line
+        return next(self.tail)
+
+    next = __next__
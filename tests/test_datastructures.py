@@ -5,7 +5,7 @@ import pytest
 from six import PY3
 from six.moves import zip
 
-from schematics.datastructures import OrderedDict, DataObject, Context
+from schematics.datastructures import OrderedDict, DataObject, Context, ConversionContext
 
 
 def test_od_create():
@@ -149,6 +149,39 @@ def test_od_sort():
     assert od.keys() == list(range(9, -1, -1))
 
 
+def test_od_iterators():
+    od = OrderedDict([('a', 'b'), ('c', 'd'), ('foo', 'bar')])
+
+    for method in (od.iterkeys, od.itervalues, od.iteritems):
+        iterator = method()
+        assert iter(iterator) is iterator
+
+    assert list(od.iterkeys()) == ['a', 'c', 'foo']
+    assert list(od.itervalues()) == ['b', 'd', 'bar']
+    assert list(od.iteritems()) == [('a', 'b'), ('c', 'd'), ('foo', 'bar')]
+    assert od.values() == ['b', 'd', 'bar']
+    assert od.items() == [('a', 'b'), ('c', 'd'), ('foo', 'bar')]
+
+
+def test_od_equality_ignores_order():
+    od = OrderedDict([('a', 'b'), ('c', 'd')])
+
+    assert od == OrderedDict([('c', 'd'), ('a', 'b')])
+    assert not od != OrderedDict([('c', 'd'), ('a', 'b')])
+    assert od != OrderedDict([('a', 'b')])
+
+
+def test_od_sort_cmp():
+    od = OrderedDict([('b', 1), ('c', 0), ('a', 2)])
+    od.sort(cmp=lambda x, y: (x[1] > y[1]) - (x[1] < y[1]))
+
+    assert od.keys() == ['c', 'b', 'a']
+
+    od['d'] = -1
+    del od['b']
+    assert od.keys() == ['c', 'a', 'd']
+
+
 def test_od_repr():
     od = OrderedDict([('a', 'b'), ('c', 'd'), ('foo', 'bar')])
 
@@ -286,3 +319,60 @@ def test_context():
     c._setdefaults(FooContext(x=9, z=9))
     assert c.__dict__ == dict(x=1, y=2, z=9)
 
+
+def test_conversion_context():
+
+    c = ConversionContext(strict=True, mapping={}, foo=1)
+    assert isinstance(c, Context)
+    assert c.strict is True
+    assert c.foo == 1
+    assert c['foo'] == 1
+    assert 'strict' in c and 'partial' not in c
+    assert c._get('partial') is None
+    assert getattr(c, 'partial', 42) == 42
+    assert c == Context(strict=True, mapping={}, foo=1)
+    assert len(c) == 3
+
+    with pytest.raises(TypeError):
+        c.strict = False
+    c.partial = False
+    assert c.partial is False
+
+    c._setdefaults(dict(strict=False, convert=True, bar=2))
+    assert c.strict is True
+    assert c.convert is True
+    assert c.bar == 2
+
+    assert c._branch() is c
+    assert c._branch(mapping=None) is c
+    assert c._branch(mapping={}) is c
+
+    d = c._branch(mapping={'a': 'b'}, foo=3)
+    assert d is not c
+    assert d._parent is c
+    assert d.mapping == {'a': 'b'}
+    assert d.foo == 3
+    assert d.strict is True and d.bar == 2
+    assert c.mapping == {} and c.foo == 1
+    assert d._to_dict() == dict(strict=True, partial=False, convert=True,
+                                mapping={'a': 'b'}, foo=3, bar=2)
+    assert d._branch(foo=3) is d
+
+    with pytest.raises(AttributeError):
+        d.validate
+    with pytest.raises(TypeError):
+        d.strict = False
+
+    e = copy.deepcopy(d)
+    assert e == d and e._parent is None
+    assert pickle.loads(pickle.dumps(d)) == d
+
+    assert ConversionContext._make(d) is d
+    f = ConversionContext._make(Context(strict=False))
+    assert isinstance(f, ConversionContext) and f.strict is False
+
+    del c['convert']
+    c._setdefaults(dict(convert=False, strict=False))
+    assert c.convert is False and c.strict is True
+    d._setdefaults(dict(strict=False, validate=True))
+    assert d.strict is True and d.validate is True
@@ -5,6 +5,7 @@ from dateutil.tz import gettz, tzutc
 import pytest
 
 from schematics.exceptions import ConversionError, ValidationError
+from schematics.models import Model
 from schematics.types import DateTimeType, UTCDateTimeType, TimestampType
 
 
@@ -233,6 +234,15 @@ def test_timestamp():
     assert field.to_native(0) == EPOCH
 
 
+def test_timestamp_in_model():
+
+    class M(Model):
+        ts = TimestampType()
+
+    m = M({'ts': '2015-11-08T16:00:00+02:00'})
+    assert m.to_primitive() == {'ts': 1446991200}
+
+
 def test_validate_tz():
 
     dt_naive_utc = datetime(2015, 6, 1, 14, 00)
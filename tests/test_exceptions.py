@@ -1,3 +1,6 @@
+import json
+import pickle
+
 import pytest
 
 from schematics.exceptions import *
@@ -79,6 +82,40 @@ def test_error_message_object():
     assert ErrorMessage('foo', 1) != ErrorMessage('foo', 2)
 
 
+def test_error_messages_are_shared():
+
+    assert ConversionError('foo')[0] is ConversionError('foo')[0]
+    assert ConversionError('foo')[0] is not ValidationError('foo')[0]
+    assert ValidationError('foo')[0].type is ValidationError
+    assert StopValidationError('foo')[0] is ValidationError('foo')[0]
+    assert ValidationError('foo', info=1)[0] is not ValidationError('foo', info=1)[0]
+
+
+def test_shared_messages_are_not_modified():
+
+    validation_error = ValidationError('shared')
+    message = validation_error[0]
+    conversion_error = ConversionError(message)
+    assert validation_error[0].type is ValidationError
+    assert ValidationError('shared')[0] is message
+    assert conversion_error[0].type is ConversionError
+    assert conversion_error[0] == ConversionError('shared')[0]
+
+    class SubError(ConversionError):
+        pass
+
+    sub_error = SubError('sub')
+    assert ConversionError(sub_error)[0].type is ConversionError
+    assert sub_error[0].type is SubError
+
+
+def test_shared_messages_after_the_cache_is_full():
+
+    for i in range(3000):
+        ValidationError('message %d' % i)
+    assert ValidationError('late')[0] is ValidationError('late')[0]
+
+
 def test_error_failures():
 
     with pytest.raises(NotImplementedError):
@@ -96,3 +133,17 @@ def test_error_failures():
     with pytest.raises(TypeError):
         CompoundError(['hello'])
 
+
+def test_truncated_key():
+
+    error = DataError({0: ConversionError('bad'), '__truncated__': ValidationError('key'),
+                       TRUNCATED: truncation_error(2)})
+    assert len(error.messages) == 3
+    assert TRUNCATED != '__truncated__'
+    assert repr(TRUNCATED) == 'TRUNCATED'
+    assert pickle.loads(pickle.dumps(TRUNCATED)) is TRUNCATED
+
+    messages = DataError({0: ConversionError('bad'), TRUNCATED: truncation_error(2)}).messages
+    encoded = json.dumps(messages, default=lambda error: [str(m) for m in error])
+    assert json.loads(encoded) == {'0': ['bad'],
+                                   '__truncated__': ['Too many errors; stopped after 2.']}
@@ -3,7 +3,7 @@ import pytest
 
 from schematics.common import *
 from schematics.models import Model
-from schematics.transforms import ExportConverter
+from schematics.transforms import ExportConverter, export_many, to_primitive, flatten
 from schematics.types import *
 from schematics.types.compound import *
 from schematics.types.serializable import serializable
@@ -61,6 +61,38 @@ def test_to_native():
     assert result.modelfield.floatfield is None
 
 
+def test_to_native_does_not_convert_again():
+
+    class CountingType(StringType):
+        calls = 0
+        def convert(self, value, context=None):
+            CountingType.calls += 1
+            return super(CountingType, self).convert(value, context)
+
+    class Inner(Model):
+        name = CountingType(serialized_name='n')
+
+    class Outer(Model):
+        name = CountingType()
+        inner = ModelType(Inner)
+        inners = ListType(ModelType(Inner))
+
+    m = Outer({'name': 'a', 'inner': {'n': 'b'}, 'inners': [{'n': 'c'}, {}]})
+    CountingType.calls = 0
+
+    result = m.to_native()
+    assert CountingType.calls == 0
+    assert result == m
+    assert result.inner is not m.inner
+    assert result.inners[0] is not m.inners[0]
+    assert result.inner.name == 'b'
+    assert result.inners[1].name is None
+
+    result = m.export(NATIVE, field_converter=ExportConverter(NATIVE))
+    assert CountingType.calls == 0
+    assert result == m
+
+
 def test_to_dict():
 
     m = M(input)
@@ -111,3 +143,342 @@ def test_custom_exporter():
         'dt': datetime.datetime(2015, 11, 26, 7),
         'foo': {'x': 1, 'y': 2} }
 
+
+def test_export_many():
+    primitive = M(input).to_primitive()
+    rows = [natives, dict(natives, intfield=4)]
+    assert list(export_many(M, rows)) == [primitive, dict(primitive, intfield=4)]
+    assert list(export_many(M, iter([M(input)]))) == [primitive]
+
+    native = list(export_many(M, rows, NATIVE))[0]
+    assert native['modelfield'] == N(input['modelfield'])
+
+    assert to_primitive(M, natives) == primitive
+    assert flatten(M, natives) == flatten(M, M(input))
+
+
+def test_field_mask():
+
+    exported = []
+
+    class EmailType(StringType):
+        def to_primitive(self, value, context=None):
+            exported.append(value)
+            return value
+
+    class Author(Model):
+        name = StringType()
+        email = EmailType()
+
+    class Comment(Model):
+        text = StringType()
+        author = ModelType(Author)
+
+    class Photo(Model):
+        url = StringType()
+        size = IntType()
+
+    class Post(Model):
+        id = IntType()
+        title = StringType()
+        author = ModelType(Author)
+        comments = ListType(ModelType(Comment))
+        scores = DictType(ModelType(Comment))
+        media = PolyModelType([Photo, Author])
+
+        @serializable
+        def summary(self):
+            return self.title[:2]
+
+    author = {'name': 'n', 'email': 'e'}
+    post = Post({'id': 1, 'title': 'title', 'author': author,
+                 'comments': [{'text': 'c', 'author': author}],
+                 'scores': {'k': {'text': 's', 'author': author}},
+                 'media': Photo({'url': 'u', 'size': 2})})
+
+    assert post.to_primitive(fields='id,author.name,comments.text') == {
+        'id': 1, 'author': {'name': 'n'}, 'comments': [{'text': 'c'}]}
+    assert post.to_primitive(fields=['scores.*.author.name', 'media.url', 'summary']) == {
+        'scores': {'k': {'author': {'name': 'n'}}}, 'media': {'url': 'u'}, 'summary': 'ti'}
+    native = post.to_native(fields='author')
+    assert native.author == Author(author)
+    assert native._data['id'] is Undefined
+    assert post.to_primitive(exclude='title,author,comments.author,scores,media') == {
+        'id': 1, 'comments': [{'text': 'c'}], 'summary': 'ti'}
+
+    assert exported == []
+    assert post.to_primitive(fields='author.email') == {'author': {'email': 'e'}}
+    assert exported == ['e']
+
+    for fields in ('body', 'id.value', 'comments.nick', 'author.name.first'):
+        with pytest.raises(ValueError):
+            post.to_primitive(fields=fields)
+
+
+def test_field_mask_with_serialized_names():
+
+    class Comment(Model):
+        text = StringType(serialized_name='t')
+        replies = ListType(StringType(), serialized_name='r')
+
+    class Post(Model):
+        title = StringType(serialized_name='t')
+        comments = ListType(ModelType(Comment), serialized_name='c')
+
+        @serializable(serialized_name='s')
+        def summary(self):
+            return self.title[:2]
+
+    post = Post({'t': 'title', 'c': [{'t': 'c', 'r': ['a', 'b']}]})
+    assert post.to_primitive(fields='t') == {'t': 'title'}
+    assert post.to_primitive(fields='c.t,s') == {'c': [{'t': 'c'}], 's': 'ti'}
+    assert post.to_primitive(fields='comments.t') == post.to_primitive(fields='c.text')
+    assert post.to_primitive(exclude='t,c.r,summary') == {'c': [{'t': 'c'}]}
+    assert post.to_primitive(slices={'c.r': (0, 1)})['c'] == [{'t': 'c', 'r': ['a']}]
+
+
+def test_slices():
+
+    class Comment(Model):
+        text = StringType()
+        replies = ListType(StringType())
+
+    class Post(Model):
+        id = IntType()
+        comments = ListType(ModelType(Comment))
+        scores = DictType(IntType())
+
+    class Blog(Model):
+        posts = ListType(ModelType(Post))
+
+    comments = [{'text': str(i), 'replies': ['a', 'b', 'c']} for i in range(5)]
+    post = Post({'id': 1, 'comments': comments, 'scores': {'a': 1}})
+
+    totals = {}
+    assert post.to_primitive(slices={'comments': (1, 3)}, totals=totals) == {
+        'id': 1, 'comments': comments[1:3], 'scores': {'a': 1}}
+    assert totals == {'comments': 5}
+
+    data = post.to_primitive(slices={'comments': (3, None), 'comments.replies': (0, 1),
+                                     'scores': (1, 2)})
+    assert data['comments'] == [{'text': '3', 'replies': ['a']}, {'text': '4', 'replies': ['a']}]
+    assert data['scores'] == {}
+
+    blog = Blog({'posts': [post, post]})
+    totals = {}
+    data = blog.to_primitive(slices={'posts': (1, None), 'posts.*.comments': (0, 1)},
+                             totals=totals, fields='posts.comments.text')
+    assert data == {'posts': [{'comments': [{'text': '0'}]}]}
+    assert totals == {'posts': 2, 'posts.0.comments': 5}
+
+    empty = Post({'comments': [{'replies': ['a']}, {'replies': ['b']}]})
+    blog = Blog({'posts': [post, empty]})
+    totals = {}
+    data = blog.to_primitive(slices={'posts': (0, None), 'posts.*.comments': (0, 1)},
+                             totals=totals, fields='posts.comments.text',
+                             export_level=NONEMPTY)
+    assert data == {'posts': [{'comments': [{'text': '0'}]}]}
+    assert totals == {'posts': 2, 'posts.0.comments': 5}
+
+    class Feed(Model):
+        posts = DictType(ModelType(Post))
+
+    feed = Feed({'posts': {'a': post, 'b': empty}})
+    totals = {}
+    data = feed.to_primitive(slices={'posts': (0, None), 'posts.*.comments': (0, 1)},
+                             totals=totals, fields='posts.comments.text',
+                             export_level=NONEMPTY)
+    assert data == {'posts': {'a': {'comments': [{'text': '0'}]}}}
+    assert totals == {'posts': 2, 'posts.a.comments': 5}
+
+    totals = {}
+    post.to_primitive(slices={'comments': (1, 3), 'comments.replies': (0, 1)}, totals=totals)
+    assert totals == {'comments': 5, 'comments.0.replies': 3, 'comments.1.replies': 3}
+
+    for slices in ({'id': (0, 1)}, {'posts.id': (0, 1)}, {'posts.comments.text': (0, 1)},
+                   {'posts': (-1, None)}, {'posts': 2}, {'poster': (0, 1)}):
+        with pytest.raises(ValueError):
+            blog.to_primitive(slices=slices)
+
+
+def test_shared_instances():
+
+    exported = []
+
+    class CountedType(StringType):
+        def to_primitive(self, value, context=None):
+            exported.append(value)
+            return value
+
+    class Person(Model):
+        name = CountedType()
+        friend = ModelType('Person')
+
+        class Options:
+            serialize_when_none = False
+
+    class Team(Model):
+        lead = ModelType(Person)
+        members = ListType(ModelType(Person))
+        member = PolyModelType(Person)
+
+        class Options:
+            serialize_when_none = False
+
+    ann = Person({'name': 'ann'})
+    team = Team()
+    team.lead = ann
+    team.members = [ann, Person({'name': 'bob'})]
+
+    data = team.to_primitive()
+    assert data == {'lead': {'name': 'ann'},
+                    'members': [{'name': 'ann'}, {'name': 'bob'}]}
+    assert data['members'][0] is not data['lead']
+    assert exported == ['ann', 'ann', 'bob']
+
+    del exported[:]
+    data = team.to_primitive(max_depth=5)
+    assert data == {'lead': {'name': 'ann'},
+                    'members': [{'name': 'ann'}, {'name': 'bob'}]}
+    assert data['members'][0] is data['lead']
+    assert exported == ['ann', 'bob']
+
+    data = team.to_primitive(fields='lead,members.friend')
+    assert data == {'lead': {'name': 'ann'}}
+
+    native = team.to_native()
+    assert native.members[0] is not native.lead
+    native = team.to_native(max_depth=5)
+    assert native.members[0] is native.lead
+
+    ann.friend = Person({'name': 'cy'})
+    ann.friend.friend = ann
+    with pytest.raises(ValueError):
+        ann.to_primitive()
+    with pytest.raises(ValueError):
+        team.to_primitive()
+    team.lead = team.members = None
+    team.member = ann
+    with pytest.raises(ValueError):
+        team.to_primitive()
+
+    ann.friend = None
+    assert team.to_primitive() == {'member': {'name': 'ann'}}
+    assert list(export_many(Team, [team, team])) == [{'member': {'name': 'ann'}}] * 2
+
+
+def test_max_depth():
+
+    class Node(Model):
+        id = IntType()
+        name = StringType()
+        parent = ModelType('Node')
+        children = ListType(ModelType('Node'))
+        other = PolyModelType('Node')
+        tags = ListType(StringType())
+
+        class Options:
+            serialize_when_none = False
+
+    def node(id, *children):
+        return Node({'id': id, 'name': str(id), 'tags': ['t'],
+                     'children': [child.to_primitive() for child in children]})
+
+    root = node(1, node(2, node(3, node(4))))
+    root.other = root.children[0]
+
+    assert root.to_primitive(max_depth=1) == {
+        'id': 1, 'name': '1', 'tags': ['t'],
+        'children': [{'id': 2, 'name': '2', 'tags': ['t']}],
+        'other': {'id': 2, 'name': '2', 'tags': ['t']}}
+
+    data = root.to_primitive(max_depth=1, stub='id')
+    assert data['children'][0]['children'] == [{'id': 3}]
+    assert data['other'] == data['children'][0]
+
+    data = root.to_primitive(max_depth=0, stub=['id', 'children', 'missing'])
+    assert data['children'] == [{'id': 2, 'children': [{'id': 3, 'children': [{'id': 4}]}]}]
+
+    assert root.to_primitive(max_depth=3) == root.to_primitive()
+
+
+def test_max_depth_on_custom_exports():
+
+    class CustomModelType(ModelType):
+        def export(self, model_instance, format, context):
+            return super(CustomModelType, self).export(model_instance, format, context)
+
+    class Leaf(Model):
+        id = IntType()
+        name = StringType()
+
+        def export(self, *args, **kwargs):
+            return super(Leaf, self).export(*args, **kwargs)
+
+    class Node(Model):
+        id = IntType()
+        name = StringType()
+        child = CustomModelType('Node')
+        leaf = ModelType(Leaf)
+
+    root = Node({'id': 1, 'name': '1', 'leaf': {'id': 10, 'name': '10'},
+                 'child': {'id': 2, 'name': '2', 'leaf': {'id': 20, 'name': '20'},
+                           'child': {'id': 3, 'name': '3'}}})
+
+    assert root.to_primitive(max_depth=0) == {
+        'id': 1, 'name': '1', 'child': None, 'leaf': None}
+    assert root.to_primitive(max_depth=1, stub='id') == {
+        'id': 1, 'name': '1', 'leaf': {'id': 10, 'name': '10'},
+        'child': {'id': 2, 'name': '2', 'leaf': {'id': 20}, 'child': {'id': 3}}}
+    assert Leaf._stub_masks == {('id',): {'id': True}}
+
+
+def test_flatten_detects_cycles():
+
+    class Node(Model):
+        name = StringType()
+        next = ModelType('Node')
+        nodes = ListType(ModelType('Node'))
+
+    first = Node({'name': 'a'})
+    first.next = Node({'name': 'b'})
+    first.nodes = [first.next, first.next]
+    assert flatten(Node, first) == {'name': 'a', 'next.name': 'b',
+                                    'nodes.0.name': 'b', 'nodes.1.name': 'b'}
+
+    first.next.next = first
+    with pytest.raises(ValueError):
+        flatten(Node, first)
+    first.next.next = None
+    first.nodes[1].nodes = [first]
+    with pytest.raises(ValueError):
+        flatten(Node, first)
+
+
+def test_shared_instances_under_branched_contexts():
+
+    class Leaf(Model):
+        name = StringType()
+
+    class Branch(Model):
+        leaf = ModelType(Leaf)
+
+    class Root(Model):
+        first = ModelType(Branch)
+        second = ModelType(Branch)
+
+    leaf = Leaf({'name': 'x'})
+    root = Root()
+    root.first = Branch()
+    root.second = Branch()
+    root.first.leaf = root.second.leaf = leaf
+
+    data = root.to_primitive(max_depth=5)
+    assert data['first']['leaf'] is data['second']['leaf']
+    data = root.to_primitive(fields='first.leaf.name,second.leaf')
+    assert data['first']['leaf'] == data['second']['leaf'] == {'name': 'x'}
+    data = root.to_primitive(fields='first.leaf.name,second.leaf.name')
+    assert data['first']['leaf'] is data['second']['leaf']
+
+    data = root.to_primitive(max_depth=1, stub='name')
+    assert data['first']['leaf'] == {'name': 'x'}
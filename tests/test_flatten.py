@@ -1,5 +1,7 @@
 from schematics.datastructures import OrderedDict
-from schematics.transforms import expand, whitelist, flatten, EMPTY_LIST, EMPTY_DICT
+from schematics.transforms import (
+    expand, whitelist, blacklist, flatten, flatten_to_dict, iter_flatten, iter_flatten_model,
+    to_primitive, EMPTY_LIST, EMPTY_DICT)
 from schematics.models import Model
 from schematics.types.serializable import serializable
 from schematics.types import StringType, IntType
@@ -471,3 +473,85 @@ def test_expand_with_both_empty_list_and_values():
                 "2": "2",
             }
         }
+
+
+def test_iter_flatten():
+    data = {'a': 1, 'b': [{'c': 2}, {'d': None}, []], 'e': {}, 'f': None}
+
+    pairs = list(iter_flatten(data))
+    assert dict(pairs) == flatten_to_dict(data) == {
+        'a': 1, 'b.0.c': 2, 'b.2': EMPTY_LIST, 'e': EMPTY_DICT}
+    assert len(pairs) == 4
+
+    assert dict(iter_flatten(data, prefix='p', ignore_none=False)) == {
+        'p.a': 1, 'p.b.0.c': 2, 'p.b.2': EMPTY_LIST, 'p.e': EMPTY_DICT, 'p.f': None}
+
+    assert expand(iter_flatten(data)) == {
+        'a': 1, 'b': {'0': {'c': 2}, '2': []}, 'e': {}}
+
+
+def test_flatten_and_expand_deep_structures():
+    depth = 5000
+    data = leaf = {}
+    for _ in range(depth):
+        leaf['x'] = {}
+        leaf = leaf['x']
+    leaf['y'] = 1
+
+    flat = flatten_to_dict(data)
+    assert flat == {'.'.join(['x'] * depth + ['y']): 1}
+
+    node = expand(flat)
+    for _ in range(depth):
+        assert list(node) == ['x']
+        node = node['x']
+    assert node == {'y': 1}
+
+
+def test_iter_flatten_model():
+
+    class Tag(Model):
+        name = StringType()
+        secret = StringType()
+
+        class Options:
+            roles = {'public': blacklist('secret')}
+
+    class Post(Model):
+        title = StringType()
+        tags = ListType(ModelType(Tag))
+        empty_tags = ListType(ModelType(Tag))
+        counts = DictType(ListType(IntType))
+        author = ModelType(Tag)
+        note = StringType()
+
+        class Options:
+            roles = {'public': blacklist('note')}
+
+    post = Post({
+        'title': 'T',
+        'tags': [{'name': 'a', 'secret': 's'}, {}, {'name': 'c'}],
+        'empty_tags': [],
+        'counts': {'x': [1, 2], 'y': []},
+        'author': {'secret': 's'},
+        'note': 'n',
+    })
+
+    pairs = list(iter_flatten_model(Post, post))
+    assert dict(pairs) == flatten(Post, post) == flatten_to_dict(to_primitive(Post, post)) == {
+        'title': 'T',
+        'tags.0.name': 'a', 'tags.0.secret': 's', 'tags.2.name': 'c',
+        'empty_tags': EMPTY_LIST,
+        'counts.x.0': 1, 'counts.x.1': 2, 'counts.y': EMPTY_LIST,
+        'author.secret': 's',
+        'note': 'n',
+    }
+    assert len(pairs) == 10
+
+    flat = flatten(Post, post, role='public', prefix='p')
+    assert flat == flatten_to_dict(to_primitive(Post, post, role='public'), prefix='p') == {
+        'p.title': 'T',
+        'p.tags.0.name': 'a', 'p.tags.2.name': 'c',
+        'p.empty_tags': EMPTY_LIST,
+        'p.counts.x.0': 1, 'p.counts.x.1': 2, 'p.counts.y': EMPTY_LIST,
+    }
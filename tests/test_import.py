@@ -5,7 +5,7 @@ import pytest
 from schematics.models import Model
 from schematics.types import BaseType, IntType, StringType
 from schematics.types.compound import ListType, DictType, ModelType
-from schematics.exceptions import ModelConversionError, ModelValidationError
+from schematics.exceptions import ConversionError, ModelConversionError, ModelValidationError
 from schematics.undefined import Undefined
 
 
@@ -39,3 +39,116 @@ def test_import_data():
     })
     assert m._data == {'a': None, 'b': 2, 'c': 3, 'd': Undefined}
 
+
+
+def test_from_object():
+
+    class Row(object):
+        def __init__(self, **kwargs):
+            self.__dict__.update(kwargs)
+
+    class Manager(object):
+        def __init__(self, *rows):
+            self.rows = rows
+        def all(self):
+            return list(self.rows)
+
+    class Tag(Model):
+        id = IntType()
+        title = StringType()
+
+    class Link(Model):
+        id = IntType()
+        title = StringType(deserialize_from='name')
+        url = StringType(serialized_name='href')
+        owner = ModelType(Tag)
+        tags = ListType(ModelType(Tag))
+        labels = ListType(StringType())
+
+    row = Row(id='1', name='Django', href='https://djangoproject.com', other=True,
+              owner=Row(id=5, title='me'),
+              tags=Manager(Row(id=1, title='web'), Row(id=2, title='python')),
+              labels=('a', 'b'))
+    link = Link.from_object(row)
+    assert link.to_native() == Link({
+        'id': 1, 'title': 'Django', 'href': 'https://djangoproject.com',
+        'owner': {'id': 5, 'title': 'me'},
+        'tags': [{'id': 1, 'title': 'web'}, {'id': 2, 'title': 'python'}],
+        'labels': ['a', 'b'],
+    }).to_native()
+
+    link = Link.from_object(Row(id=3), init=False)
+    assert link._data['title'] is Undefined
+    with pytest.raises(ModelConversionError):
+        Link.from_object(Row(id='x'))
+
+    link = Link.from_object(Row(owner={'id': 5, 'title': 'me'}, tags=[Row(id=1)]))
+    assert link.owner == Tag({'id': 5, 'title': 'me'})
+    assert link.tags == [Tag({'id': 1})]
+
+    for value in ('me', 5, 5.0, ['me'], b'me'):
+        with pytest.raises(ModelConversionError) as exception:
+            Link.from_object(Row(owner=value))
+        assert list(exception.value.messages) == ['owner']
+        with pytest.raises(ConversionError):
+            Tag.from_object(value)
+
+    with pytest.raises(ModelConversionError):
+        Link({'owner': Row(id=5)})
+
+
+def test_projection():
+
+    class Author(Model):
+        name = StringType()
+        email = StringType()
+
+    class Tag(Model):
+        title = StringType()
+        score = IntType(default=1)
+
+    class Post(Model):
+        id = IntType()
+        title = StringType()
+        author = ModelType(Author)
+        tags = ListType(ModelType(Tag))
+        meta = DictType(ModelType(Tag))
+
+    class Raw(dict):
+        # Fails on reading the keys given as `unread`.
+        def __init__(self, unread, **kwargs):
+            dict.__init__(self, **kwargs)
+            self.unread = unread
+        def __getitem__(self, key):
+            if key in self.unread:
+                raise AssertionError('%s was read' % key)
+            return dict.__getitem__(self, key)
+
+    raw = Raw(['title'], id='1', title='t', author=Raw(['email'], name='n', email='e'),
+              tags=[Raw(['score'], title='a', score='x')],
+              meta=Raw(['k'], k={'title': 'm', 'score': 'x'}))
+    post = Post(raw, fields=['id', 'author.name', 'tags.*.title'])
+    assert post.id == 1
+    assert post._data['title'] is Undefined
+    assert post.author._data == {'name': 'n', 'email': Undefined}
+    assert post.tags[0]._data == {'title': 'a', 'score': Undefined}
+    assert post._data['meta'] is Undefined
+
+    post = Post({'meta': {'k': {'title': 'm', 'score': 'x'}}}, fields=['meta.*.title'])
+    assert post.meta['k']._data == {'title': 'm', 'score': Undefined}
+
+    post = Post(raw, exclude=['title', 'author.email', 'tags.*.score', 'meta'])
+    assert post._data['title'] is Undefined
+    assert post.author.name == 'n'
+    assert post.tags[0]._data == {'title': 'a', 'score': Undefined}
+    assert post._data['meta'] is Undefined
+
+    post = Post({'author': {'name': 'n', 'email': 'e'}}, fields=['author', 'author.name'])
+    assert post.author.email == 'e'
+
+    post = Post(raw, fields=['tags.title'])
+    assert post.tags[0]._data == {'title': 'a', 'score': Undefined}
+
+    for fields in (['body'], ['id.value'], ['tags.nick'], ['author.nick']):
+        with pytest.raises(ValueError):
+            Post(raw, fields=fields)
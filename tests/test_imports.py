@@ -0,0 +1,34 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _missing(module):
+    try:
+        __import__(module)
+    except ImportError:
+        return True
+    return False
+
+
+@pytest.mark.parametrize('module', [
+    'schematics.batch',
+    'schematics.binary',
+    'schematics.csvio',
+    'schematics.jsonio',
+    'schematics.recordfile',
+    'schematics.stream',
+    'schematics.tracing',
+    pytest.param('schematics.contrib.mongo', marks=pytest.mark.skipif(
+        _missing('bson'), reason='requires pymongo')),
+])
+def test_import_first(module):
+    # Each module must be importable in a fresh interpreter, before anything
+    # else from the package has been imported.
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    subprocess.check_call([sys.executable, '-c', 'import ' + module], env=env)
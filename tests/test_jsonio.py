@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+import datetime
+import json
+
+import pytest
+
+from schematics import jsonio
+from schematics.exceptions import DataError
+from schematics.models import Model
+from schematics.types import StringType, IntType, DateTimeType
+from schematics.types.compound import ModelType, ListType, DictType
+
+
+class Author(Model):
+    name = StringType()
+
+
+class Post(Model):
+    id = IntType()
+    title = StringType()
+    created = DateTimeType()
+    author = ModelType(Author)
+    tags = ListType(StringType())
+    counts = DictType(IntType, coerce_key=int)
+
+
+DOCUMENT = {
+    'id': 1,
+    'title': u'Pöst',
+    'created': '2016-01-02T03:04:05.000006',
+    'author': {'name': 'Jane'},
+    'tags': ['a', 'b'],
+    'counts': {1: 2},
+}
+
+
+@pytest.fixture
+def library():
+    previous = jsonio.current()
+    yield
+    jsonio.use(previous.name)
+
+
+def test_from_json():
+    text = json.dumps(DOCUMENT)
+    post = Post(DOCUMENT)
+    assert Post.from_json(text) == post
+    assert Post.from_json(text.encode('utf-8')) == post
+    assert Post.from_json(bytearray(text.encode('utf-8'))) == post
+    assert post.created == datetime.datetime(2016, 1, 2, 3, 4, 5, 6)
+
+    with pytest.raises(DataError):
+        Post.from_json(b'{"id": "x", "rogue": 1}')
+    assert Post.from_json(b'{"rogue": 1}', strict=False) == Post()
+    with pytest.raises(ValueError):
+        Post.from_json(b'{"id": ')
+
+
+def test_to_json():
+    post = Post(DOCUMENT)
+    text = post.to_json()
+    assert isinstance(text, type(u''))
+    assert json.loads(text) == json.loads(json.dumps(post.to_primitive()))
+    assert Post.from_json(text) == post
+
+
+def test_registry(library):
+    calls = []
+
+    def loads(data):
+        calls.append(data)
+        return json.loads(data)
+
+    jsonio.register('text_only', loads, lambda obj: json.dumps(obj).encode('utf-8'))
+    assert jsonio.use('text_only').name == 'text_only'
+
+    assert Post.from_json(b'{"id": 2}') == Post({'id': 2})
+    assert calls == [u'{"id": 2}']
+    assert json.loads(Post({'id': 2}).to_json())['id'] == 2
+
+    with pytest.raises(ValueError):
+        jsonio.use('missing')
+    assert jsonio.use().name in jsonio.PREFERENCE
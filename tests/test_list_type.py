@@ -4,10 +4,10 @@ from schematics.datastructures import OrderedDict
 from schematics.models import Model
 from schematics.transforms import get_import_context
 from schematics.types import IntType, StringType
-from schematics.types.compound import ModelType, ListType
+from schematics.types.compound import ModelType, ListType, DictType
 from schematics.exceptions import (
     ConversionError, ValidationError, StopValidationError, DataError,
-    MockCreationError)
+    MockCreationError, TRUNCATED)
 
 
 def test_list_field():
@@ -218,6 +218,52 @@ def test_list_model_field_exception_with_full_message():
     assert exception.value.messages == {'users': {0: {'name': ['String value is too long.']}}}
 
 
+def test_list_max_errors():
+    class User(Model):
+        ids = ListType(IntType)
+
+    with pytest.raises(DataError) as exception:
+        User({'ids': ['a'] * 100}, max_errors=3)
+
+    errors = exception.value.messages['ids']
+    assert sorted(k for k in errors if k != TRUNCATED) == [0, 1, 2]
+    assert errors[TRUNCATED].messages[0].info == 3
+
+    with pytest.raises(DataError) as exception:
+        User({'ids': ['a'] * 100})
+    assert len(exception.value.messages['ids']) == 100
+
+    class Counts(Model):
+        counts = DictType(IntType)
+
+    with pytest.raises(DataError) as exception:
+        Counts({'counts': {'...': 'a', 'b': 'b', 'c': 'c'}}, max_errors=2)
+    errors = exception.value.messages['counts']
+    assert len(errors) == 3 and TRUNCATED in errors
+
+
+def test_list_max_errors_on_validate():
+    class User(Model):
+        ids = ListType(IntType)
+
+    u = User({'ids': [1, 2, 3]})
+    u.ids = ['a', 'b', 'c']
+    with pytest.raises(DataError) as exception:
+        u.validate(max_errors=2)
+    assert len(exception.value.messages['ids']) == 3
+    assert TRUNCATED in exception.value.messages['ids']
+
+
+def test_list_errors_share_messages():
+    class User(Model):
+        ids = ListType(IntType(required=True))
+
+    with pytest.raises(DataError) as exception:
+        User({'ids': [None, None]}, partial=False)
+    errors = exception.value.messages['ids']
+    assert errors[0].messages[0] is errors[1].messages[0]
+
+
 def test_compound_fields():
     comments = ListType(ListType, compound_field=StringType)
 
@@ -1,4 +1,7 @@
 # -*- coding: utf-8 -*-
+import copy
+import pickle
+
 import pytest
 
 from schematics.models import Model, ModelOptions, NonDictModel
@@ -620,4 +623,37 @@ def test_non_dict_model():
 
     l = List([11, 12])
     with pytest.raises(DataError):
-        l.validate()
\ No newline at end of file
+        l.validate()
+
+
+class PickledItem(Model):
+    name = StringType()
+
+
+class Pickled(Model):
+    count = IntType()
+    label = StringType()
+    item = ModelType(PickledItem)
+    items = ListType(ModelType(PickledItem))
+
+
+def test_pickle():
+    inst = Pickled({'count': 1, 'item': {'name': 'a'}, 'items': [{'name': 'b'}, {}]},
+                   init=False)
+    inst.label = None
+    for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+        data = pickle.dumps(inst, protocol)
+        assert b'_initial' not in data
+        result = pickle.loads(data)
+        assert result._data == inst._data
+        assert result._data['items'][1]._data == {'name': Undefined}
+        assert type(result.item) is PickledItem
+    assert copy.deepcopy(inst) == inst
+
+
+def test_pickle_extra_attributes():
+    inst = Pickled({'count': 1})
+    inst.extra = 'x'
+    result = pickle.loads(pickle.dumps(inst))
+    assert result.extra == 'x'
+    assert result == inst
@@ -1,3 +1,7 @@
+import datetime
+import decimal
+import uuid
+
 import pytest
 
 try:
@@ -5,8 +9,37 @@ try:
 except ImportError:
     ObjectId = None
 else:
-    from schematics.contrib.mongo import ObjectIdType
-    from schematics.exceptions import ConversionError, ValidationError
+    import bson
+    from bson.decimal128 import Decimal128
+    from bson.raw_bson import RawBSONDocument
+
+    from schematics.contrib.mongo import (ObjectIdType, from_bson, decode_many,
+                                          to_bson, encode_many)
+    from schematics.exceptions import ConversionError, ValidationError, DataError
+    from schematics.models import Model
+    from schematics.types import (StringType, IntType, DateTimeType, DateType,
+                                  DecimalType, UUIDType)
+    from schematics.types.compound import ModelType, ListType, DictType
+
+    class Line(Model):
+        sku = StringType()
+        price = DecimalType()
+
+    class Order(Model):
+        id = ObjectIdType(serialized_name='_id')
+        number = IntType(default=1)
+        created = DateTimeType()
+        due = DateType()
+        total = DecimalType()
+        key = UUIDType()
+        lines = ListType(ModelType(Line))
+        counts = DictType(IntType())
+
+    class Batch(Model):
+        ids = ListType(ObjectIdType())
+        times = ListType(DateTimeType())
+        prices = DictType(DecimalType())
+        nested = ListType(DictType(ObjectIdType()))
 
     FAKE_OID = ObjectId()
 
@@ -19,6 +52,7 @@ def test_to_native():
 
     assert oid.to_native(FAKE_OID) == FAKE_OID
     assert oid.to_native(str(FAKE_OID)) == FAKE_OID
+    assert oid.to_native(FAKE_OID.binary) == FAKE_OID
 
     with pytest.raises(ConversionError):
         oid.to_native('foo')
@@ -39,3 +73,67 @@ def test_validate_id():
 
     with pytest.raises(ConversionError):
         oid.validate('foo')
+
+
+def make_order():
+    return Order({
+        '_id': FAKE_OID,
+        'created': datetime.datetime(2016, 1, 2, 3, 4, 5, 6000),
+        'due': datetime.date(2016, 2, 1),
+        'total': decimal.Decimal('10.50'),
+        'key': uuid.UUID('54020382-291e-4192-b370-4850493ac5bc'),
+        'lines': [{'sku': 'a', 'price': '3.50'}, {'sku': 'b', 'price': '7'}],
+        'counts': {'a': 1},
+    })
+
+
+def test_bson_round_trip():
+    order = make_order()
+    data = to_bson(Order, order)
+
+    document = bson.decode(data)
+    assert document['_id'] == FAKE_OID
+    assert document['created'] == order.created
+    assert document['total'] == Decimal128('10.50')
+    assert document['lines'][1]['price'] == Decimal128('7')
+
+    assert from_bson(Order, data) == order
+    assert from_bson(Order, RawBSONDocument(data)) == order
+    assert from_bson(Order, document) == order
+
+
+def test_bson_collections():
+    moment = datetime.datetime(2016, 1, 2, 3, 4, 5, 6000)
+    batch = Batch({'ids': [FAKE_OID], 'times': [moment],
+                   'prices': {'a': decimal.Decimal('1.5')},
+                   'nested': [{'x': FAKE_OID}]})
+    data = to_bson(Batch, batch)
+
+    document = bson.decode(data)
+    assert document['ids'] == [FAKE_OID]
+    assert document['times'] == [moment]
+    assert document['prices'] == {'a': Decimal128('1.5')}
+    assert document['nested'] == [{'x': FAKE_OID}]
+    assert from_bson(Batch, data) == batch
+
+
+def test_from_bson_matches_import():
+    document = {'_id': str(FAKE_OID), 'total': 3, 'lines': [{'sku': 'a'}], 'extra': 1}
+    order = from_bson(Order, document)
+    assert order._data == Order(document, strict=False)._data
+    assert order.number == 1
+
+    with pytest.raises(DataError) as exc:
+        from_bson(Order, {'_id': 'foo', 'lines': [{'price': 'x'}]})
+    assert set(exc.value.messages) == set(['_id', 'lines'])
+
+
+def test_bulk():
+    orders = [make_order() for _ in range(3)]
+    orders[1].number = 2
+    documents = list(encode_many(Order, orders))
+    assert all(isinstance(document, RawBSONDocument) for document in documents)
+
+    batch = b''.join(document.raw for document in documents)
+    assert list(decode_many(Order, batch)) == orders
+    assert list(decode_many(Order, documents)) == orders
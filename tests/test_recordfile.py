@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+import io
+
+import pytest
+
+from schematics.models import Model
+from schematics.recordfile import write_records, RecordReader
+from schematics.types import StringType, IntType
+from schematics.types.compound import ModelType, ListType
+
+
+class Region(Model):
+    name = StringType()
+
+
+class Country(Model):
+    code = StringType()
+    name = StringType()
+    population = IntType()
+    region = ModelType(Region)
+    languages = ListType(StringType())
+
+
+def make_country(i):
+    return Country({'code': 'C%d' % i, 'name': u'Country %d' % i, 'population': i * 1000,
+                    'region': {'name': 'R%d' % (i % 3)}, 'languages': ['en', 'fr'][:i % 3]})
+
+
+@pytest.fixture
+def path(tmpdir):
+    path = str(tmpdir.join('countries.rec'))
+    with open(path, 'wb') as f:
+        assert write_records(Country, (make_country(i) for i in range(100)), f) == 100
+    return path
+
+
+def test_random_access(path):
+    with RecordReader(Country, path) as reader:
+        assert len(reader) == 100
+        assert reader[42] == make_country(42)
+        assert reader[-1] == make_country(99)
+        assert reader[10:13] == [make_country(i) for i in range(10, 13)]
+        assert list(reader) == [make_country(i) for i in range(100)]
+        with pytest.raises(IndexError):
+            reader[100]
+
+
+def test_view(path):
+    with RecordReader(Country, path) as reader:
+        view = reader.view(7)
+        assert view['code'] == 'C7'
+        assert view._values == ['C7']
+        assert view.region == Region({'name': 'R1'})
+        assert view['languages'] == ['en']
+        assert view.to_model() == make_country(7)
+        with pytest.raises(KeyError):
+            view['capital']
+        with pytest.raises(AttributeError):
+            view.capital
+
+
+def test_empty_file(tmpdir):
+    path = str(tmpdir.join('empty.rec'))
+    with open(path, 'wb') as f:
+        write_records(Country, [], f)
+    with RecordReader(Country, path) as reader:
+        assert len(reader) == 0
+        assert list(reader) == []
+
+
+def test_invalid_file(tmpdir, path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    truncated = str(tmpdir.join('truncated.rec'))
+    with open(truncated, 'wb') as f:
+        f.write(data[:-10])
+    with pytest.raises(ValueError):
+        RecordReader(Country, truncated)
+
+    other = str(tmpdir.join('other.rec'))
+    with open(other, 'wb') as f:
+        f.write(b'x' * 100)
+    with pytest.raises(ValueError):
+        RecordReader(Country, other)
+
+
+def test_write_to_stream():
+    out = io.BytesIO()
+    write_records(Country, [make_country(1)], out)
+    assert out.getvalue().startswith(b'SCHREC01')
@@ -122,3 +122,113 @@ def test_strict_propagation():
         'modelfield': {'submodelfield': {'extrafield':'qweasd'}},
         }, strict=False)
 
+
+
+class Node(Model):
+    value = IntType(required=True)
+    child = ModelType('Node')
+    children = ListType(ModelType('Node'))
+    index = DictType(ModelType('Node'))
+
+
+def _deep_data(depth, leaf_value=1):
+    data = {'value': leaf_value}
+    for i in range(depth):
+        data = {'value': i, 'child': data, 'children': [{'value': i}]}
+    return data
+
+
+def test_deep_import_and_export():
+
+    node = Node(_deep_data(1000))
+    node.validate()
+
+    data = node.to_primitive()
+    depth = 0
+    while data['child'] is not None:
+        data = data['child']
+        depth += 1
+    assert depth == 1000
+    assert data == {'value': 1, 'child': None, 'children': None, 'index': None}
+
+
+def test_deep_import_error_path():
+
+    with pytest.raises(ModelConversionError) as exception:
+        Node(_deep_data(1000, leaf_value='x'))
+
+    messages = exception.value.messages
+    for _ in range(1000):
+        messages = messages['child']
+    assert messages == {'value': [u"Value 'x' is not int."]}
+
+
+def test_deep_validation_error_path():
+
+    node = Node(_deep_data(1000))
+    leaf = node
+    while leaf.child is not None:
+        leaf = leaf.child
+    leaf.children = [Node({'value': 2}), Node()]
+
+    with pytest.raises(ModelValidationError) as exception:
+        node.validate()
+
+    messages = exception.value.messages
+    for _ in range(1000):
+        messages = messages['child']
+    assert messages == {'children': {1: {'value': [u'This field is required.']}}}
+
+
+def test_deep_dict_nesting():
+
+    data = {'value': 0}
+    for i in range(1000):
+        data = {'value': i, 'index': {'k': data}}
+    node = Node(data)
+    for _ in range(1000):
+        node = node.index['k']
+    assert node.value == 0
+
+
+def test_overridden_convert_is_respected():
+
+    class CountingListType(ListType):
+        calls = 0
+
+        def convert(self, value, context):
+            CountingListType.calls += 1
+            return super(CountingListType, self).convert(value, context)
+
+    class Tree(Model):
+        items = CountingListType(ModelType('Tree'))
+
+    Tree({'items': [{'items': [{}]}, {}]})
+    assert CountingListType.calls == 2
+
+
+def test_self_referencing_instances():
+
+    node = Node({'value': 1})
+    node.child = node
+    with pytest.raises(ValueError):
+        node.validate()
+    with pytest.raises(ValueError):
+        Node(node)
+
+    node.child = Node({'value': 2})
+    node.children = [node]
+    with pytest.raises(ValueError):
+        node.validate()
+
+    data = {'value': 1}
+    data['index'] = {'self': data}
+    with pytest.raises(ValueError):
+        Node(data)
+
+    shared = Node({'value': 3})
+    node = Node({'value': 1})
+    node.child = shared
+    node.children = [shared, shared]
+    node.validate()
+    assert Node(node).children[1].value == 3
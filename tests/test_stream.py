@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+import io
+import json
+
+import pytest
+
+from schematics.exceptions import DataError
+from schematics.models import Model
+from schematics.stream import iter_elements, iter_records, iter_models
+from schematics.types import StringType, IntType
+from schematics.types.compound import ModelType, ListType
+
+
+class Tag(Model):
+    name = StringType()
+
+
+class Item(Model):
+    id = IntType()
+    title = StringType()
+    tags = ListType(ModelType(Tag))
+
+
+DOCUMENTS = [
+    [],
+    [1, 2.5, u'a,]b"c\\', None, True, [], {}],
+    [{u'a': [1, {u'b': u']}'}], u'c': u'\\\\"'}, [[u'[']]],
+    [{u'text': u'é\\' * 10 + u'\U0001F600'} for _ in range(20)],
+]
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 7, 1024])
+def test_records(chunk_size):
+    for document in DOCUMENTS:
+        for ensure_ascii in (True, False):
+            text = json.dumps(document, ensure_ascii=ensure_ascii).encode('utf-8')
+            spaced = b' \n' + text.replace(b', ', b' ,\n\t') + b'\r\n'
+            for data in (text, spaced):
+                records = list(iter_records(io.BytesIO(data), chunk_size))
+                assert records == document
+
+
+def test_elements():
+    data = b'[ {"a": 1} , "x" ,2]'
+    assert list(iter_elements(io.BytesIO(data), 4)) == [b'{"a": 1}', b'"x"', b'2']
+
+
+@pytest.mark.parametrize('data, offset', [
+    (b'', 0),
+    (b'{}', 0),
+    (b'[1,]', 3),
+    (b'[1', 2),
+    (b'["ab', 4),
+    (b'[1] x', 4),
+    (b'[,1]', 1),
+    (b'[1,,2]', 3),
+    (b'[1}]', 2),
+])
+def test_malformed(data, offset):
+    with pytest.raises(ValueError) as exc:
+        list(iter_records(io.BytesIO(data), 2))
+    assert str(exc.value).endswith('at byte %d' % offset)
+
+
+def test_models():
+    records = [{'id': i, 'title': 't%d' % i, 'tags': [{'name': 'a'}]} for i in range(100)]
+    data = json.dumps(records).encode('utf-8')
+    assert list(iter_models(Item, io.BytesIO(data), 64)) == [Item(r) for r in records]
+
+    models = iter_models(Item, io.BytesIO(b'[{"id": 1}, {"id": "x"}]'))
+    assert next(models) == Item({'id': 1})
+    with pytest.raises(DataError):
+        next(models)
+
+
+def test_reads_incrementally():
+    reads = []
+
+    class Source(object):
+        def read(self, size):
+            reads.append(size)
+            if len(reads) == 1:
+                return b'[{"id": 1},'
+            if len(reads) == 2:
+                return b' {"id": 2}'
+            raise AssertionError('read past the second element')
+
+    models = iter_models(Item, Source(), 16)
+    assert next(models) == Item({'id': 1})
+    assert reads == [16]
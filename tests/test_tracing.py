@@ -0,0 +1,111 @@
+import pytest
+
+from schematics.exceptions import DataError
+from schematics.models import Model
+from schematics.tracing import Tracer, FieldProfiler
+from schematics.types import StringType, IntType
+from schematics.types.compound import ModelType, ListType
+
+
+class Item(Model):
+    name = StringType()
+    count = IntType(min_value=0)
+
+
+class Order(Model):
+    id = IntType()
+    items = ListType(ModelType(Item))
+    tags = ListType(StringType())
+
+
+data = {'id': 1, 'items': [{'name': 'a', 'count': 1}, {'name': 'b', 'count': 2}], 'tags': ['x']}
+
+
+class Recorder(Tracer):
+
+    def __init__(self):
+        self.events = []
+
+    def on_field_start(self, phase, model_class, path, field):
+        self.events.append(('start', phase, model_class, path))
+
+    def on_field_end(self, phase, model_class, path, field, elapsed, error):
+        assert elapsed >= 0
+        self.events.append(('end', phase, model_class, path, error))
+
+
+def test_import_events():
+
+    tracer = Recorder()
+    Order(data, tracer=tracer)
+
+    starts = [e[1:] for e in tracer.events if e[0] == 'start']
+    assert ('convert', Order, ('id',)) in starts
+    assert ('convert', Order, ('items',)) in starts
+    assert starts.count(('convert', Order, ('items', '*'))) == 2
+    assert starts.count(('convert', Item, ('items', '*', 'count'))) == 2
+    assert ('convert', Order, ('tags', '*')) in starts
+
+    assert len(tracer.events) == 2 * len(starts)
+    assert all(e[4] is None for e in tracer.events if e[0] == 'end')
+
+
+def test_hooks_are_nested():
+
+    tracer = Recorder()
+    Order(data, tracer=tracer).to_primitive(tracer=tracer)
+
+    stack = []
+    for event in tracer.events:
+        if event[0] == 'start':
+            stack.append(event[1:4])
+        else:
+            assert stack.pop() == event[1:4]
+    assert not stack
+
+
+def test_profiler():
+
+    profiler = FieldProfiler()
+    order = Order(data, tracer=profiler)
+    order.validate(tracer=profiler)
+    order.to_native(tracer=profiler)
+
+    stats = profiler.stats
+    assert stats['convert', 'Item', ('items', '*', 'name')].calls == 2
+    assert stats['validate', 'Item', ('items', '*', 'name')].calls == 2
+    assert stats['validators', 'Item', ('items', '*', 'count')].calls == 2
+    assert stats['export', 'Order', ('items',)].calls == 1
+    assert stats['export', 'Order', ('items', '*')].calls == 2
+    item = stats['convert', 'Order', ('items',)]
+    assert item.errors == 0
+    assert item.total_time >= item.max_time > 0
+
+    report = profiler.report(limit=3)
+    assert len(report.splitlines()) == 4
+    assert 'items' in report
+
+    profiler.reset()
+    assert profiler.stats == {}
+
+
+def test_profiler_counts_errors():
+
+    profiler = FieldProfiler()
+    order = Order(data)
+    order.items[0].count = -1
+    with pytest.raises(DataError):
+        order.validate(tracer=profiler)
+
+    stats = profiler.stats
+    assert stats['validators', 'Item', ('items', '*', 'count')].errors == 1
+    assert stats['validate', 'Order', ('items', '*')].errors == 1
+    assert stats['validate', 'Order', ('items',)].errors == 1
+    assert stats['validate', 'Order', ('id',)].errors == 0
+
+
+def test_no_tracer():
+
+    order = Order(data)
+    order.validate()
+    assert order.to_primitive() == data
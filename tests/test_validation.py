@@ -6,6 +6,7 @@ from schematics.exceptions import (
     ConversionError, ValidationError, StopValidationError, DataError)
 from schematics.types import StringType, DateTimeType, BooleanType, IntType
 from schematics.types.compound import ModelType, ListType, DictType
+from schematics.undefined import Undefined
 from schematics.validate import prepare_validator
 
 
@@ -449,3 +450,83 @@ def test_builtin_validation_exception():
     with pytest.raises(ValueError):
         raise ValidationError('message')
 
+
+
+def test_validate_skips_clean_nested_models():
+
+    class CountingType(IntType):
+        calls = 0
+        def validate_count(self, value, context=None):
+            CountingType.calls += 1
+
+    class Leaf(Model):
+        number = CountingType()
+
+    class Branch(Model):
+        leaf = ModelType(Leaf)
+        leaves = ListType(ModelType(Leaf))
+
+    class Root(Model):
+        branch = ModelType(Branch)
+
+    root = Root({'branch': {'leaf': {'number': 1},
+                            'leaves': [{'number': 2}, {'number': 3}]}})
+    root.validate()
+    assert CountingType.calls == 3
+
+    CountingType.calls = 0
+    root.validate()
+    assert CountingType.calls == 0
+
+    root.branch.leaves[1].number = 'x'
+    with pytest.raises(DataError) as exception:
+        root.validate()
+    assert exception.value.messages == {
+        'branch': {'leaves': {1: {'number': [u"Value 'x' is not int."]}}}}
+    assert CountingType.calls == 0
+
+    CountingType.calls = 0
+    root.branch.leaves[1].number = 4
+    root.branch.leaves.append(Leaf({'number': 5}))
+    root.validate()
+    assert CountingType.calls == 2
+    assert root.branch.leaves[1].number == 4
+
+    CountingType.calls = 0
+    root.validate(partial=True)
+    assert CountingType.calls == 4
+
+
+def test_validate_applies_defaults_to_clean_nested_models():
+
+    class Leaf(Model):
+        number = IntType(default=1)
+
+    class Root(Model):
+        leaf = ModelType(Leaf)
+
+    root = Root({'leaf': {}}, init=False)
+    root.validate()
+    assert root.leaf._data['number'] is Undefined
+    root.validate(apply_defaults=True)
+    assert root.leaf.number == 1
+
+
+def test_projected_validation_does_not_mark_models_clean():
+
+    class Leaf(Model):
+        number = IntType(max_value=10)
+        other = IntType()
+
+    class Root(Model):
+        leaf = ModelType(Leaf)
+
+    root = Root({'leaf': {'number': 1, 'other': 2}})
+    root.validate()
+    root.leaf.number = 11
+    root.validate(fields=['leaf.other'])
+    assert root.leaf.number == 11
+    with pytest.raises(DataError) as exception:
+        root.validate()
+    assert exception.value.messages == {
+        'leaf': {'number': [u'Int value should be less than or equal to 10.']}}